@@ -0,0 +1,45 @@
+import argparse
+import time
+
+from game import events
+from game.effects import EffectEngine
+from game.stats import HP
+
+
+def build(effect_count, target_count, max_period, ticks):
+    engine = EffectEngine()
+    targets = [HP(1, 50) for _ in range(target_count)]
+    for i in range(effect_count):
+        period = i % max_period + 1
+        engine.add_dot(targets[i % target_count], 1 + i % 3, period=period, ticks=ticks)
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-tick cost of the effect engine with many active effects')
+    parser.add_argument('--effects', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--targets', type=int, default=10000)
+    parser.add_argument('--max-period', type=int, default=100)
+    parser.add_argument('--ticks', type=int, default=200)
+    args = parser.parse_args()
+
+    events.set_sink(events.NullSink())
+    for effect_count in args.effects:
+        start = time.perf_counter()
+        engine = build(effect_count, args.targets, args.max_period, 1000)
+        setup = time.perf_counter() - start
+
+        fired = 0
+        worst = 0
+        start = time.perf_counter()
+        for _ in range(args.ticks):
+            tick_start = time.perf_counter()
+            fired += engine.tick()
+            worst = max(worst, time.perf_counter() - tick_start)
+        elapsed = time.perf_counter() - start
+        print(f'{effect_count:>8} effects: setup {setup:6.2f}s  {elapsed / args.ticks * 1000:8.3f}ms/tick  '
+              f'worst {worst * 1000:8.3f}ms  {fired / elapsed:>12,.0f} effects/s')
+
+
+if __name__ == '__main__':
+    main()
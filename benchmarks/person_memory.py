@@ -0,0 +1,62 @@
+import gc
+import tracemalloc
+
+from game.factory import BASE_CHARACTERISTICS, LEVEL_INCREASING_FACTOR, Human, Elf
+from game.stats import (BASE_HP, HP_LEVEL_INCREASING, BASE_STAMINA, STAMINA_LEVEL_INCREASING,
+                        BASE_MANA, MANA_LEVEL_INCREASING)
+
+COUNT = 100000
+
+
+class DictStat:
+    def __init__(self, base_value, level_increasing, race_multiplier, level):
+        self.normal_value = int(base_value * race_multiplier * (1 + level_increasing / 100) ** (level - 1))
+        self._value = self.normal_value
+
+
+# Instance layout before race templates: one __dict__ per person and per stat
+class DictPerson:
+    def __init__(self, race, level=1):
+        for key in BASE_CHARACTERISTICS[race].keys():
+            self.__dict__[key] = BASE_CHARACTERISTICS[race][key]
+        self.level = level
+        self.hp = DictStat(BASE_HP, HP_LEVEL_INCREASING, self.hp_multiplier, level)
+        self.stamina = DictStat(BASE_STAMINA, STAMINA_LEVEL_INCREASING, self.stamina_multiplier, level)
+        self.mana = DictStat(BASE_MANA, MANA_LEVEL_INCREASING, self.mana_multiplier, level)
+        self.level_increasing_factor = (1 + LEVEL_INCREASING_FACTOR) ** (level - 1)
+        for key in ('base_hit', 'base_heal', 'base_heal_cost', 'hit_mana_cost'):
+            if key in self.__dict__:
+                self.__dict__[key] = self.__dict__[key] * self.level_increasing_factor
+
+
+def bytes_per_person(build, count=COUNT):
+    gc.collect()
+    tracemalloc.start()
+    people = [build(i) for i in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del people
+    return size / count
+
+
+def run(count=COUNT):
+    races = ('human', 'elf')
+    classes = (Human, Elf)
+    before = bytes_per_person(lambda i: DictPerson(races[i % 2], i % 50 + 1), count)
+    after = bytes_per_person(lambda i: with_stats(classes[i % 2](i % 50 + 1)), count)
+    lazy = bytes_per_person(lambda i: classes[i % 2](i % 50 + 1), count)
+    return {'count': count, 'before': before, 'after': after, 'lazy': lazy}
+
+
+def with_stats(person):
+    person.hp, person.stamina, person.mana
+    return person
+
+
+if __name__ == '__main__':
+    result = run()
+    print(f"{result['count']} persons")
+    print(f"dict layout:  {result['before']:.0f} bytes/person")
+    print(f"slots layout: {result['after']:.0f} bytes/person")
+    print(f"untouched:    {result['lazy']:.0f} bytes/person (stats not built yet)")
+    print(f"saved:        {1 - result['after'] / result['before']:.1%}")
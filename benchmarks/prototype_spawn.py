@@ -0,0 +1,48 @@
+import argparse
+import time
+
+from game.factory import LAZY_STATS, PersonFactory
+
+
+def construct(race, level, count):
+    person_class = PersonFactory.get_person_class(race)
+    persons = [person_class(level) for _ in range(count)]
+    for person in persons:
+        for name in LAZY_STATS:
+            getattr(person, name)
+    return persons
+
+
+def clone(race, level, count):
+    PersonFactory.prototypes.clear()
+    return PersonFactory.spawn_wave(race, level, count)
+
+
+def best(spawn, race, level, count, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        spawn(race, level, count)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Spawn a wave of identical characters: construction vs prototype clone')
+    parser.add_argument('--race', default='elf')
+    parser.add_argument('--level', type=int, default=30)
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    constructed = best(construct, args.race, args.level, args.count, args.repeat)
+    cloned = best(clone, args.race, args.level, args.count, args.repeat)
+    print(f'{args.count} x {args.race} level {args.level}')
+    print(f'  construct: {constructed * 1000:8.2f}ms  ({args.count / constructed:>12,.0f} persons/s)')
+    print(f'  clone:     {cloned * 1000:8.2f}ms  ({args.count / cloned:>12,.0f} persons/s)')
+    print(f'  speedup:   {constructed / cloned:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
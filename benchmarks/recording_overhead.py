@@ -0,0 +1,67 @@
+import time
+
+from game import events
+from game.factory import Human, Elf
+from game.recorder import CombatRecorder
+
+ACTIONS = 200000
+# recorded combat may take at most this many times as long as the same unrecorded loop
+RECORDING_BUDGET = 2.0
+
+
+def plain_loop(actions):
+    human, elf = Human(20), Elf(20)
+    start = time.perf_counter()
+    for i in range(actions):
+        if i % 2:
+            human.hp.change(-elf.hit())
+        else:
+            elf.hp.change(-human.hit())
+        if i % 50 == 49:
+            human.heal()
+            elf.heal()
+    return time.perf_counter() - start
+
+
+def recorded_loop(actions):
+    human, elf = Human(20), Elf(20)
+    recorder = CombatRecorder()
+    recorder.register(human)
+    recorder.register(elf)
+    start = time.perf_counter()
+    for i in range(actions):
+        if i % 2:
+            recorder.hit(elf, human, i)
+        else:
+            recorder.hit(human, elf, i)
+        if i % 50 == 49:
+            recorder.heal(human, i)
+            recorder.heal(elf, i)
+    return time.perf_counter() - start, recorder
+
+
+def run(actions=ACTIONS):
+    previous = events.set_sink(events.NullSink())
+    try:
+        plain = min(plain_loop(actions) for _ in range(3))
+        recorded, recorder = min((recorded_loop(actions) for _ in range(3)), key=lambda result: result[0])
+    finally:
+        events.set_sink(previous)
+    return {
+        'actions': actions,
+        'plain_seconds': plain,
+        'recorded_seconds': recorded,
+        'overhead': recorded / plain,
+        'records': len(recorder),
+        'log_bytes': len(recorder.getvalue()),
+    }
+
+
+if __name__ == '__main__':
+    result = run()
+    print(f"{result['actions']} actions, {result['records']} records, {result['log_bytes']} bytes")
+    print(f"plain:    {result['plain_seconds']:.3f}s")
+    print(f"recorded: {result['recorded_seconds']:.3f}s")
+    print(f"overhead: {result['overhead']:.2f}x (budget {RECORDING_BUDGET:.2f}x)")
+    if result['overhead'] > RECORDING_BUDGET:
+        raise SystemExit('recording overhead is over budget')
@@ -0,0 +1,58 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from game import events
+from game.factory import PersonFactory
+from game.roster import Roster
+
+
+def run(count, rounds, fighters, journal_mode, path):
+    rng = random.Random(0)
+    roster = Roster(path, page_size=5000, journal_mode=journal_mode)
+
+    start = time.perf_counter()
+    for race in ('human', 'elf'):
+        roster.add_many(PersonFactory.spawn_many(race, [rng.randint(1, 50) for _ in range(count // 2)]))
+    insert = time.perf_counter() - start
+
+    start = time.perf_counter()
+    handles = list(roster.query())
+    query = time.perf_counter() - start
+
+    written = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for _ in range(fighters // 2):
+            actor, target = rng.choice(handles), rng.choice(handles)
+            target.hp.change(-actor.hit())
+            if rng.random() < 0.1:
+                actor.heal()
+        written += roster.flush()
+    combat = time.perf_counter() - start
+    roster.close()
+    return insert, query, combat, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Roster write throughput under heavy combat')
+    parser.add_argument('--count', type=int, default=100000)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--fighters', type=int, default=20000, help='persons acting per round')
+    parser.add_argument('--journal', nargs='+', default=['wal', 'delete'])
+    args = parser.parse_args()
+
+    events.set_sink(events.NullSink())
+    for journal_mode in args.journal:
+        with tempfile.TemporaryDirectory() as directory:
+            insert, query, combat, written = run(args.count, args.rounds, args.fighters, journal_mode,
+                                                 os.path.join(directory, 'roster.db'))
+        print(f'{journal_mode:>6}: insert {args.count / insert:>10,.0f} rows/s  '
+              f'query {args.count / query:>10,.0f} handles/s  '
+              f'combat+flush {args.rounds / combat:6.2f} rounds/s  {written / combat:>10,.0f} rows written/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import argparse
+import asyncio
+
+from game import events
+from game.factory import PersonFactory
+from game.scheduler import TickScheduler
+
+
+def build(actor_count, cooldown):
+    scheduler = TickScheduler(tick_interval=0.05)
+    humans = PersonFactory.spawn_many('human', [10] * (actor_count // 2))
+    elves = PersonFactory.spawn_many('elf', [10] * (actor_count - actor_count // 2))
+    for i, (human, elf) in enumerate(zip(humans, elves)):
+        scheduler.schedule(human, lambda actor, target=elf: target.hp.change(-actor.hit()) and None,
+                           cooldown=cooldown, delay=i % cooldown)
+        scheduler.schedule(elf, lambda actor, target=human: target.hp.change(-actor.hit()) and None,
+                           cooldown=cooldown, delay=(i + 1) % cooldown)
+    return scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-tick latency of the tick scheduler as actor count grows')
+    parser.add_argument('--actors', type=int, nargs='+', default=[1000, 5000, 10000, 20000])
+    parser.add_argument('--ticks', type=int, default=40)
+    parser.add_argument('--cooldown', type=int, default=4)
+    args = parser.parse_args()
+
+    events.set_sink(events.NullSink())
+    for actor_count in args.actors:
+        scheduler = build(actor_count, args.cooldown)
+        asyncio.run(scheduler.run(ticks=args.ticks))
+        summary = scheduler.histogram.summary()
+        print(f"{actor_count:>6} actors: p50 {summary['p50'] * 1000:7.3f}ms  p99 {summary['p99'] * 1000:7.3f}ms  "
+              f"max {summary['max'] * 1000:7.3f}ms  overruns {scheduler.overruns}")
+
+
+if __name__ == '__main__':
+    main()
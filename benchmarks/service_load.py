@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+import random
+import time
+
+from game import events
+from game.histogram import LatencyHistogram
+from game.service import BATCH_WINDOW, DEFAULT_HOST, CombatClient, CombatServer
+
+
+async def worker(client, persons, requests, rng, histogram):
+    for _ in range(requests):
+        actor, target = rng.sample(persons, 2)
+        start = time.perf_counter()
+        if rng.random() < 0.1:
+            await client.heal(actor)
+        else:
+            await client.hit(actor, target)
+        histogram.record(time.perf_counter() - start)
+
+
+async def load(host, port, persons, requests, concurrency, pool_size):
+    async with CombatClient(host, port, pool_size) as client:
+        races = ('human', 'elf') * (persons // 2)
+        person_ids = await asyncio.gather(*(client.spawn(race, 20) for race in races))
+
+        histogram = LatencyHistogram()
+        rng = random.Random(0)
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client, person_ids, requests // concurrency, rng, histogram)
+                               for _ in range(concurrency)))
+        return histogram, time.perf_counter() - start
+
+
+async def run(args):
+    server = None
+    port = args.port
+    if port is None:
+        server = CombatServer(batch_window=args.batch_window)
+        port = await server.start(args.host, 0)
+    try:
+        histogram, elapsed = await load(args.host, port, args.persons, args.requests, args.concurrency, args.pool)
+    finally:
+        if server is not None:
+            await server.close()
+
+    summary = histogram.summary()
+    print(f'{histogram.count} requests in {elapsed:.2f}s: {histogram.count / elapsed:,.0f} req/s  '
+          f'concurrency {args.concurrency}  pool {args.pool}')
+    print(f"latency p50 {summary['p50'] * 1000:.3f}ms  p90 {summary['p90'] * 1000:.3f}ms  "
+          f"p99 {summary['p99'] * 1000:.3f}ms  max {summary['max'] * 1000:.3f}ms")
+    if server is not None:
+        print(f'{server.batches} batches, {server.requests / server.batches:.1f} requests/batch')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the combat service over localhost')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, help='connect to a running server instead of starting one')
+    parser.add_argument('--persons', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=50000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--pool', type=int, default=4)
+    parser.add_argument('--batch-window', type=float, default=BATCH_WINDOW)
+    args = parser.parse_args()
+
+    events.set_sink(events.NullSink())
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
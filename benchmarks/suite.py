@@ -0,0 +1,248 @@
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from game import events
+from game.factory import PersonFactory, Human, Elf
+from game.fixed import ROUND, TRUNCATE
+from game.pool import StatPool
+from game.rng import CombatRoller, stream_keys, uniforms
+from game.stats import HP
+
+BENCHMARKS = {}
+DEFAULT_THRESHOLD = 0.1
+
+
+def benchmark(name, ops):
+    def register(build):
+        BENCHMARKS[name] = (build, ops)
+        return build
+    return register
+
+
+@benchmark('micro.factory.get_person', ops=20000)
+def bench_get_person(ops):
+    races = ('human', 'elf') * (ops // 2)
+
+    def run():
+        get_person = PersonFactory.get_person
+        for i, race in enumerate(races):
+            get_person(race, i % 50 + 1)
+    return run
+
+
+@benchmark('micro.stats.change', ops=200000)
+def bench_change(ops):
+    hp = HP(1, 10)
+
+    def run():
+        change = hp.change
+        for i in range(ops // 4):
+            change(-30)
+            change(30)
+            change(-5, True)
+            change(5, True)
+    return run
+
+
+@benchmark('micro.stats.hp_str', ops=100000)
+def bench_hp_str(ops):
+    hp = HP(1, 10)
+    hp.change(-777)
+
+    def run():
+        for _ in range(ops):
+            str(hp)
+    return run
+
+
+@benchmark('micro.elf.hit', ops=200000)
+def bench_elf_hit(ops):
+    elf = Elf(10)
+
+    def run():
+        hit = elf.hit
+        mana = elf.mana
+        for i in range(ops):
+            hit()
+            if i % 8 == 7:
+                mana.change(100, True)
+    return run
+
+
+@benchmark('micro.elf.hit_rolled', ops=200000)
+def bench_elf_hit_rolled(ops):
+    elf = Elf(10)
+    roller = CombatRoller(1)
+
+    def run():
+        hit = elf.hit
+        mana = elf.mana
+        for i in range(ops):
+            hit(roller)
+            if i % 8 == 7:
+                mana.change(100, True)
+    return run
+
+
+@benchmark('macro.rng.uniforms', ops=1000000)
+def bench_uniforms(ops):
+    keys = stream_keys(1, np.arange(ops) % 1000)
+    counters = np.arange(ops) // 1000
+
+    def run():
+        return uniforms(keys, counters)
+    return run
+
+
+def bench_pool_change(ops, rounding):
+    pool = StatPool(10000, rounding=rounding)
+    indexes = pool.allocate_many(np.arange(10000) % 5000 + 1000)
+    damage = (np.arange(10000) % 300 + 1).astype(np.int64)
+    heal = damage // 2
+
+    def run():
+        for _ in range(ops // 20000):
+            pool.change(indexes, -damage)
+            pool.change(indexes, heal)
+    return run
+
+
+@benchmark('macro.pool.change', ops=2000000)
+def bench_pool_change_truncate(ops):
+    return bench_pool_change(ops, TRUNCATE)
+
+
+@benchmark('macro.pool.change_fixed', ops=2000000)
+def bench_pool_change_fixed(ops):
+    return bench_pool_change(ops, ROUND)
+
+
+@benchmark('macro.spawn_mixed', ops=100000)
+def bench_spawn_mixed(ops):
+    def run():
+        spawn_many = PersonFactory.spawn_many
+        persons = []
+        for race in ('human', 'elf'):
+            persons.extend(spawn_many(race, [i % 50 + 1 for i in range(ops // 2)]))
+        return persons
+    return run
+
+
+@benchmark('macro.combat_loop', ops=1000000)
+def bench_combat_loop(ops):
+    pairs = [(Human(i % 30 + 1), Elf(i % 30 + 1)) for i in range(100)]
+
+    def run():
+        for i in range(ops // 2):
+            human, elf = pairs[i % 100]
+            elf.hp.change(-human.hit())
+            human.hp.change(-elf.hit())
+            if not human.hp._value or not elf.hp._value:
+                human.reset(human.level)
+                elf.reset(elf.level)
+            elif i % 16 == 15:
+                human.heal()
+                elf.heal()
+    return run
+
+
+def measure(name, scale=1.0, repeat=3):
+    build, ops = BENCHMARKS[name]
+    ops = max(1, int(ops * scale))
+
+    timings = []
+    for _ in range(repeat):
+        run = build(ops)
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    run = build(ops)
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    result = run()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocated_blocks = sys.getallocatedblocks() - blocks
+    del result
+
+    best = min(timings)
+    return {
+        'ops': ops,
+        'seconds': best,
+        'ops_per_sec': ops / best,
+        'allocated_blocks': allocated_blocks,
+        'allocated_bytes': current,
+        'peak_bytes': peak,
+    }
+
+
+def run_suite(names=None, scale=1.0, repeat=3):
+    previous = events.set_sink(events.NullSink())
+    try:
+        results = {name: measure(name, scale, repeat) for name in (names or BENCHMARKS)}
+    finally:
+        events.set_sink(previous)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'scale': scale,
+        'benchmarks': results,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    regressions = []
+    for name, result in current['benchmarks'].items():
+        base = baseline['benchmarks'].get(name)
+        if base is None:
+            continue
+        ratio = result['ops_per_sec'] / base['ops_per_sec']
+        if ratio < 1 - threshold:
+            regressions.append((name, base['ops_per_sec'], result['ops_per_sec'], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='simple_rpg hot path benchmarks')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='compare against results stored in this JSON file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='flag benchmarks slower than the baseline by more than this fraction')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply every benchmark op count')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this string')
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    results = run_suite(names, args.scale, args.repeat)
+
+    for name, result in results['benchmarks'].items():
+        print(f"{name:<28} {result['ops_per_sec']:>14,.0f} ops/s  "
+              f"peak {result['peak_bytes'] / 1024:>10,.1f} KiB  blocks {result['allocated_blocks']:>+9,}")
+
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump(results, stream, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as stream:
+            regressions = compare(json.load(stream), results, args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f'REGRESSION {name}: {before:,.0f} -> {after:,.0f} ops/s ({ratio - 1:+.1%})')
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
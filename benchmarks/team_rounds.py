@@ -0,0 +1,50 @@
+import argparse
+import time
+
+from game import events
+from game.factory import Human, Elf
+from game.teams import Team
+
+
+def make_persons(count, level):
+    return [(Human if index % 2 else Elf)(level) for index in range(count)]
+
+
+def sequential_attack(attackers, enemies):
+    for person in attackers:
+        if not person.hp.stat_value:
+            continue
+        alive = [index for index, enemy in enumerate(enemies) if enemy.hp.stat_value]
+        if not alive:
+            return
+        target = min(alive, key=lambda index: (enemies[index].hp.stat_value, index))
+        enemies[target].hp.change(-person.hit())
+
+
+def run(attack, red, blue, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        attack(red, blue)
+        attack(blue, red)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Whole-team attack rounds, batched against one call per hit')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 40, 200])
+    parser.add_argument('--level', type=int, default=30)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    events.set_sink(events.NullSink())
+    for size in args.sizes:
+        sequential = run(sequential_attack, make_persons(size, args.level), make_persons(size, args.level),
+                         args.rounds)
+        batched = run(Team.attack, Team(make_persons(size, args.level)), Team(make_persons(size, args.level)),
+                      args.rounds)
+        print(f'{size:>4}v{size:<4}  sequential {sequential / args.rounds * 1000:8.3f}ms/round  '
+              f'batched {batched / args.rounds * 1000:8.3f}ms/round  x{sequential / batched:5.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,21 @@
+import argparse
+import os
+
+from game.tournament import matchups, scaling_curve
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tournament wall time from 1 to N worker processes')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-level', type=int, default=20)
+    parser.add_argument('--games', type=int, default=4)
+    args = parser.parse_args()
+
+    matchup_list = matchups(levels=range(1, args.max_level + 1))
+    print(f'{len(matchup_list)} matchups x {args.games} games')
+    for workers, seconds, speedup in scaling_curve(args.workers, matchup_list=matchup_list, games=args.games):
+        print(f'{workers:>3} workers: {seconds:7.3f}s  speedup {speedup:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from game import events
+from game.factory import BASE_CHARACTERISTICS, LEVEL_INCREASING_FACTOR, PersonFactory
+from game.rng import DEFAULT_ODDS
+from game.simulation import DRAW, HEAL_BELOW, MAX_TURNS, simulate
+from game.stats import (BASE_HP, BASE_MANA, HP_LEVEL_INCREASING, MANA_LEVEL_INCREASING, BaseStats,
+                        set_rounding)
+
+BALANCE_VERSION = 2
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'simple_rpg', 'balance')
+LEVEL_FACTOR = 'level_factor'
+RACE_A = 'human'
+RACE_B = 'elf'
+
+DEFAULT_SPACE = {
+    'human.base_hit': (80, 140),
+    'elf.base_hit': (150, 250),
+    'elf.hp_multiplier': (0.6, 1.0),
+    'elf.hit_mana_cost': (100, 200),
+    LEVEL_FACTOR: (0.03, 0.07),
+}
+LEVEL_BANDS = ((1, 10), (11, 20), (21, 30), (31, 40), (41, 50))
+
+BalanceSettings = namedtuple('BalanceSettings', [
+    'level_bands', 'fights_per_level', 'seed', 'max_turns', 'heal_below', 'odds', 'rounding'
+])
+BalanceResult = namedtuple('BalanceResult', ['params', 'score', 'win_rates'])
+
+
+def default_settings(level_bands=LEVEL_BANDS, fights_per_level=20, seed=0, max_turns=MAX_TURNS,
+                     heal_below=HEAL_BELOW, odds=DEFAULT_ODDS):
+    return BalanceSettings(tuple(map(tuple, level_bands)), fights_per_level, seed, max_turns, heal_below,
+                           tuple(odds), BaseStats.rounding)
+
+
+def candidate_characteristics(params):
+    characteristics = copy.deepcopy(BASE_CHARACTERISTICS)
+    for name, value in params.items():
+        if name == LEVEL_FACTOR:
+            continue
+        race, field = name.split('.')
+        characteristics[race][field] = value
+    return characteristics, params.get(LEVEL_FACTOR, LEVEL_INCREASING_FACTOR)
+
+
+# everything evaluate() reads, so results go stale when a base value or class factor changes
+def _model(params):
+    characteristics, level_factor = candidate_characteristics(params)
+    races = {}
+    for race in (RACE_A, RACE_B):
+        person_class = PersonFactory.get_person_class(race)
+        races[race] = [characteristics[race], list(person_class.scaled_characteristics),
+                       getattr(person_class, 'hit_heal_factor', 0), getattr(person_class, 'weak_hit_factor', 1)]
+    return [races, level_factor, [BASE_HP, HP_LEVEL_INCREASING, BASE_MANA, MANA_LEVEL_INCREASING]]
+
+
+def parameter_hash(params, settings):
+    key = json.dumps([BALANCE_VERSION, sorted(params.items()), _model(params), settings], sort_keys=True)
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _fight_columns(settings):
+    levels = np.repeat([level for low, high in settings.level_bands for level in range(low, high + 1)],
+                       settings.fights_per_level)
+    races = np.array([RACE_A, RACE_B])
+    first = np.tile([0, 1], len(levels))
+    return races[first], races[1 - first], np.repeat(levels, 2), first
+
+
+def evaluate(params, settings):
+    previous = set_rounding(settings.rounding)
+    try:
+        characteristics, level_factor = candidate_characteristics(params)
+        races_a, races_b, levels, first = _fight_columns(settings)
+        results = simulate(races_a, levels, races_b, levels, settings.max_turns, settings.heal_below,
+                           characteristics, level_factor, seed=settings.seed,
+                           odds=DEFAULT_ODDS._make(settings.odds))
+    finally:
+        set_rounding(previous)
+
+    # score of RACE_A: 1 per win, 0.5 per draw
+    scores = np.where(results.winners == DRAW, 0.5, (results.winners == first).astype(np.float64))
+    return [float(scores[(levels >= low) & (levels <= high)].mean()) for low, high in settings.level_bands]
+
+
+def score(win_rates):
+    return max(abs(rate - 0.5) for rate in win_rates)
+
+
+class ResultCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._memory = {}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        win_rates = self._memory.get(key)
+        if win_rates is not None:
+            return win_rates
+        if self.directory is None:
+            self.misses += 1
+            return None
+        try:
+            with open(self._path(key)) as stream:
+                win_rates = self._memory[key] = json.load(stream)['win_rates']
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return win_rates
+
+    def put(self, key, params, win_rates):
+        self._memory[key] = win_rates
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as stream:
+            json.dump({'params': params, 'win_rates': win_rates}, stream)
+        os.replace(tmp_path, path)
+
+
+def _init_worker():
+    events.set_sink(events.NullSink())
+
+
+def evaluate_many(candidates, settings, cache, executor=None):
+    keys = [parameter_hash(params, settings) for params in candidates]
+    win_rates = {key: cache.get(key) for key in dict.fromkeys(keys)}
+    missing = [(key, params) for key, params in zip(keys, candidates) if win_rates[key] is None]
+    missing = list(dict(missing).items())
+
+    if executor is None:
+        computed = [evaluate(params, settings) for _, params in missing]
+    else:
+        computed = executor.map(evaluate, [params for _, params in missing], itertools.repeat(settings))
+    for (key, params), rates in zip(missing, computed):
+        win_rates[key] = rates
+        cache.put(key, params, rates)
+
+    return [BalanceResult(params, score(win_rates[key]), win_rates[key]) for key, params in zip(keys, candidates)]
+
+
+def _round(value):
+    return round(value, 6)
+
+
+def grid(space, steps=3):
+    axes = [[_round(low + (high - low) * i / max(steps - 1, 1)) for i in range(steps)]
+            for low, high in space.values()]
+    return [dict(zip(space, values)) for values in itertools.product(*axes)]
+
+
+def neighbours(params, space, step_sizes):
+    candidates = []
+    for name, (low, high) in space.items():
+        for direction in (-1, 1):
+            value = _round(min(max(params[name] + direction * step_sizes[name], low), high))
+            if value != params[name]:
+                candidates.append({**params, name: value})
+    return candidates
+
+
+def rank(results):
+    unique = {}
+    for result in results:
+        unique.setdefault(tuple(sorted(result.params.items())), result)
+    return sorted(unique.values(), key=lambda result: (
+        result.score, sum(abs(rate - 0.5) for rate in result.win_rates), sorted(result.params.items())))
+
+
+def optimize(space=None, grid_steps=3, rounds=4, beam=3, top=5, settings=None, workers=None,
+             cache_dir=DEFAULT_CACHE_DIR):
+    space = space or DEFAULT_SPACE
+    settings = settings or default_settings()
+    cache = ResultCache(cache_dir)
+    workers = workers or os.cpu_count() or 1
+
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    try:
+        results = rank(evaluate_many(grid(space, grid_steps), settings, cache, executor))
+        step_sizes = {name: (high - low) / max(grid_steps - 1, 1) / 2 for name, (low, high) in space.items()}
+        for _ in range(rounds):
+            best = results[:beam]
+            candidates = [params for result in best for params in neighbours(result.params, space, step_sizes)]
+            results = rank(results + evaluate_many(candidates, settings, cache, executor))
+            if results[:beam] == best:
+                step_sizes = {name: size / 2 for name, size in step_sizes.items()}
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return results[:top], cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=f'Search race parameters for balanced {RACE_A} vs {RACE_B} fights')
+    parser.add_argument('--grid-steps', type=int, default=3)
+    parser.add_argument('--rounds', type=int, default=4)
+    parser.add_argument('--fights', type=int, default=20, help='fights per level and side')
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    settings = default_settings(fights_per_level=args.fights, seed=args.seed)
+    results, cache = optimize(grid_steps=args.grid_steps, rounds=args.rounds, top=args.top, settings=settings,
+                              workers=args.workers, cache_dir=args.cache_dir)
+    print(f'evaluated {cache.misses} candidates, {cache.hits} from cache')
+    for result in results:
+        bands = '  '.join(f'{low}-{high}: {rate:.3f}' for (low, high), rate in zip(settings.level_bands,
+                                                                                   result.win_rates))
+        params = ', '.join(f'{name}={value}' for name, value in sorted(result.params.items()))
+        print(f'worst {result.score:.3f}  [{bands}]  {params}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+from game.fixed import ONE, ONE_SQUARED, TRUNCATE, div_round, multiply, scale, to_fixed
+
+DEFAULT_MAX_LEVEL = 100
+
+
+class LevelCurve:
+    def __init__(self, growth, scale=1, truncate=True, max_level=DEFAULT_MAX_LEVEL):
+        self.growth = growth
+        self.scale = scale
+        self.truncate = truncate
+        self.values = [None]
+        self.extend(max_level)
+
+    def compute(self, level):
+        value = self.scale * self.growth ** (level - 1)
+        return int(value) if self.truncate else value
+
+    def extend(self, max_level):
+        self.values.extend(self.compute(level) for level in range(len(self.values), max_level + 1))
+
+    @property
+    def max_level(self):
+        return len(self.values) - 1
+
+    def __getitem__(self, level):
+        if level < 1:
+            return self.compute(level)
+        if level >= len(self.values):
+            self.extend(level)
+        return self.values[level]
+
+
+class FixedLevelCurve(LevelCurve):
+    def __init__(self, growth, scale=ONE, truncate=False, max_level=DEFAULT_MAX_LEVEL):
+        self.powers = [None, ONE]
+        super().__init__(growth, scale, truncate, max_level)
+
+    def power(self, level):
+        powers = self.powers
+        if level < 1:
+            power = ONE
+            for _ in range(level, 1):
+                power = div_round(power * ONE, self.growth)
+            return power
+        while len(powers) <= level:
+            powers.append(div_round(powers[-1] * self.growth, ONE))
+        return powers[level]
+
+    def compute(self, level):
+        power = self.power(level)
+        return div_round(self.scale * power, ONE_SQUARED) if self.truncate else power
+
+
+class LevelCurves:
+    def __init__(self, max_level=DEFAULT_MAX_LEVEL):
+        self.max_level = max_level
+        self._curves = {}
+
+    def _get(self, key, growth, scale, truncate, curve_class=LevelCurve):
+        curve = self._curves.get(key)
+        if curve is None:
+            curve = self._curves[key] = curve_class(growth, scale, truncate, self.max_level)
+        return curve
+
+    def stat(self, base_value, level_increasing, race_multiplier, rounding=TRUNCATE):
+        key = ('stat', base_value, level_increasing, race_multiplier, rounding)
+        if rounding == TRUNCATE:
+            return self._get(key, 1 + level_increasing / 100, base_value * race_multiplier, True)
+        growth = ONE + div_round(to_fixed(level_increasing), 100)
+        scale_fixed = div_round(to_fixed(base_value) * to_fixed(race_multiplier), ONE)
+        return self._get(key, growth, scale_fixed, True, FixedLevelCurve)
+
+    def factor(self, level_increasing_factor, rounding=TRUNCATE):
+        key = ('factor', level_increasing_factor, rounding)
+        if rounding == TRUNCATE:
+            return self._get(key, 1 + level_increasing_factor, 1, False)
+        return self._get(key, ONE + to_fixed(level_increasing_factor), ONE, False, FixedLevelCurve)
+
+    def clear(self):
+        self._curves.clear()
+
+
+curves = LevelCurves()
+
+
+def scale_value(value, factor, rounding=TRUNCATE):
+    return value * factor if rounding == TRUNCATE else scale(value, factor)
+
+
+# factor is a plain number in both modes, unlike the fixed point curve factors scale_value takes
+def multiply_value(value, factor, rounding=TRUNCATE):
+    return value * factor if rounding == TRUNCATE else multiply(value, factor)
@@ -0,0 +1,207 @@
+import itertools
+
+from game.curves import multiply_value
+from game.stats import BaseStats
+
+WHEEL_BITS = 6
+WHEEL_SIZE = 1 << WHEEL_BITS
+WHEEL_MASK = WHEEL_SIZE - 1
+WHEEL_LEVELS = 5
+
+STACK = 'stack'
+REFRESH = 'refresh'
+IGNORE = 'ignore'
+
+
+class TimingWheel:
+    def __init__(self, levels=WHEEL_LEVELS):
+        self.now = 0
+        self.levels = [[{} for _ in range(WHEEL_SIZE)] for _ in range(levels)]
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def insert(self, entry):
+        delta = entry.due - self.now
+        if delta < 1:
+            raise ValueError(f'Entry is due at tick {entry.due}, the wheel is already at {self.now}')
+        self.size += 1
+        self._place(entry, delta)
+
+    def _place(self, entry, delta):
+        level = 0
+        while delta >= 1 << (WHEEL_BITS * (level + 1)):
+            level += 1
+            if level == len(self.levels):
+                raise ValueError(f'Entry is due too far ahead: {delta} ticks')
+        slot = (entry.due >> (WHEEL_BITS * level)) & WHEEL_MASK
+        self.levels[level][slot][entry.id] = entry
+        entry.location = (level, slot)
+
+    def cancel(self, entry):
+        if entry.location is None:
+            return False
+        level, slot = entry.location
+        del self.levels[level][slot][entry.id]
+        entry.location = None
+        self.size -= 1
+        return True
+
+    def advance(self):
+        self.now += 1
+        now = self.now
+        for level in range(len(self.levels) - 1, 0, -1):
+            if now & ((1 << (WHEEL_BITS * level)) - 1):
+                continue
+            bucket = self.levels[level][(now >> (WHEEL_BITS * level)) & WHEEL_MASK]
+            if bucket:
+                entries = list(bucket.values())
+                bucket.clear()
+                for entry in entries:
+                    self._place(entry, entry.due - now)
+
+        bucket = self.levels[0][now & WHEEL_MASK]
+        if not bucket:
+            return []
+        due = list(bucket.values())
+        bucket.clear()
+        self.size -= len(due)
+        for entry in due:
+            entry.location = None
+        return due
+
+
+class Effect:
+    __slots__ = ('id', 'target', 'amount', 'percent', 'period', 'remaining', 'attribute', 'stack_key', 'due',
+                 'location')
+
+    def __init__(self, effect_id, target, amount, percent, period, remaining, attribute, stack_key, due):
+        self.id = effect_id
+        self.target = target
+        self.amount = amount
+        self.percent = percent
+        self.period = period
+        self.remaining = remaining
+        self.attribute = attribute
+        self.stack_key = stack_key
+        self.due = due
+        self.location = None
+
+
+def _effect_id(effect):
+    return effect.id
+
+
+def effect_stack_key(target, key):
+    return None if key is None else (id(target), key)
+
+
+class EffectEngine:
+    def __init__(self):
+        self.wheel = TimingWheel()
+        self.effects = {}
+        self._stacks = {}
+        self._buffs = {}
+        self._ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self.effects)
+
+    @property
+    def now(self):
+        return self.wheel.now
+
+    def _add(self, target, amount, percent, period, remaining, attribute, key, stacking, delay):
+        # checked before a refresh cancels the effect it would replace
+        if delay < 1:
+            raise ValueError(f'Effects are due at least one tick ahead, got {delay}')
+        stack_key = effect_stack_key(target, key)
+        if stack_key is not None and stack_key in self._stacks:
+            if stacking == IGNORE:
+                return None
+            if stacking == REFRESH:
+                self.cancel(self._stacks[stack_key])
+
+        effect = Effect(next(self._ids), target, amount, percent, period, remaining, attribute, stack_key,
+                        self.now + delay)
+        self.wheel.insert(effect)
+        self.effects[effect.id] = effect
+        if stack_key is not None and stacking != STACK:
+            self._stacks[stack_key] = effect.id
+        return effect
+
+    def add_periodic(self, stat, amount, period=1, ticks=1, key=None, stacking=REFRESH, percent=None):
+        effect = self._add(stat, amount, percent, period, ticks, None, key, stacking, period)
+        return self._stacks[effect_stack_key(stat, key)] if effect is None else effect.id
+
+    def add_dot(self, stat, damage, period=1, ticks=1, key=None, stacking=REFRESH, percent=None):
+        return self.add_periodic(stat, -damage, period, ticks, key, stacking, percent)
+
+    def add_hot(self, stat, heal, period=1, ticks=1, key=None, stacking=REFRESH, percent=None):
+        return self.add_periodic(stat, heal, period, ticks, key, stacking, percent)
+
+    def add_buff(self, person, multiplier, duration, attribute='base_hit', key=None, stacking=REFRESH):
+        if attribute not in person.scaled_characteristics:
+            raise ValueError(f'{attribute} is not a scaled characteristic of {type(person).__name__}')
+        effect = self._add(person, multiplier, None, None, 1, attribute, key, stacking, duration)
+        if effect is None:
+            return self._stacks[effect_stack_key(person, key)]
+        self._buffs.setdefault(id(person), {})[effect.id] = effect
+        self._apply_buffs(person, attribute)
+        return effect.id
+
+    def _apply_buffs(self, person, attribute):
+        value = person.template.row(person.level)[person.scaled_characteristics.index(attribute)]
+        for effect in self._buffs.get(id(person), {}).values():
+            if effect.attribute == attribute:
+                value = multiply_value(value, effect.amount, BaseStats.rounding)
+        setattr(person, attribute, value)
+
+    # level ups rescale the characteristics from the template, buffs are applied on top again
+    def level_up(self, person):
+        level = person.level_up()
+        for attribute in {effect.attribute for effect in self._buffs.get(id(person), {}).values()}:
+            self._apply_buffs(person, attribute)
+        return level
+
+    def _finish(self, effect):
+        del self.effects[effect.id]
+        if effect.stack_key is not None and self._stacks.get(effect.stack_key) == effect.id:
+            del self._stacks[effect.stack_key]
+        if effect.attribute is not None:
+            buffs = self._buffs[id(effect.target)]
+            del buffs[effect.id]
+            if not buffs:
+                del self._buffs[id(effect.target)]
+            self._apply_buffs(effect.target, effect.attribute)
+
+    def cancel(self, effect_id):
+        effect = self.effects.get(effect_id)
+        if effect is None:
+            return False
+        self.wheel.cancel(effect)
+        self._finish(effect)
+        return True
+
+    # effects are applied one change() at a time in the order they were added, so truncation,
+    # clamping and zone crossings are the same as applying them by hand
+    def tick(self):
+        due = self.wheel.advance()
+        due.sort(key=_effect_id)
+        for effect in due:
+            if effect.attribute is not None:
+                self._finish(effect)
+                continue
+
+            effect.target.change(effect.amount, effect.percent)
+            effect.remaining -= 1
+            if effect.remaining > 0:
+                effect.due = self.now + effect.period
+                self.wheel.insert(effect)
+            else:
+                self._finish(effect)
+        return len(due)
+
+    def run(self, ticks):
+        return sum(self.tick() for _ in range(ticks))
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import Counter, deque, namedtuple
+
+DEATH = 'death'
+LOW_HP = 'low_hp'
+NO_MANA = 'no_mana'
+LOW_MANA = 'low_mana'
+INSUFFICIENT_MANA = 'insufficient_mana'
+
+Event = namedtuple('Event', ['time', 'type', 'message'])
+
+
+class NullSink:
+    def emit(self, event_type, message):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class PrintSink(NullSink):
+    def emit(self, event_type, message):
+        print(message)
+
+
+class RingBufferSink(NullSink):
+    def __init__(self, capacity=4096):
+        self.events = deque(maxlen=capacity)
+        self.dropped = 0
+
+    def emit(self, event_type, message):
+        if len(self.events) == self.events.maxlen:
+            self.dropped += 1
+        self.events.append(Event(time.time(), event_type, message))
+
+    def drain(self):
+        events = []
+        while self.events:
+            events.append(self.events.popleft())
+        return events
+
+
+class BufferedSink(RingBufferSink):
+    def __init__(self, target, capacity=4096, flush_interval=0.5):
+        super().__init__(capacity)
+        if isinstance(target, str):
+            self.stream = open(target, 'a')
+            self._owns_stream = True
+        else:
+            self.stream = target
+            self._owns_stream = False
+        self.flush_interval = flush_interval
+        self._write_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='event-sink-flush', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        events = self.drain()
+        if not events:
+            return
+        lines = ''.join(f'{event.time:.6f}\t{event.type}\t{event.message}\n' for event in events)
+        with self._write_lock:
+            self.stream.write(lines)
+            self.stream.flush()
+
+    def close(self):
+        self._stopped.set()
+        self._thread.join()
+        self.flush()
+        if self._owns_stream:
+            self.stream.close()
+
+
+class RateLimitedSink(NullSink):
+    def __init__(self, sink, interval=1.0, clock=time.monotonic):
+        self.sink = sink
+        self.interval = interval
+        self.clock = clock
+        self.suppressed = Counter()
+        self._last_seen = {}
+
+    def emit(self, event_type, message):
+        now = self.clock()
+        key = (event_type, message)
+        last_seen = self._last_seen.get(key)
+        if last_seen is not None and now - last_seen < self.interval:
+            self.suppressed[event_type] += 1
+            return
+        self._last_seen[key] = now
+        self.sink.emit(event_type, message)
+
+    def flush(self):
+        self.sink.flush()
+
+    def close(self):
+        self.sink.close()
+
+
+_sink = PrintSink()
+
+
+def get_sink():
+    return _sink
+
+
+def set_sink(sink):
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+def emit(event_type, message):
+    _sink.emit(event_type, message)
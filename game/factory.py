@@ -1,6 +1,9 @@
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
 
-from game.stats import HP, Stamina, Mana
+from game.curves import curves, multiply_value, scale_value
+from game.fixed import ROUND
+from game.stats import BaseStats, HP, Stamina, Mana
 
 LEVEL_INCREASING_FACTOR = 0.05
 
@@ -24,19 +27,133 @@ BASE_CHARACTERISTICS = {
     }
 }
 
+RACES = list(BASE_CHARACTERISTICS)
+RACE_CODES = {race: code for code, race in enumerate(RACES)}
+
+# stats are built on first access, see AbstractPerson.__getattr__
+LAZY_STATS = {
+    'hp': lambda person: HP(person.hp_multiplier, person.level),
+    'stamina': lambda person: Stamina(person.stamina_multiplier, person.level),
+    'mana': lambda person: Mana(person.mana_multiplier, person.level),
+}
+
+
+class RaceTemplate:
+    __slots__ = ('race', 'scaled_characteristics', 'source', 'characteristics', 'constants', 'base_values', '_rows',
+                 '_fixed_rows')
+
+    # source is the race's own characteristics table, BASE_CHARACTERISTICS for the built-in races
+    def __init__(self, race, scaled_characteristics, source=None):
+        self.source = source
+        characteristics = dict(BASE_CHARACTERISTICS[race] if source is None else source)
+        self.race = race
+        self.characteristics = characteristics
+        self.scaled_characteristics = tuple(scaled_characteristics)
+        self.constants = {key: value for key, value in characteristics.items()
+                          if key not in self.scaled_characteristics}
+        self.base_values = tuple(characteristics[key] for key in self.scaled_characteristics)
+        self._rows = [None]
+        self._fixed_rows = [None]
+
+    def row(self, level):
+        rounding = BaseStats.rounding
+        rows = self._fixed_rows if rounding == ROUND else self._rows
+        if 0 < level < len(rows):
+            return rows[level]
+        factor_curve = curves.factor(LEVEL_INCREASING_FACTOR, rounding)
+        if level < 1:
+            return tuple(scale_value(value, factor_curve[level], rounding) for value in self.base_values)
+        for row_level in range(len(rows), level + 1):
+            factor = factor_curve[row_level]
+            rows.append(tuple(scale_value(value, factor, rounding) for value in self.base_values))
+        return rows[level]
+
+    def stale(self):
+        if self.source is not None:
+            return self.source != self.characteristics
+        return BASE_CHARACTERISTICS.get(self.race) != self.characteristics
+
 
 class AbstractPerson(metaclass=ABCMeta):
+    __slots__ = ('level', 'hp', 'stamina', 'mana', 'level_increasing_factor', 'team')
     hp_multiplier = 1
     stamina_multiplier = 1
     mana_multiplier = 1
+    race = None
+    scaled_characteristics = ()
+    characteristics = None
+    template = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.clone_slots = tuple(slot for klass in reversed(cls.__mro__)
+                                for slot in klass.__dict__.get('__slots__', ())
+                                if slot not in LAZY_STATS and slot != 'team')
+        if cls.race is not None and cls.__dict__.get('template') is None:
+            cls.refresh_template()
+
+    @classmethod
+    def refresh_template(cls):
+        cls.template = RaceTemplate(cls.race, cls.scaled_characteristics, cls.characteristics)
+        for key, value in cls.template.constants.items():
+            setattr(cls, key, value)
+        return cls.template
 
     @abstractmethod
     def __init__(self, level=1, *args, **kwargs):
         self.level = level
-        self.hp = HP(self.hp_multiplier, self.level)
-        self.stamina = Stamina(self.stamina_multiplier, self.level)
-        self.mana = Mana(self.mana_multiplier, self.level)
-        self.level_increasing_factor = (1 + LEVEL_INCREASING_FACTOR) ** (level - 1)
+        self.team = None
+        self.level_increasing_factor = curves.factor(LEVEL_INCREASING_FACTOR)[level]
+
+    def __getattr__(self, name):
+        build = LAZY_STATS.get(name)
+        if build is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        stat = build(self)
+        setattr(self, name, stat)
+        return stat
+
+    def built_stats(self):
+        for name in LAZY_STATS:
+            try:
+                yield object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+
+    def clone(self):
+        person = object.__new__(type(self))
+        for name in self.clone_slots:
+            setattr(person, name, getattr(self, name))
+        person.team = None
+        for name in LAZY_STATS:
+            setattr(person, name, getattr(self, name).clone())
+        return person
+
+    def scale_characteristics(self):
+        for key, value in zip(self.scaled_characteristics, self.template.row(self.level)):
+            setattr(self, key, value)
+
+    def level_up(self):
+        self.level += 1
+        self.level_increasing_factor = curves.factor(LEVEL_INCREASING_FACTOR)[self.level]
+        for stat in self.built_stats():
+            stat.set_level(self.level)
+        self.scale_characteristics()
+        return self.level
+
+    # a team keeps the person's HP and mana in its pools, leaving it gives the person its own stats back
+    def leave_team(self):
+        if self.team is not None:
+            self.team.remove(self)
+
+    def reset(self, level=1):
+        self.leave_team()
+        self.level = level
+        self.level_increasing_factor = curves.factor(LEVEL_INCREASING_FACTOR)[level]
+        for stat in self.built_stats():
+            stat.reset(level)
+        self.scale_characteristics()
+        return self
 
     @abstractmethod
     def hit(self, *args, **kwargs):
@@ -48,18 +165,20 @@ class AbstractPerson(metaclass=ABCMeta):
 
 
 class Human(AbstractPerson):
+    __slots__ = ('base_hit', 'base_heal', 'base_heal_cost')
+    race = 'human'
+    scaled_characteristics = __slots__
+    hit_heal_factor = 0.2
+
     def __init__(self, level=1, *args, **kwargs):
-        for key in BASE_CHARACTERISTICS['human'].keys():
-            self.__dict__[key] = BASE_CHARACTERISTICS['human'][key]
         super().__init__(level=level, *args, **kwargs)
-        self.base_hit = self.base_hit * self.level_increasing_factor
-        self.base_heal = self.base_heal * self.level_increasing_factor
-        self.base_heal_cost = self.base_heal_cost * self.level_increasing_factor
+        self.base_hit, self.base_heal, self.base_heal_cost = self.template.row(level)
 
-    def hit(self, *args, **kwargs):
-        heal = 0.2 * self.base_heal
-        self.hp.change(heal)
-        return self.base_hit
+    def hit(self, roller=None, *args, **kwargs):
+        self.hp.change(multiply_value(self.base_heal, self.hit_heal_factor, BaseStats.rounding))
+        if roller is None:
+            return self.base_hit
+        return roller.damage(self.base_hit)
 
     def heal(self):
         self.mana.change(-self.base_heal_cost)
@@ -67,21 +186,25 @@ class Human(AbstractPerson):
 
 
 class Elf(AbstractPerson):
+    __slots__ = ('base_hit', 'base_heal', 'base_heal_cost', 'hit_mana_cost')
+    race = 'elf'
+    scaled_characteristics = __slots__
+    weak_hit_factor = 0.3
+
     def __init__(self, level=1, *args, **kwargs):
-        for key in BASE_CHARACTERISTICS['elf'].keys():
-            self.__dict__[key] = BASE_CHARACTERISTICS['elf'][key]
         super().__init__(level=level, *args, **kwargs)
-        self.base_hit = self.base_hit * self.level_increasing_factor
-        self.base_heal = self.base_heal * self.level_increasing_factor
-        self.base_heal_cost = self.base_heal_cost * self.level_increasing_factor
-        self.hit_mana_cost = self.hit_mana_cost * self.level_increasing_factor
+        self.base_hit, self.base_heal, self.base_heal_cost, self.hit_mana_cost = self.template.row(level)
 
-    def hit(self, *args, **kwargs):
+    def hit(self, roller=None, *args, **kwargs):
         if self.mana.check_value(self.hit_mana_cost):
             self.mana.change(-self.hit_mana_cost)
-            return self.base_hit
-        self.mana.change(-self.hit_mana_cost)
-        return self.base_hit * 0.3
+            damage = self.base_hit
+        else:
+            self.mana.change(-self.hit_mana_cost)
+            damage = multiply_value(self.base_hit, self.weak_hit_factor, BaseStats.rounding)
+        if roller is None:
+            return damage
+        return roller.damage(damage)
 
     def heal(self):
         self.mana.change(-self.base_heal_cost)
@@ -112,21 +235,177 @@ class Orc(AbstractPerson):
             self.hp = new_hp if new_hp <= BASE_HP else BASE_HP
 
 
+class PersonPool:
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._free = {}
+        self._pooled = set()
+        self.hits = 0
+        self.misses = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return sum(len(free) for free in self._free.values())
+
+    def release(self, person):
+        if id(person) in self._pooled:
+            raise ValueError(f'{person!r} is already in the pool')
+        free = self._free.setdefault(type(person), [])
+        if len(free) >= self.max_size:
+            self.dropped += 1
+            return False
+        free.append(person)
+        self._pooled.add(id(person))
+        return True
+
+    def _take(self, free, level):
+        person = free.pop()
+        self._pooled.discard(id(person))
+        return person.reset(level)
+
+    def acquire(self, person_class, level=1, *args, **kwargs):
+        free = self._free.get(person_class)
+        if free:
+            self.hits += 1
+            return self._take(free, level)
+        self.misses += 1
+        return person_class(level, *args, **kwargs)
+
+    def acquire_many(self, person_class, levels):
+        levels = list(levels)
+        free = self._free.get(person_class) or []
+        reused = min(len(free), len(levels))
+        self.hits += reused
+        self.misses += len(levels) - reused
+
+        persons = [self._take(free, level) for level in levels[:reused]]
+        persons.extend(person_class(level) for level in levels[reused:])
+        return persons
+
+    def clear(self):
+        self._free.clear()
+        self._pooled.clear()
+
+    def stats(self):
+        return {
+            'size': len(self),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'dropped': self.dropped,
+        }
+
+
+class PrototypeCache:
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._prototypes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._prototypes)
+
+    def prototype(self, person_class, level=1):
+        key = (person_class, level, BaseStats.rounding)
+        if person_class.template is not None and person_class.template.stale():
+            self.invalidate(person_class)
+            person_class.refresh_template()
+
+        prototype = self._prototypes.get(key)
+        if prototype is not None:
+            self._prototypes.move_to_end(key)
+            self.hits += 1
+            return prototype
+
+        self.misses += 1
+        prototype = person_class(level)
+        for name in LAZY_STATS:
+            getattr(prototype, name)
+        self._prototypes[key] = prototype
+        if len(self._prototypes) > self.max_size:
+            self._prototypes.popitem(last=False)
+            self.evictions += 1
+        return prototype
+
+    def clone(self, person_class, level=1):
+        return self.prototype(person_class, level).clone()
+
+    def clone_many(self, person_class, level, count):
+        prototype = self.prototype(person_class, level)
+        return [prototype.clone() for _ in range(count)]
+
+    def invalidate(self, person_class=None):
+        keys = [key for key in self._prototypes if person_class is None or key[0] is person_class]
+        for key in keys:
+            del self._prototypes[key]
+        self.invalidations += len(keys)
+
+    def clear(self):
+        self._prototypes.clear()
+
+    def stats(self):
+        return {
+            'size': len(self),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
 class PersonFactory:
     __person_classes = {
         'human': Human,
         'elf': Elf,
         'orc': Orc
     }
+    pool = PersonPool()
+    prototypes = PrototypeCache()
 
     @staticmethod
-    def get_person(name, *args, **kwargs):
+    def register(name, person_class, replace=False):
+        name = name.lower()
+        if name in PersonFactory.__person_classes and not replace:
+            raise ValueError(f'Personage {name} is already registered')
+        PersonFactory.__person_classes[name] = person_class
+        if name not in RACE_CODES:
+            RACE_CODES[name] = len(RACES)
+            RACES.append(name)
+        return person_class
+
+    @staticmethod
+    def get_person_class(name):
         person = PersonFactory.__person_classes.get(name.lower(), None)
 
         if person:
-            return person(*args, **kwargs)
+            return person
         raise NotImplementedError(f"Personage {name} wasn't implemented")
 
+    @staticmethod
+    def person_classes():
+        return dict(PersonFactory.__person_classes)
+
+    @staticmethod
+    def get_person(name, *args, **kwargs):
+        return PersonFactory.pool.acquire(PersonFactory.get_person_class(name), *args, **kwargs)
+
+    @staticmethod
+    def spawn_many(name, levels):
+        return PersonFactory.pool.acquire_many(PersonFactory.get_person_class(name), levels)
+
+    @staticmethod
+    def spawn_wave(name, level, count):
+        return PersonFactory.prototypes.clone_many(PersonFactory.get_person_class(name), level, count)
+
+    @staticmethod
+    def recycle(person):
+        person.leave_team()
+        return PersonFactory.pool.release(person)
+
 
 if __name__ == '__main__':
     person = PersonFactory.get_person('human')
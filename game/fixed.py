@@ -0,0 +1,46 @@
+# Fixed point numbers are ints scaled by ONE. Every conversion and division
+# rounds to the nearest integer, ties away from zero, so the scalar and the
+# numpy versions in game.fixed_arrays give the same result on any platform.
+FRACTION_BITS = 32
+ONE = 1 << FRACTION_BITS
+ONE_SQUARED = ONE * ONE
+PERCENT = 100 * ONE
+
+# float math truncated with int(), the behaviour before fixed point
+TRUNCATE = 'truncate'
+# integer fixed point math, ties rounded away from zero
+ROUND = 'round'
+ROUNDINGS = (TRUNCATE, ROUND)
+
+
+def to_fixed(value):
+    if isinstance(value, int):
+        return value << FRACTION_BITS
+    scaled = abs(value) * ONE
+    fixed = int(scaled)
+    if scaled - fixed >= 0.5:
+        fixed += 1
+    return fixed if value >= 0 else -fixed
+
+
+def div_round(numerator, denominator):
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if 2 * remainder >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def delta(amount, normal_value, percent=None):
+    if percent:
+        return div_round(normal_value * to_fixed(amount), PERCENT)
+    if isinstance(amount, int):
+        return amount
+    return div_round(to_fixed(amount), ONE)
+
+
+def scale(value, factor):
+    return div_round(to_fixed(value) * factor, ONE_SQUARED)
+
+
+def multiply(value, factor):
+    return scale(value, to_fixed(factor))
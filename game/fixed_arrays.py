@@ -0,0 +1,47 @@
+import numpy as np
+
+from game.fixed import FRACTION_BITS, ONE, PERCENT, delta, div_round, to_fixed
+
+# int64 bounds of the numpy versions, past them they fall back to the scalar Python int math
+INT64_LIMIT = 1 << 63
+FIXED_LIMIT = 1 << (63 - FRACTION_BITS)
+
+
+def _max_abs(values):
+    return np.abs(values).max() if values.size else 0
+
+
+def to_fixed_array(values):
+    values = np.asarray(values)
+    if values.dtype == object or _max_abs(values) >= FIXED_LIMIT:
+        return np.array([to_fixed(value) for value in values.tolist()], dtype=object)
+    if values.dtype.kind in 'iu':
+        return values.astype(np.int64) << FRACTION_BITS
+    scaled = np.abs(values.astype(np.float64)) * ONE
+    fixed = np.floor(scaled)
+    fixed = (fixed + (scaled - fixed >= 0.5)).astype(np.int64)
+    return np.where(values < 0, -fixed, fixed)
+
+
+def div_round_array(numerators, denominator):
+    if getattr(numerators, 'dtype', None) == object:
+        return np.array([div_round(numerator, denominator) for numerator in numerators.tolist()], dtype=object)
+    numerators = np.asarray(numerators, dtype=np.int64)
+    quotients, remainders = np.divmod(np.abs(numerators), denominator)
+    quotients += 2 * remainders >= denominator
+    return np.where(numerators < 0, -quotients, quotients)
+
+
+# raises OverflowError when a result does not fit int64
+def delta_array(amounts, normal_values, percent=None):
+    amounts = np.asarray(amounts)
+    if percent:
+        fixed_amounts = to_fixed_array(amounts)
+        if fixed_amounts.dtype == object or int(_max_abs(normal_values)) * int(_max_abs(fixed_amounts)) >= INT64_LIMIT:
+            amounts, normal_values = np.broadcast_arrays(amounts, normal_values)
+            return np.array([delta(amount, normal_value, percent) for amount, normal_value
+                             in zip(amounts.tolist(), normal_values.tolist())], dtype=np.int64)
+        return div_round_array(normal_values * fixed_amounts, PERCENT)
+    if amounts.dtype.kind in 'iu':
+        return amounts.astype(np.int64)
+    return np.asarray(div_round_array(to_fixed_array(amounts), ONE), dtype=np.int64)
@@ -0,0 +1,196 @@
+import json
+from collections import Counter
+from time import perf_counter
+
+from game import fixed
+from game.factory import PersonFactory, Human, Elf
+from game.histogram import LatencyHistogram
+from game.races import DataPerson
+from game.stats import BaseStats, HP, Stamina, Mana
+
+PREFIX = 'simple_rpg'
+
+
+class Metrics:
+    def __init__(self):
+        self.counters = Counter()
+        self.histograms = {}
+
+    def inc(self, name, label='', amount=1):
+        self.counters[(name, label)] += amount
+
+    def observe(self, name, label, seconds):
+        histogram = self.histograms.get((name, label))
+        if histogram is None:
+            histogram = self.histograms[(name, label)] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def reset(self):
+        self.counters.clear()
+        self.histograms.clear()
+
+    def snapshot(self):
+        return {
+            'counters': {_key(name, label): value for (name, label), value in sorted(self.counters.items())},
+            'timings': {_key(name, label): histogram.summary()
+                        for (name, label), histogram in sorted(self.histograms.items())},
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self):
+        lines = []
+        for name in sorted({name for name, _ in self.counters}):
+            metric = f'{PREFIX}_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            for (counter_name, label), value in sorted(self.counters.items()):
+                if counter_name == name:
+                    lines.append(f'{metric}{_labels(label)} {value}')
+        for name in sorted({name for name, _ in self.histograms}):
+            metric = f'{PREFIX}_{name}_seconds'
+            lines.append(f'# TYPE {metric} histogram')
+            for (histogram_name, label), histogram in sorted(self.histograms.items()):
+                if histogram_name != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{_labels(label, le=f"{bound:.9g}")} {cumulative}')
+                lines.append(f'{metric}_bucket{_labels(label, le="+Inf")} {histogram.count}')
+                lines.append(f'{metric}_sum{_labels(label)} {histogram.total:.9g}')
+                lines.append(f'{metric}_count{_labels(label)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _key(name, label):
+    return f'{name}{{{label}}}' if label else name
+
+
+def _labels(label, **extra):
+    pairs = [f'class="{label}"'] if label else []
+    pairs.extend(f'{key}="{value}"' for key, value in extra.items())
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+registry = Metrics()
+_originals = []
+
+
+def enabled():
+    return bool(_originals)
+
+
+def _patch(owner, name, value):
+    _originals.append((owner, name, owner.__dict__[name]))
+    setattr(owner, name, value)
+
+
+def _instrument_change(metrics):
+    change = BaseStats.change
+
+    def instrumented_change(self, amount, percent=None):
+        label = type(self).__name__
+        old_value = self.settle()
+        start = perf_counter()
+        value = change(self, amount, percent)
+        metrics.observe('stats_change', label, perf_counter() - start)
+        metrics.inc('stats_change', label)
+        if self.rounding == fixed.ROUND:
+            raw = old_value + fixed.delta(amount, self.normal_value, percent)
+        elif percent:
+            raw = int(old_value + self.normal_value * amount / 100)
+        else:
+            raw = int(old_value + amount)
+        if raw != value:
+            metrics.inc('stats_change_clamped', label)
+        return value
+
+    _patch(BaseStats, 'change', instrumented_change)
+
+
+def _instrument_stat_value(metrics, stat_class):
+    stat_value = stat_class.__dict__['stat_value'].fget
+    label = stat_class.__name__
+
+    def instrumented_stat_value(self):
+        metrics.inc('stats_stat_value', label)
+        return stat_value(self)
+
+    _patch(stat_class, 'stat_value', property(instrumented_stat_value))
+
+
+def _instrument_check_value(metrics):
+    check_value = Mana.check_value
+
+    def instrumented_check_value(self, needed_mana):
+        result = check_value(self, needed_mana)
+        metrics.inc('mana_check_value')
+        if not result:
+            metrics.inc('mana_check_value_insufficient')
+        return result
+
+    _patch(Mana, 'check_value', instrumented_check_value)
+
+
+# DataPerson is patched once for every data race, the label is the concrete class
+def _instrument_actions(metrics, person_class):
+    hit, heal = person_class.hit, person_class.heal
+
+    def instrumented_hit(self, *args, **kwargs):
+        label = type(self).__name__
+        # settle() like check_value, without counting a stat_value read
+        hit_mana_cost = getattr(self, 'hit_mana_cost', 0)
+        if hit_mana_cost and self.mana.settle() < hit_mana_cost:
+            metrics.inc('person_hit_weak', label)
+        start = perf_counter()
+        damage = hit(self, *args, **kwargs)
+        metrics.observe('person_hit', label, perf_counter() - start)
+        metrics.inc('person_hit', label)
+        return damage
+
+    def instrumented_heal(self, *args, **kwargs):
+        label = type(self).__name__
+        start = perf_counter()
+        result = heal(self, *args, **kwargs)
+        metrics.observe('person_heal', label, perf_counter() - start)
+        metrics.inc('person_heal', label)
+        return result
+
+    _patch(person_class, 'hit', instrumented_hit)
+    _patch(person_class, 'heal', instrumented_heal)
+
+
+def _instrument_factory(metrics):
+    get_person = PersonFactory.get_person
+
+    def instrumented_get_person(name, *args, **kwargs):
+        start = perf_counter()
+        person = get_person(name, *args, **kwargs)
+        metrics.observe('factory_get_person', type(person).__name__, perf_counter() - start)
+        metrics.inc('factory_get_person', type(person).__name__)
+        return person
+
+    _patch(PersonFactory, 'get_person', staticmethod(instrumented_get_person))
+
+
+def enable(metrics=None):
+    global registry
+    if enabled():
+        return registry
+    if metrics is not None:
+        registry = metrics
+    _instrument_change(registry)
+    for stat_class in (HP, Stamina, Mana):
+        _instrument_stat_value(registry, stat_class)
+    _instrument_check_value(registry)
+    for person_class in (Human, Elf, DataPerson):
+        _instrument_actions(registry, person_class)
+    _instrument_factory(registry)
+    return registry
+
+
+def disable():
+    while _originals:
+        owner, name, value = _originals.pop()
+        setattr(owner, name, value)
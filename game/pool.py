@@ -0,0 +1,198 @@
+import numpy as np
+
+from game.fixed import ROUND
+from game.fixed_arrays import delta_array
+from game.stats import BaseStats, ZONE_EMPTY, ZONE_LOW, ZONE_NORMAL
+
+
+class StatPool:
+    def __init__(self, capacity=1024, low_level=None, rounding=None):
+        self.normal_values = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+        self.low_level = low_level
+        self.rounding = BaseStats.rounding if rounding is None else rounding
+        self.observers = []
+        # index -> attached view, and the regen of the views that regenerate
+        self.views = {}
+        self.regens = {}
+        self.bound = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self.size
+
+    def _reserve(self, count):
+        needed = self.size + count
+        capacity = len(self.values)
+        if needed <= capacity:
+            return
+        capacity = max(capacity * 2, needed, 1)
+        self.normal_values = np.resize(self.normal_values, capacity)
+        self.values = np.resize(self.values, capacity)
+        self.bound = np.concatenate([self.bound[:self.size], np.zeros(capacity - self.size, dtype=bool)])
+
+    def allocate(self, normal_value, value=None):
+        return int(self.allocate_many([normal_value], None if value is None else [value])[0])
+
+    def allocate_many(self, normal_values, values=None):
+        normal_values = np.asarray(normal_values, dtype=np.int64)
+        count = len(normal_values)
+        self._reserve(count)
+        indexes = np.arange(self.size, self.size + count)
+        self.normal_values[indexes] = normal_values
+        self.values[indexes] = normal_values if values is None else values
+        self.size += count
+        return indexes
+
+    def change(self, indexes, amounts, percent=None):
+        indexes = np.asarray(indexes, dtype=np.intp)
+        if len(np.unique(indexes)) != len(indexes):
+            raise ValueError('Pool change indexes must be unique')
+        if self.regens:
+            for index in self.regens.keys() & set(indexes.tolist()):
+                self.views[index].settle()
+
+        values = self.values[indexes]
+        normal_values = self.normal_values[indexes]
+        amounts = np.asarray(amounts)
+        if self.rounding == ROUND:
+            raw = values + delta_array(amounts, normal_values, percent)
+        elif percent:
+            raw = values + normal_values * amounts / 100
+        else:
+            raw = values + amounts
+        if raw.dtype.kind == 'f':
+            raw = np.trunc(raw).astype(np.int64)
+
+        new_values = np.clip(raw, 0, normal_values)
+        self.values[indexes] = new_values
+        if self.views:
+            self._notify_views(indexes, values, new_values)
+        if self.low_level is not None and self.observers:
+            plain = ~self.bound[indexes]
+            if plain.any():
+                self._notify(indexes[plain], self.zones(values[plain], normal_values[plain]),
+                             self.zones(new_values[plain], normal_values[plain]))
+        return new_values
+
+    # attached views notify like BaseStats.change, the pool observers hear about them through the view
+    def _notify_views(self, indexes, values, new_values):
+        for i in np.flatnonzero(self.bound[indexes] & (new_values != values)).tolist():
+            view = self.views[int(indexes[i])]
+            if view.low_level is not None:
+                view._notify(int(values[i]), int(new_values[i]))
+
+    def zones(self, values, normal_values):
+        low_values = (normal_values * self.low_level / 100).astype(np.int64)
+        return np.where(values == 0, ZONE_EMPTY, np.where(values < low_values, ZONE_LOW, ZONE_NORMAL))
+
+    def _notify(self, indexes, old_zones, new_zones):
+        while True:
+            crossing = old_zones != new_zones
+            if not crossing.any():
+                return
+            next_zones = old_zones + np.sign(new_zones - old_zones)
+            for callback in self.observers:
+                callback(indexes[crossing], old_zones[crossing], next_zones[crossing])
+            old_zones = np.where(crossing, next_zones, old_zones)
+
+    def subscribe(self, callback):
+        self.observers.append(callback)
+
+    def unsubscribe(self, callback):
+        self.observers.remove(callback)
+
+    def attach(self, stat):
+        stat.settle()
+        index = self.allocate(stat.normal_value, stat._value)
+        view = view_class(type(stat))(self, index)
+        self.views[index] = view
+        self.bound[index] = True
+        view.race_multiplier = stat.race_multiplier
+        view._observers = stat._observers
+        view._regen = stat._regen
+        return view
+
+    # the slot keeps its last values but is no longer tied to a stat
+    def detach(self, view):
+        view.settle()
+        stat = object.__new__(type(view).__bases__[1])
+        stat.race_multiplier = view.race_multiplier
+        stat.normal_value = view.normal_value
+        stat._value = view._value
+        stat._observers = view._observers
+        stat._regen = view._regen
+        view._regen = None
+        del self.views[view.index]
+        self.bound[view.index] = False
+        return stat
+
+
+class StatView:
+    __slots__ = ()
+
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+        self._observers = None
+        self._regen = None
+
+    @property
+    def _regen(self):
+        return self.pool.regens.get(self.index)
+
+    @_regen.setter
+    def _regen(self, regen):
+        if regen is None:
+            self.pool.regens.pop(self.index, None)
+        else:
+            self.pool.regens[self.index] = regen
+
+    def _crossed(self, old_zone, new_zone):
+        super()._crossed(old_zone, new_zone)
+        if self.pool.observers:
+            indexes = np.array([self.index])
+            for callback in self.pool.observers:
+                callback(indexes, np.array([old_zone]), np.array([new_zone]))
+
+    @property
+    def normal_value(self):
+        return int(self.pool.normal_values[self.index])
+
+    @normal_value.setter
+    def normal_value(self, value):
+        self.pool.normal_values[self.index] = value
+
+    @property
+    def _value(self):
+        return int(self.pool.values[self.index])
+
+    @_value.setter
+    def _value(self, value):
+        self.pool.values[self.index] = value
+
+
+_view_classes = {}
+
+
+def view_class(stat_class):
+    if not issubclass(stat_class, BaseStats):
+        raise TypeError(f'{stat_class.__name__} is not a stat class')
+    if issubclass(stat_class, StatView):
+        stat_class = next(cls for cls in stat_class.__mro__[1:] if not issubclass(cls, StatView))
+    if stat_class not in _view_classes:
+        _view_classes[stat_class] = type(f'Pooled{stat_class.__name__}', (StatView, stat_class),
+                                         {'__slots__': ('pool', 'index')})
+    return _view_classes[stat_class]
+
+
+def bind_person(person, hp_pool, mana_pool):
+    person.hp = hp_pool.attach(person.hp)
+    person.mana = mana_pool.attach(person.mana)
+    return person
+
+
+def unbind_person(person):
+    person.hp = person.hp.pool.detach(person.hp)
+    person.mana = person.mana.pool.detach(person.mana)
+    return person
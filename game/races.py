@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import re
+from collections import namedtuple
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+from game.curves import multiply_value
+from game.factory import AbstractPerson, PersonFactory
+from game.stats import BaseStats
+
+SPEC_VERSION = 1
+# on-disk cache of validated specs, cache_dir=None turns it off
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                                 'simple_rpg', 'races')
+
+REQUIRED_FIELDS = ('base_hit', 'base_heal', 'base_heal_cost', 'hp_multiplier', 'stamina_multiplier', 'mana_multiplier')
+OPTIONAL_FIELDS = ('hit_mana_cost',)
+SCALABLE_FIELDS = ('base_hit', 'base_heal', 'base_heal_cost', 'hit_mana_cost')
+BEHAVIOUR_DEFAULTS = {'hit_heal_factor': 0, 'weak_hit_factor': 1}
+NAME_PATTERN = re.compile(r'^[a-z][a-z0-9_]*$')
+
+RaceSpec = namedtuple('RaceSpec', ['name', 'characteristics', 'scaled', 'hit_heal_factor', 'weak_hit_factor'])
+
+
+class RaceSpecError(ValueError):
+    pass
+
+
+class DataPerson(AbstractPerson):
+    __slots__ = ()
+    hit_heal_factor = 0
+    weak_hit_factor = 1
+    hit_mana_cost = 0
+
+    def __init__(self, level=1, *args, **kwargs):
+        super().__init__(level=level, *args, **kwargs)
+        self.scale_characteristics()
+
+    def hit(self, roller=None, *args, **kwargs):
+        if self.hit_heal_factor:
+            self.hp.change(multiply_value(self.base_heal, self.hit_heal_factor, BaseStats.rounding))
+        if not self.hit_mana_cost:
+            damage = self.base_hit
+        elif self.mana.check_value(self.hit_mana_cost):
+            self.mana.change(-self.hit_mana_cost)
+            damage = self.base_hit
+        else:
+            self.mana.change(-self.hit_mana_cost)
+            damage = multiply_value(self.base_hit, self.weak_hit_factor, BaseStats.rounding)
+        if roller is None:
+            return damage
+        return roller.damage(damage)
+
+    def heal(self):
+        self.mana.change(-self.base_heal_cost)
+        self.hp.change(self.base_heal)
+
+
+def _number(name, field, value, minimum=0):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise RaceSpecError(f'{name}.{field} must be a number, got {value!r}')
+    if value < minimum:
+        raise RaceSpecError(f'{name}.{field} must be >= {minimum}, got {value!r}')
+    # stamina and mana may be 0, a race without HP would be dead on spawn
+    if field == 'hp_multiplier' and value <= 0:
+        raise RaceSpecError(f'{name}.{field} must be > 0, got {value!r}')
+    return value
+
+
+def validate(name, definition):
+    if not isinstance(name, str) or not NAME_PATTERN.match(name):
+        raise RaceSpecError(f'Invalid race name {name!r}')
+    if not isinstance(definition, dict):
+        raise RaceSpecError(f'{name} must be a table of fields')
+
+    unknown = set(definition) - set(REQUIRED_FIELDS) - set(OPTIONAL_FIELDS) - set(BEHAVIOUR_DEFAULTS) - {'scaled'}
+    if unknown:
+        raise RaceSpecError(f'{name} has unknown fields: {", ".join(sorted(unknown))}')
+    missing = [field for field in REQUIRED_FIELDS if field not in definition]
+    if missing:
+        raise RaceSpecError(f'{name} is missing fields: {", ".join(missing)}')
+
+    characteristics = {field: _number(name, field, definition[field])
+                       for field in REQUIRED_FIELDS + OPTIONAL_FIELDS if field in definition}
+    behaviour = {field: _number(name, field, definition.get(field, default))
+                 for field, default in BEHAVIOUR_DEFAULTS.items()}
+
+    scaled = definition.get('scaled', [field for field in SCALABLE_FIELDS if field in characteristics])
+    if not isinstance(scaled, list) or any(field not in SCALABLE_FIELDS for field in scaled):
+        raise RaceSpecError(f'{name}.scaled must list fields out of {", ".join(SCALABLE_FIELDS)}')
+    absent = [field for field in scaled if field not in characteristics]
+    if absent:
+        raise RaceSpecError(f'{name}.scaled lists undefined fields: {", ".join(absent)}')
+
+    return RaceSpec(name, characteristics, tuple(scaled), **behaviour)
+
+
+def compile_spec(spec):
+    attributes = {
+        '__slots__': spec.scaled,
+        'race': spec.name,
+        'scaled_characteristics': spec.scaled,
+        'hit_heal_factor': spec.hit_heal_factor,
+        'weak_hit_factor': spec.weak_hit_factor,
+        'characteristics': dict(spec.characteristics),
+    }
+    return type(spec.name.title().replace('_', ''), (DataPerson,), attributes)
+
+
+def parse(path, data):
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise RaceSpecError('TOML race files need Python 3.11+')
+        return tomllib.loads(data.decode())
+    return json.loads(data)
+
+
+def _valid_cached(spec):
+    return (isinstance(spec.name, str) and all(field in spec.characteristics for field in REQUIRED_FIELDS)
+            and all(field in SCALABLE_FIELDS for field in spec.scaled))
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path) as stream:
+            cached = json.load(stream)
+        specs = [RaceSpec(name, dict(characteristics), tuple(scaled), hit_heal_factor, weak_hit_factor)
+                 for name, characteristics, scaled, hit_heal_factor, weak_hit_factor in cached]
+    except (OSError, TypeError, ValueError):
+        return None
+    # a damaged cache file is rebuilt from the race file
+    if not all(map(_valid_cached, specs)):
+        return None
+    return specs
+
+
+def _write_cache(cache_path, specs):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as stream:
+        json.dump([list(spec) for spec in specs], stream)
+    os.replace(tmp_path, cache_path)
+
+
+def load_specs(path, cache_dir=DEFAULT_CACHE_DIR):
+    with open(path, 'rb') as stream:
+        data = stream.read()
+
+    cache_path = None
+    if cache_dir is not None:
+        digest = hashlib.sha256(b'%d:' % SPEC_VERSION + data).hexdigest()
+        cache_path = os.path.join(cache_dir, f'{digest}.json')
+        specs = _read_cache(cache_path)
+        if specs is not None:
+            return specs
+
+    definitions = parse(path, data)
+    if not isinstance(definitions, dict):
+        raise RaceSpecError(f'{path} must map race names to definitions')
+    specs = [validate(name, definition) for name, definition in definitions.items()]
+
+    if cache_path is not None:
+        try:
+            _write_cache(cache_path, specs)
+        except OSError:
+            pass
+    return specs
+
+
+def _registered(name):
+    try:
+        PersonFactory.get_person_class(name)
+    except NotImplementedError:
+        return False
+    return True
+
+
+def load_races(path, cache_dir=DEFAULT_CACHE_DIR, replace=False):
+    specs = load_specs(path, cache_dir)
+    if not replace:
+        taken = [spec.name for spec in specs if _registered(spec.name)]
+        if taken:
+            raise RaceSpecError(f'Races already registered: {", ".join(taken)}')
+    return {spec.name: PersonFactory.register(spec.name, compile_spec(spec), replace=True) for spec in specs}
+
+
+def race_spec(person_class):
+    return RaceSpec(person_class.race, dict(person_class.characteristics), tuple(person_class.scaled_characteristics),
+                    person_class.hit_heal_factor, person_class.weak_hit_factor)
+
+
+def registered_specs():
+    return [race_spec(person_class) for person_class in PersonFactory.person_classes().values()
+            if issubclass(person_class, DataPerson)]
+
+
+# for worker processes, races that are already registered with the same spec are kept
+def register_specs(specs):
+    classes = PersonFactory.person_classes()
+    for spec in specs:
+        person_class = classes.get(spec.name)
+        if person_class is None or not issubclass(person_class, DataPerson) or race_spec(person_class) != spec:
+            PersonFactory.register(spec.name, compile_spec(spec), replace=True)
@@ -0,0 +1,130 @@
+import struct
+
+from game.factory import PersonFactory
+
+MAGIC = b'SRPGLOG'
+VERSION = 2
+# magic, version and the size of the race name table that follows the header
+HEADER = struct.Struct('<7sBI')
+RECORD = struct.Struct('<IIIB3xdqq')
+
+SPAWN = 0
+HIT = 1
+DAMAGE = 2
+HEAL = 3
+
+
+class ReplayError(Exception):
+    pass
+
+
+class CombatRecorder:
+    def __init__(self, chunk_records=4096):
+        self.chunk_size = chunk_records * RECORD.size
+        self.buffer = bytearray(self.chunk_size)
+        self.offset = 0
+        self.actors = {}
+        # spawn records carry codes local to the log, the names go into the header
+        self.race_codes = {}
+
+    def __len__(self):
+        return self.offset // RECORD.size
+
+    def _append(self, tick, actor_id, target, action, amount, person):
+        if self.offset + RECORD.size > len(self.buffer):
+            self.buffer.extend(bytes(self.chunk_size))
+        RECORD.pack_into(self.buffer, self.offset, tick, actor_id, target, action, amount,
+                         person.hp._value, person.mana._value)
+        self.offset += RECORD.size
+
+    def register(self, person, tick=0):
+        actor_id = self.actors[id(person)] = len(self.actors)
+        race_code = self.race_codes.setdefault(person.race, len(self.race_codes))
+        self._append(tick, actor_id, race_code, SPAWN, person.level, person)
+        return actor_id
+
+    def hit(self, actor, target, tick=0, roller=None):
+        actor_id, target_id = self.actors[id(actor)], self.actors[id(target)]
+        damage = actor.hit() if roller is None else actor.hit(roller)
+        self._append(tick, actor_id, target_id, HIT, damage, actor)
+        target.hp.change(-damage)
+        self._append(tick, target_id, actor_id, DAMAGE, damage, target)
+        return damage
+
+    def heal(self, actor, tick=0):
+        actor.heal()
+        actor_id = self.actors[id(actor)]
+        self._append(tick, actor_id, actor_id, HEAL, actor.base_heal, actor)
+
+    def header(self):
+        races = '\n'.join(self.race_codes).encode()
+        return HEADER.pack(MAGIC, VERSION, len(races)) + races
+
+    def getvalue(self):
+        return self.header() + memoryview(self.buffer)[:self.offset]
+
+    def write(self, stream):
+        stream.write(self.header())
+        stream.write(memoryview(self.buffer)[:self.offset])
+
+
+def read_races(stream):
+    header = stream.read(HEADER.size)
+    if len(header) != HEADER.size:
+        raise ReplayError('Combat log is truncated')
+    magic, version, races_size = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ReplayError(f'Unsupported combat log {magic!r} version {version}')
+    races = stream.read(races_size)
+    if len(races) != races_size:
+        raise ReplayError('Combat log is truncated')
+    return races.decode().split('\n') if races else []
+
+
+def _records(stream, chunk_records):
+    while True:
+        chunk = stream.read(chunk_records * RECORD.size)
+        if len(chunk) % RECORD.size:
+            raise ReplayError('Combat log is truncated')
+        if not chunk:
+            return
+        yield from RECORD.iter_unpack(chunk)
+
+
+def read_records(stream, chunk_records=4096):
+    read_races(stream)
+    yield from _records(stream, chunk_records)
+
+
+# rolled hits replay with rollers that start where the recorded ones did, keyed by actor id
+def replay(stream, rollers=None):
+    rollers = rollers or {}
+    races = read_races(stream)
+    persons = {}
+    for tick, actor_id, target, action, amount, hp, mana in _records(stream, 4096):
+        if action == SPAWN:
+            if target >= len(races):
+                raise ReplayError(f'Tick {tick}: race code {target}, the log has {len(races)} races')
+            try:
+                person = persons[actor_id] = PersonFactory.get_person(races[target], int(amount))
+            except NotImplementedError as error:
+                raise ReplayError(f'Tick {tick}: {error}')
+        elif action == HIT:
+            person = persons[actor_id]
+            roller = rollers.get(actor_id)
+            damage = person.hit() if roller is None else person.hit(roller)
+            if damage != amount:
+                raise ReplayError(f'Tick {tick}: actor {actor_id} hit for {damage}, log has {amount}')
+        elif action == DAMAGE:
+            person = persons[actor_id]
+            person.hp.change(-amount)
+        elif action == HEAL:
+            person = persons[actor_id]
+            person.heal()
+        else:
+            raise ReplayError(f'Tick {tick}: unknown action {action}')
+
+        if (person.hp._value, person.mana._value) != (hp, mana):
+            raise ReplayError(f'Tick {tick}: actor {actor_id} has HP/Mana {person.hp._value}/{person.mana._value}, '
+                              f'log has {hp}/{mana}')
+    return persons
@@ -0,0 +1,101 @@
+from collections import namedtuple
+
+import numpy as np
+
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+MIX_1 = 0xBF58476D1CE4E5B9
+MIX_2 = 0x94D049BB133111EB
+UNIT = 2.0 ** -53
+
+DRAWS_PER_HIT = 2
+
+CombatOdds = namedtuple('CombatOdds', ['miss', 'crit', 'crit_multiplier', 'variance'])
+DEFAULT_ODDS = CombatOdds(miss=0.05, crit=0.1, crit_multiplier=2.0, variance=0.1)
+
+
+def mix64(value):
+    value &= MASK64
+    value = ((value ^ (value >> 30)) * MIX_1) & MASK64
+    value = ((value ^ (value >> 27)) * MIX_2) & MASK64
+    return value ^ (value >> 31)
+
+
+def mix64_array(values):
+    values = np.array(values, dtype=np.uint64, ndmin=1)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(MIX_1)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(MIX_2)
+    return values ^ (values >> np.uint64(31))
+
+
+def stream_key(seed, *path):
+    key = mix64(seed)
+    for part in path:
+        key = mix64(key ^ mix64(part))
+    return key
+
+
+def stream_keys(seed, *path):
+    keys = np.array(mix64(seed), dtype=np.uint64, ndmin=1)
+    for part in path:
+        keys = mix64_array(keys ^ mix64_array(np.asarray(part, dtype=np.int64).astype(np.uint64)))
+    return keys
+
+
+def uniform(key, counter):
+    return (mix64(key + (counter + 1) * GOLDEN_GAMMA) >> 11) * UNIT
+
+
+def uniforms(keys, counters):
+    counters = np.asarray(counters, dtype=np.int64).astype(np.uint64)
+    values = np.asarray(keys, dtype=np.uint64) + (counters + np.uint64(1)) * np.uint64(GOLDEN_GAMMA)
+    return (mix64_array(values) >> np.uint64(11)).astype(np.float64) * UNIT
+
+
+def roll_damage(odds, damage, outcome, spread):
+    if outcome < odds.miss:
+        return 0
+    if odds.variance:
+        damage *= 1 + odds.variance * (2 * spread - 1)
+    if outcome < odds.miss + odds.crit:
+        damage *= odds.crit_multiplier
+    return damage
+
+
+def roll_damages(odds, damages, outcomes, spreads):
+    damages = np.asarray(damages, dtype=np.float64)
+    if odds.variance:
+        damages = damages * (1 + odds.variance * (2 * spreads - 1))
+    damages = np.where(outcomes < odds.miss + odds.crit, damages * odds.crit_multiplier, damages)
+    return np.where(outcomes < odds.miss, 0.0, damages)
+
+
+class RandomStream:
+    __slots__ = ('key', 'counter')
+
+    def __init__(self, seed, *path):
+        self.key = stream_key(seed, *path)
+        self.counter = 0
+
+    def random(self):
+        value = uniform(self.key, self.counter)
+        self.counter += 1
+        return value
+
+    def split(self, *path):
+        return type(self)(self.key, *path)
+
+
+class CombatRoller(RandomStream):
+    __slots__ = ('odds',)
+
+    def __init__(self, seed, *path, odds=DEFAULT_ODDS):
+        super().__init__(seed, *path)
+        self.odds = odds
+
+    def split(self, *path):
+        return type(self)(self.key, *path, odds=self.odds)
+
+    def damage(self, damage):
+        outcome, spread = self.random(), self.random()
+        return roll_damage(self.odds, damage, outcome, spread)
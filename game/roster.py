@@ -0,0 +1,158 @@
+import sqlite3
+
+from game.factory import PersonFactory
+
+DEFAULT_PAGE_SIZE = 1000
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS persons (
+    id INTEGER PRIMARY KEY,
+    race TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    hp INTEGER NOT NULL,
+    mana INTEGER NOT NULL
+)
+'''
+INSERT = 'INSERT INTO persons (race, level, hp, mana) VALUES (?, ?, ?, ?)'
+UPDATE = 'UPDATE persons SET level = ?, hp = ?, mana = ? WHERE id = ?'
+SELECT = 'SELECT id, race, level, hp, mana FROM persons'
+
+
+class RosterError(Exception):
+    pass
+
+
+def _state(person):
+    return person.level, person.hp.settle(), person.mana.settle()
+
+
+class PersonHandle:
+    __slots__ = ('roster', 'id', 'race', 'level', 'hp_value', 'mana_value')
+
+    def __init__(self, roster, person_id, race, level, hp, mana):
+        self.roster = roster
+        self.id = person_id
+        self.race = race
+        self.level = level
+        self.hp_value = hp
+        self.mana_value = mana
+
+    @property
+    def hydrated(self):
+        return self.id in self.roster.tracked
+
+    @property
+    def person(self):
+        return self.roster.hydrate(self)
+
+    def __getattr__(self, name):
+        return getattr(self.person, name)
+
+    def __repr__(self):
+        return f'<PersonHandle {self.id} {self.race} level {self.level}>'
+
+
+class Roster:
+    def __init__(self, path, page_size=DEFAULT_PAGE_SIZE, journal_mode='wal'):
+        self.page_size = page_size
+        self.connection = sqlite3.connect(path)
+        self.journal_mode = self.connection.execute(f'PRAGMA journal_mode={journal_mode}').fetchone()[0]
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        with self.connection:
+            self.connection.execute(SCHEMA)
+        # person id -> [person, level, hp, mana] as last written to the database
+        self.tracked = {}
+        self.written = 0
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM persons').fetchone()[0]
+
+    def add_many(self, persons):
+        persons = list(persons)
+        states = [_state(person) for person in persons]
+        with self.connection:
+            # take the write lock before reading MAX(id), another writer cannot take the same ids
+            self.connection.execute('BEGIN IMMEDIATE')
+            first_id = self.connection.execute('SELECT COALESCE(MAX(id), 0) + 1 FROM persons').fetchone()[0]
+            self.connection.executemany(INSERT, [(person.race, *state) for person, state in zip(persons, states)])
+        ids = range(first_id, first_id + len(persons))
+        for person_id, person, state in zip(ids, persons, states):
+            self.tracked[person_id] = [person, *state]
+        self.written += len(persons)
+        return list(ids)
+
+    def add(self, person):
+        return self.add_many([person])[0]
+
+    def _handles(self, rows):
+        return [PersonHandle(self, *row) for row in rows]
+
+    def get(self, person_id):
+        row = self.connection.execute(f'{SELECT} WHERE id = ?', (person_id,)).fetchone()
+        if row is None:
+            raise RosterError(f'No person with id {person_id}')
+        return PersonHandle(self, *row)
+
+    def query(self, where=None, params=(), page_size=None):
+        page_size = page_size or self.page_size
+        condition = f'AND ({where})' if where else ''
+        last_id = 0
+        while True:
+            rows = self.connection.execute(f'{SELECT} WHERE id > ? {condition} ORDER BY id LIMIT ?',
+                                           (last_id, *params, page_size)).fetchall()
+            yield from self._handles(rows)
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1][0]
+
+    def hydrate(self, handle):
+        entry = self.tracked.get(handle.id)
+        if entry is not None:
+            return entry[0]
+        person = PersonFactory.get_person(handle.race, handle.level)
+        person.hp._value = max(0, min(handle.hp_value, person.hp.normal_value))
+        person.mana._value = max(0, min(handle.mana_value, person.mana.normal_value))
+        self.tracked[handle.id] = [person, handle.level, handle.hp_value, handle.mana_value]
+        return person
+
+    def dirty(self):
+        for person_id, entry in self.tracked.items():
+            state = _state(entry[0])
+            if state[0] != entry[1] or state[1] != entry[2] or state[2] != entry[3]:
+                yield person_id, state
+
+    def flush(self):
+        return self._write(list(self.dirty()))
+
+    def _write(self, changes):
+        if not changes:
+            return 0
+        with self.connection:
+            self.connection.executemany(UPDATE, [(*state, person_id) for person_id, state in changes])
+        tracked = self.tracked
+        for person_id, state in changes:
+            tracked[person_id][1:] = state
+        self.written += len(changes)
+        return len(changes)
+
+    # unsaved changes to the person are written before it is dropped
+    def release(self, person_id):
+        entry = self.tracked.get(person_id)
+        if entry is None:
+            return False
+        state = _state(entry[0])
+        if state != tuple(entry[1:]):
+            self._write([(person_id, state)])
+        del self.tracked[person_id]
+        return True
+
+    def close(self, flush=True):
+        if flush:
+            self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        self.close(flush=exc_type is None)
@@ -0,0 +1,127 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+from game.histogram import LatencyHistogram
+
+
+class ScheduledAction:
+    __slots__ = ('actor', 'action', 'cooldown', 'due', 'cancelled', 'scheduler')
+
+    def __init__(self, actor, action, cooldown, due, scheduler=None):
+        self.actor = actor
+        self.action = action
+        self.cooldown = cooldown
+        self.due = due
+        self.cancelled = False
+        self.scheduler = scheduler
+
+    def cancel(self):
+        if self.cancelled:
+            return
+        self.cancelled = True
+        if self.scheduler is not None:
+            self.scheduler._unscheduled(self)
+
+
+class TickScheduler:
+    def __init__(self, tick_interval=0.05, max_actions_per_tick=None, clock=time.perf_counter):
+        self.tick_interval = tick_interval
+        self.max_actions_per_tick = max_actions_per_tick
+        self.action_budget = max_actions_per_tick
+        self.clock = clock
+        self.tick = 0
+        # actor -> number of live scheduled actions
+        self.actors = {}
+        self._live = 0
+        self.histogram = LatencyHistogram()
+        self.overruns = 0
+        self.throttled = 0
+        self._queue = []
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return self._live
+
+    def schedule(self, actor, action, cooldown=1, delay=0):
+        scheduled = ScheduledAction(actor, action, cooldown, self.tick + delay, self)
+        self.actors[actor] = self.actors.get(actor, 0) + 1
+        self._live += 1
+        heapq.heappush(self._queue, (scheduled.due, next(self._sequence), scheduled))
+        return scheduled
+
+    def _unscheduled(self, scheduled):
+        self._live -= 1
+        count = self.actors[scheduled.actor] - 1
+        if count:
+            self.actors[scheduled.actor] = count
+        else:
+            del self.actors[scheduled.actor]
+
+    def remove(self, actor):
+        if actor not in self.actors:
+            return
+        for _, _, scheduled in self._queue:
+            if scheduled.actor is actor:
+                scheduled.cancel()
+        # drop cancelled entries once they outnumber the live ones
+        if len(self._queue) > 2 * self._live:
+            self._queue = [entry for entry in self._queue if not entry[2].cancelled]
+            heapq.heapify(self._queue)
+
+    def run_tick(self):
+        queue = self._queue
+        budget = self.action_budget
+        executed = 0
+        start = self.clock()
+
+        # an action that raises is dropped, the tick still ends and the error reaches the caller
+        try:
+            while queue and queue[0][0] <= self.tick:
+                if budget is not None and executed >= budget:
+                    self.throttled += 1
+                    break
+                _, _, scheduled = heapq.heappop(queue)
+                if scheduled.cancelled:
+                    continue
+                executed += 1
+                try:
+                    result = scheduled.action(scheduled.actor)
+                except BaseException:
+                    scheduled.cancel()
+                    raise
+                if result is False or not scheduled.cooldown:
+                    scheduled.cancel()
+                else:
+                    scheduled.due = self.tick + scheduled.cooldown
+                    heapq.heappush(queue, (scheduled.due, next(self._sequence), scheduled))
+        finally:
+            elapsed = self.clock() - start
+            self.histogram.record(elapsed)
+            self._adjust_budget(elapsed, executed)
+            self.tick += 1
+        return executed
+
+    def _adjust_budget(self, elapsed, executed):
+        if elapsed > self.tick_interval:
+            self.overruns += 1
+            self.action_budget = max(1, executed // 2)
+        elif self.action_budget is not None and executed >= self.action_budget:
+            self.action_budget += max(1, self.action_budget // 4)
+            if self.max_actions_per_tick is not None:
+                self.action_budget = min(self.action_budget, self.max_actions_per_tick)
+
+    async def run(self, ticks=None):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        count = 0
+        while ticks is None or count < ticks:
+            self.run_tick()
+            count += 1
+            next_tick += self.tick_interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
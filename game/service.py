@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import itertools
+import json
+
+from game import events
+from game.factory import PersonFactory
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+BATCH_WINDOW = 0.002
+MAX_BATCH = 1024
+POOL_SIZE = 4
+MAX_LEVEL = 1000
+
+
+class ServiceError(Exception):
+    pass
+
+
+def _state(person_id, person):
+    return {'person': person_id, 'race': person.race, 'level': person.level,
+            'hp': person.hp.stat_value, 'mana': person.mana.stat_value}
+
+
+class CombatServer:
+    def __init__(self, batch_window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.persons = {}
+        self._ids = itertools.count(1)
+        self._queue = None
+        self._server = None
+        self._batcher = None
+        self.requests = 0
+        self.batches = 0
+
+    def _person(self, request, key):
+        person = self.persons.get(request.get(key))
+        if person is None:
+            raise ServiceError(f'Unknown {key} {request.get(key)!r}')
+        return person
+
+    def op_spawn(self, request):
+        race, level = request['race'], request.get('level', 1)
+        if not isinstance(race, str):
+            raise ServiceError(f'Bad race {race!r}')
+        if type(level) is not int or not 1 <= level <= MAX_LEVEL:
+            raise ServiceError(f'Level must be an integer from 1 to {MAX_LEVEL}, got {level!r}')
+        try:
+            person = PersonFactory.get_person(race, level)
+        except NotImplementedError as error:
+            raise ServiceError(str(error))
+        person_id = next(self._ids)
+        self.persons[person_id] = person
+        return _state(person_id, person)
+
+    def op_hit(self, request):
+        actor, target = self._person(request, 'actor'), self._person(request, 'target')
+        damage = actor.hit()
+        hp = target.hp.change(-damage)
+        return {'damage': damage, 'hp': hp, 'dead': hp == 0}
+
+    def op_heal(self, request):
+        actor = self._person(request, 'actor')
+        actor.heal()
+        return {'hp': actor.hp.stat_value, 'mana': actor.mana.stat_value}
+
+    def op_get(self, request):
+        return _state(request['person'], self._person(request, 'person'))
+
+    def op_remove(self, request):
+        person = self._person(request, 'person')
+        del self.persons[request['person']]
+        PersonFactory.recycle(person)
+        return {}
+
+    def apply(self, request):
+        handler = getattr(self, f'op_{request.get("op")}', None)
+        response = {'id': request.get('id')}
+        if handler is None:
+            response.update(ok=False, error=f'Unknown op {request.get("op")!r}')
+            return response
+        try:
+            response.update(handler(request), ok=True)
+        except ServiceError as error:
+            response.update(ok=False, error=str(error))
+        # one bad request must not take the batcher down with it
+        except Exception as error:
+            response.update(ok=False, error=f'{type(error).__name__}: {error}')
+        return response
+
+    def apply_batch(self, batch):
+        self.batches += 1
+        self.requests += len(batch)
+        touched = set()
+        for writer, request, response in batch:
+            if response is None:
+                response = self.apply(request)
+            if not writer.is_closing():
+                writer.write(json.dumps(response).encode() + b'\n')
+                touched.add(writer)
+        return touched
+
+    async def _run_batches(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            for writer in self.apply_batch(batch):
+                if not writer.is_closing():
+                    await writer.drain()
+
+    async def _handle(self, reader, writer):
+        try:
+            async for line in reader:
+                request, response = None, None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError('request must be a JSON object')
+                except ValueError as error:
+                    response = {'id': None, 'ok': False, 'error': f'Bad request: {error}'}
+                await self._queue.put((writer, request, response))
+        finally:
+            writer.close()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.ensure_future(self._run_batches())
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        await self.start(host, port)
+        await self._server.serve_forever()
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    async def _receive(self):
+        try:
+            async for line in self.reader:
+                response = json.loads(line)
+                future = self.pending.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('Connection closed'))
+            self.pending.clear()
+
+    def send(self, request_id, request):
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        return future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self._receiver
+
+
+class CombatClient:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, pool_size=POOL_SIZE):
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self.connections = []
+        self._ids = itertools.count(1)
+        self._next = itertools.cycle(range(pool_size))
+
+    async def connect(self):
+        for _ in range(self.pool_size - len(self.connections)):
+            self.connections.append(Connection(*await asyncio.open_connection(self.host, self.port)))
+        return self
+
+    async def request(self, op, **fields):
+        if not self.connections:
+            await self.connect()
+        request_id = next(self._ids)
+        response = await self.connections[next(self._next)].send(request_id, {'id': request_id, 'op': op, **fields})
+        if not response['ok']:
+            raise ServiceError(response['error'])
+        return response
+
+    async def spawn(self, race, level=1):
+        return (await self.request('spawn', race=race, level=level))['person']
+
+    async def hit(self, actor, target):
+        return await self.request('hit', actor=actor, target=target)
+
+    async def heal(self, actor):
+        return await self.request('heal', actor=actor)
+
+    async def get(self, person):
+        return await self.request('get', person=person)
+
+    async def remove(self, person):
+        return await self.request('remove', person=person)
+
+    async def close(self):
+        connections, self.connections = self.connections, []
+        for connection in connections:
+            await connection.close()
+
+    async def __aenter__(self):
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Line-delimited JSON combat resolution service')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--batch-window', type=float, default=BATCH_WINDOW, help='seconds to collect a batch')
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    args = parser.parse_args(argv)
+
+    events.set_sink(events.NullSink())
+    server = CombatServer(args.batch_window, args.max_batch)
+    try:
+        asyncio.run(server.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+from collections import namedtuple
+
+import numpy as np
+
+from game.curves import curves, multiply_value, scale_value
+from game.factory import BASE_CHARACTERISTICS, LEVEL_INCREASING_FACTOR, PersonFactory
+from game.pool import StatPool
+from game.rng import DRAWS_PER_HIT, roll_damages, stream_keys, uniforms
+from game.stats import BaseStats, BASE_HP, HP_LEVEL_INCREASING, BASE_MANA, MANA_LEVEL_INCREASING
+
+MAX_TURNS = 1000
+HEAL_BELOW = 30
+DRAW = -1
+
+RaceParameters = namedtuple('RaceParameters', [
+    'hp', 'mana', 'base_hit', 'base_heal', 'base_heal_cost', 'hit_mana_cost', 'hit_heal_factor', 'weak_hit_factor',
+    'hit_heal', 'weak_hit'
+])
+DuelResults = namedtuple('DuelResults', ['winners', 'turns', 'hp', 'mana'])
+
+_stats = BaseStats()
+
+
+def race_parameters(race, level, characteristics=None, level_factor=LEVEL_INCREASING_FACTOR):
+    person_class = PersonFactory.get_person_class(race)
+    template = person_class.template
+    characteristics = characteristics or BASE_CHARACTERISTICS
+    # data races keep their characteristics on their template
+    characteristics = characteristics[race] if race in characteristics else template.characteristics
+    rounding = BaseStats.rounding
+    # fields out of scaled_characteristics stay constant, as they do on the person
+    scaled = person_class.scaled_characteristics
+    if characteristics == template.characteristics and level_factor == LEVEL_INCREASING_FACTOR:
+        values = dict(zip(scaled, template.row(level)))
+    else:
+        level_increasing_factor = curves.factor(level_factor, rounding)[level]
+        values = {field: scale_value(characteristics[field], level_increasing_factor, rounding) for field in scaled}
+    values = dict(characteristics, **values)
+    hit_heal_factor = getattr(person_class, 'hit_heal_factor', 0)
+    weak_hit_factor = getattr(person_class, 'weak_hit_factor', 1)
+    return RaceParameters(
+        hp=_stats.get_normal_value(BASE_HP, HP_LEVEL_INCREASING, characteristics['hp_multiplier'], level),
+        mana=_stats.get_normal_value(BASE_MANA, MANA_LEVEL_INCREASING, characteristics['mana_multiplier'], level),
+        base_hit=values['base_hit'],
+        base_heal=values['base_heal'],
+        base_heal_cost=values['base_heal_cost'],
+        hit_mana_cost=values.get('hit_mana_cost', 0),
+        hit_heal_factor=hit_heal_factor,
+        weak_hit_factor=weak_hit_factor,
+        hit_heal=multiply_value(values['base_heal'], hit_heal_factor, rounding),
+        weak_hit=multiply_value(values['base_hit'], weak_hit_factor, rounding),
+    )
+
+
+def wants_heal(person, heal_below=HEAL_BELOW):
+    return (person.hp._value * 100 < person.hp.normal_value * heal_below
+            and person.mana._value >= person.base_heal_cost)
+
+
+def duel(first, second, max_turns=MAX_TURNS, heal_below=HEAL_BELOW, rollers=None):
+    fighters = (first, second)
+    for turn in range(max_turns):
+        side = turn % 2
+        actor, target = fighters[side], fighters[1 - side]
+        if wants_heal(actor, heal_below):
+            actor.heal()
+        elif rollers is None:
+            target.hp.change(-actor.hit())
+        else:
+            target.hp.change(-actor.hit(rollers[side]))
+        if target.hp._value == 0:
+            return side, turn + 1
+    return DRAW, max_turns
+
+
+def _parameter_columns(races, levels, characteristics, level_factor):
+    races = np.asarray(races)
+    levels = np.asarray(levels, dtype=np.int64)
+    race_names, race_codes = np.unique(races, return_inverse=True)
+    keys, rows = np.unique(np.stack([race_codes.ravel(), levels]), axis=1, return_inverse=True)
+    table = np.array([
+        race_parameters(str(race_names[code]), int(level), characteristics, level_factor)
+        for code, level in keys.T
+    ], dtype=np.float64)
+    return {name: table[rows.ravel(), column] for column, name in enumerate(RaceParameters._fields)}
+
+
+def simulate(races_a, levels_a, races_b, levels_b, max_turns=MAX_TURNS, heal_below=HEAL_BELOW,
+             characteristics=None, level_factor=LEVEL_INCREASING_FACTOR, seed=0, odds=None, duel_ids=None):
+    count = len(races_a)
+    columns = _parameter_columns(np.concatenate([races_a, races_b]), np.concatenate([levels_a, levels_b]),
+                                 characteristics, level_factor)
+    hp = StatPool(2 * count)
+    mana = StatPool(2 * count)
+    hp.allocate_many(columns['hp'])
+    mana.allocate_many(columns['mana'])
+
+    heal_amounts = columns['base_heal']
+    heal_costs = columns['base_heal_cost']
+    hit_heals = columns['hit_heal']
+    hit_costs = columns['hit_mana_cost']
+    weak_hits = columns['weak_hit']
+
+    winners = np.full(count, DRAW, dtype=np.int8)
+    turns = np.full(count, max_turns, dtype=np.int64)
+    active = np.arange(count)
+
+    if odds is not None:
+        duel_ids = np.arange(count) if duel_ids is None else np.asarray(duel_ids)
+        keys = stream_keys(seed, np.concatenate([duel_ids, duel_ids]), np.repeat([0, 1], count))
+        counters = np.zeros(2 * count, dtype=np.int64)
+
+    for turn in range(max_turns):
+        if not len(active):
+            break
+        side = turn % 2
+        actors = active + side * count
+        targets = active + (1 - side) * count
+
+        healing = ((hp.values[actors] * 100 < hp.normal_values[actors] * heal_below)
+                   & (mana.values[actors] >= heal_costs[actors]))
+        healers = actors[healing]
+        mana.change(healers, -heal_costs[healers])
+        hp.change(healers, heal_amounts[healers])
+
+        hitters = actors[~healing]
+        hp.change(hitters, hit_heals[hitters])
+        full_hits = hit_costs[hitters] <= mana.values[hitters]
+        mana.change(hitters, -hit_costs[hitters])
+        damage = np.where(full_hits, columns['base_hit'][hitters], weak_hits[hitters])
+        if odds is not None:
+            outcomes = uniforms(keys[hitters], counters[hitters])
+            spreads = uniforms(keys[hitters], counters[hitters] + 1)
+            counters[hitters] += DRAWS_PER_HIT
+            damage = roll_damages(odds, damage, outcomes, spreads)
+        hp.change(targets[~healing], -damage)
+
+        finished = hp.values[targets] == 0
+        winners[active[finished]] = side
+        turns[active[finished]] = turn + 1
+        active = active[~finished]
+
+    return DuelResults(
+        winners=winners,
+        turns=turns,
+        hp=hp.values[:2 * count].reshape(2, count).T.copy(),
+        mana=mana.values[:2 * count].reshape(2, count).T.copy(),
+    )
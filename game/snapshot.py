@@ -0,0 +1,155 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from game.factory import PersonFactory
+
+MAGIC = b'SRPGSNP'
+VERSION = 2
+# magic, version, person count and the size of the race name table that follows the header
+HEADER = struct.Struct('<7sBQI')
+
+# 8-byte columns first so that every column stays aligned to its item size
+COLUMNS = (
+    ('base_hit', 'd'),
+    ('base_heal', 'd'),
+    ('base_heal_cost', 'd'),
+    ('hit_mana_cost', 'd'),
+    ('hp_normal', 'q'),
+    ('hp', 'q'),
+    ('stamina_normal', 'q'),
+    ('stamina', 'q'),
+    ('mana_normal', 'q'),
+    ('mana', 'q'),
+    ('level', 'I'),
+    ('race', 'H'),
+)
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _padded(size):
+    return -size % 8
+
+
+def _person_columns(person, race_codes):
+    return (
+        person.base_hit,
+        person.base_heal,
+        person.base_heal_cost,
+        getattr(person, 'hit_mana_cost', 0),
+        person.hp.normal_value,
+        person.hp.settle(),
+        person.stamina.normal_value,
+        person.stamina._value,
+        person.mana.normal_value,
+        person.mana.settle(),
+        person.level,
+        race_codes.setdefault(person.race, len(race_codes)),
+    )
+
+
+def save(persons, path):
+    # race codes are local to the file, the names are stored in the header
+    race_codes = {}
+    rows = [_person_columns(person, race_codes) for person in persons]
+    columns = [array(typecode, (row[i] for row in rows)) for i, (_, typecode) in enumerate(COLUMNS)]
+    races = '\n'.join(race_codes).encode()
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as stream:
+        stream.write(HEADER.pack(MAGIC, VERSION, len(rows), len(races)))
+        stream.write(races + bytes(_padded(HEADER.size + len(races))))
+        for column in columns:
+            if sys.byteorder != 'little':
+                column.byteswap()
+            column.tofile(stream)
+    os.replace(tmp_path, path)
+    return len(rows)
+
+
+class Snapshot:
+    def __init__(self, path):
+        if sys.byteorder != 'little':
+            raise SnapshotError('Snapshots can only be mapped on little-endian hosts')
+        with open(path, 'rb') as stream:
+            self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise SnapshotError(f'{path} is not a snapshot')
+        magic, version, self.count, races_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise SnapshotError(f'Unsupported snapshot {magic!r} version {version}')
+        offset = HEADER.size + races_size
+        if offset > len(self._mmap):
+            self._mmap.close()
+            raise SnapshotError(f'{path} is truncated')
+        races = self._mmap[HEADER.size:offset]
+        self.races = races.decode().split('\n') if races else []
+        offset += _padded(offset)
+
+        self._buffer = memoryview(self._mmap)
+        self.columns = {}
+        for name, typecode in COLUMNS:
+            size = self.count * struct.calcsize(typecode)
+            if offset + size > len(self._mmap):
+                self.close()
+                raise SnapshotError(f'{path} is truncated')
+            self.columns[name] = self._buffer[offset:offset + size].cast(typecode)
+            offset += size
+        self._persons = {}
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if not -self.count <= index < self.count:
+            raise IndexError('Snapshot index out of range')
+        index %= self.count
+        person = self._persons.get(index)
+        if person is None:
+            person = self._persons[index] = self._build(index)
+        return person
+
+    def __iter__(self):
+        return (self[index] for index in range(self.count))
+
+    def _build(self, index):
+        columns = self.columns
+        code = columns['race'][index]
+        if code >= len(self.races):
+            raise SnapshotError(f'Person {index} has race code {code}, the snapshot has {len(self.races)} races')
+        try:
+            person = PersonFactory.get_person(self.races[code], columns['level'][index])
+        except NotImplementedError as error:
+            raise SnapshotError(str(error))
+        for key in person.scaled_characteristics:
+            setattr(person, key, columns[key][index])
+        for name in ('hp', 'stamina', 'mana'):
+            stat = getattr(person, name)
+            stat.normal_value = columns[f'{name}_normal'][index]
+            stat._value = columns[name][index]
+        return person
+
+    @property
+    def loaded(self):
+        return len(self._persons)
+
+    def close(self):
+        for column in self.columns.values():
+            column.release()
+        self.columns = {}
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
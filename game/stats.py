@@ -1,5 +1,10 @@
+import math
+import time
 from abc import ABCMeta, abstractmethod
 
+from game import events, fixed
+from game.curves import curves
+from game.fixed import ROUND, ROUNDINGS, TRUNCATE
 
 BASE_HP = 1000
 HP_LEVEL_INCREASING = 5
@@ -12,10 +17,31 @@ BASE_MANA = 1000
 MANA_LEVEL_INCREASING = 10
 MANA_LOW_LEVEL = 10
 
+ZONE_EMPTY = 0
+ZONE_LOW = 1
+ZONE_NORMAL = 2
+
+
+class Regen:
+    __slots__ = ('amount', 'percent', 'interval', 'clock', 'since')
+
+    def __init__(self, amount, percent, interval, clock):
+        self.amount = amount
+        self.percent = percent
+        self.interval = interval
+        self.clock = clock
+        self.since = clock()
+
 
 class BaseStats(metaclass=ABCMeta):
-    normal_value = 0
-    _value = 0
+    __slots__ = ('normal_value', '_value', 'race_multiplier', '_observers', '_regen')
+    low_level = None
+    zone_events = {}
+    rounding = TRUNCATE
+
+    def __init__(self):
+        self._observers = None
+        self._regen = None
 
     @property
     def stat_value(self):
@@ -26,36 +52,169 @@ class BaseStats(metaclass=ABCMeta):
                          level_increasing: float =1.0,
                          race_multiplier: float =1,
                          level: int =1):
-        return int(base_value * race_multiplier * (1 + level_increasing / 100) ** (level - 1))
+        return curves.stat(base_value, level_increasing, race_multiplier, self.rounding)[level]
+
+    # zones move with the normal value, so the old zone is taken before it changes
+    def set_level(self, level):
+        old_value = self.settle()
+        old_zone = None if self.low_level is None else self.zone(old_value)
+        normal_value = self.get_normal_value(self.base_value, self.level_increasing, self.race_multiplier, level)
+        self._value = max(0, min(old_value + normal_value - self.normal_value, normal_value))
+        self.normal_value = normal_value
+        if old_zone is not None:
+            self._notify_zones(old_zone, self.zone(self._value))
+        return self.normal_value
+
+    def reset(self, level):
+        self._regen = None
+        self._observers = None
+        self.normal_value = self.get_normal_value(self.base_value, self.level_increasing, self.race_multiplier, level)
+        self._value = self.normal_value
+        return self.normal_value
+
+    def clone(self):
+        stat = object.__new__(type(self))
+        stat.race_multiplier = self.race_multiplier
+        stat.normal_value = stat._value = self.normal_value
+        stat._observers = None
+        stat._regen = None
+        return stat
 
     def change(self, amount, percent=None):
+        if self._regen is not None:
+            self.settle()
+        old_value = self._value
+        if self.rounding == ROUND:
+            value = old_value + fixed.delta(amount, self.normal_value, percent)
+        elif percent:
+            value = int(old_value + self.normal_value * amount / 100)
+        else:
+            value = int(old_value + amount)
+
+        if value > self.normal_value:
+            value = self.normal_value
+        if value < 0:
+            value = 0
+
+        self._value = value
+        if value != old_value and self.low_level is not None:
+            self._notify(old_value, value)
+        return value
+
+    def regenerate(self, amount, percent=None, interval=1.0, clock=time.monotonic):
+        self.settle()
+        self._regen = Regen(amount, percent, interval, clock) if amount else None
+
+    def settle(self):
+        regen = self._regen
+        if regen is None:
+            return self._value
+        ticks = int((regen.clock() - regen.since) // regen.interval)
+        if ticks <= 0:
+            return self._value
+        regen.since += ticks * regen.interval
+        return self._move(ticks * self.step(regen.amount, regen.percent))
+
+    # the whole-number move a change() call makes before clamping
+    def step(self, amount, percent=None):
+        if self.rounding == ROUND:
+            return fixed.delta(amount, self.normal_value, percent)
         if percent:
-            self._value = int(self._value + self.normal_value * amount / 100)
+            return math.floor(self.normal_value * amount / 100)
+        return math.floor(amount)
+
+    def _move(self, delta):
+        old_value = self._value
+        value = min(max(old_value + delta, 0), self.normal_value)
+        if value != old_value:
+            self._value = value
+            if self.low_level is not None:
+                self._notify(old_value, value)
+        return value
+
+    def change_repeated(self, amount, times, percent=None):
+        if self._regen is not None:
+            self.settle()
+        return self._move(times * self.step(amount, percent))
+
+    def next_value(self, value, amount, percent=None):
+        if self.rounding == ROUND:
+            value += fixed.delta(amount, self.normal_value, percent)
+        elif percent:
+            value = int(value + self.normal_value * amount / 100)
         else:
-            self._value = int(self._value + amount)
+            value = int(value + amount)
+        return min(max(value, 0), self.normal_value)
+
+    def zone(self, value=None):
+        if value is None:
+            value = self.settle()
+        if value == 0:
+            return ZONE_EMPTY
+        if value < int(self.normal_value * self.low_level / 100):
+            return ZONE_LOW
+        return ZONE_NORMAL
+
+    def _notify(self, old_value, value):
+        self._notify_zones(self.zone(old_value), self.zone(value))
+
+    def _notify_zones(self, old_zone, new_zone):
+        step = 1 if new_zone > old_zone else -1
+        for zone in range(old_zone, new_zone, step):
+            self._crossed(zone, zone + step)
 
-        if self._value > self.normal_value:
-            self._value = self.normal_value
-        if self._value < 0:
-            self._value = 0
+    def _crossed(self, old_zone, new_zone):
+        if new_zone < old_zone and new_zone in self.zone_events:
+            events.emit(*self.zone_events[new_zone])
+        for cls in type(self).__mro__:
+            for callback in cls.__dict__.get('observers', ()):
+                callback(self, old_zone, new_zone)
+        if self._observers:
+            for callback in self._observers:
+                callback(self, old_zone, new_zone)
 
-        return self._value
+    def subscribe(self, callback):
+        if self._observers is None:
+            self._observers = []
+        self._observers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._observers.remove(callback)
+
+    @classmethod
+    def subscribe_all(cls, callback):
+        if 'observers' not in cls.__dict__:
+            cls.observers = []
+        cls.observers.append(callback)
+
+    @classmethod
+    def unsubscribe_all(cls, callback):
+        cls.__dict__['observers'].remove(callback)
 
 
 class HP(BaseStats):
+    __slots__ = ()
+    base_value = BASE_HP
+    level_increasing = HP_LEVEL_INCREASING
+    low_level = HP_LOW_LEVEL
+    zone_events = {
+        ZONE_EMPTY: (events.DEATH, 'Person is dead'),
+        ZONE_LOW: (events.LOW_HP, f'HP level is less then {HP_LOW_LEVEL}%'),
+    }
+
     def __init__(self, race_multiplier, level):
-        self.normal_value = self.get_normal_value(BASE_HP, HP_LEVEL_INCREASING, race_multiplier, level)
+        self.race_multiplier = race_multiplier
+        self.normal_value = self.get_normal_value(self.base_value, self.level_increasing, race_multiplier, level)
         self._value = self.normal_value
+        self._observers = None
+        self._regen = None
 
     @property
     def stat_value(self):
-        if self._value == 0:
-            system_print('Person is dead')
-        elif self._value < int(self.normal_value * HP_LOW_LEVEL / 100):
-            system_print(f'HP level is less then {HP_LOW_LEVEL}%')
-        return self._value
+        return self._value if self._regen is None else self.settle()
 
     def __str__(self):
+        self.settle()
         hp_percent = self._value / self.normal_value * 100
         if hp_percent > 0 and hp_percent < 0.01:
             hp_percent = 0.01
@@ -65,8 +224,16 @@ class HP(BaseStats):
 
 
 class Stamina(BaseStats):
+    __slots__ = ()
+    base_value = BASE_STAMINA
+    level_increasing = STAMINA_LEVEL_INCREASING
+
     def __init__(self, race_multiplier, level):
-        self.normal_value = self.get_normal_value(BASE_STAMINA, STAMINA_LEVEL_INCREASING, race_multiplier, level)
+        self.race_multiplier = race_multiplier
+        self.normal_value = self.get_normal_value(self.base_value, self.level_increasing, race_multiplier, level)
+        self._value = self.normal_value
+        self._observers = None
+        self._regen = None
 
     @property
     def stat_value(self):
@@ -77,27 +244,36 @@ class Stamina(BaseStats):
 
 
 class Mana(BaseStats):
+    __slots__ = ()
+    base_value = BASE_MANA
+    level_increasing = MANA_LEVEL_INCREASING
+    low_level = MANA_LOW_LEVEL
+    zone_events = {
+        ZONE_EMPTY: (events.NO_MANA, 'Your mana is )'),
+        ZONE_LOW: (events.LOW_MANA, 'Mana level is less then 10%'),
+    }
+
     def __init__(self, race_multiplier, level):
-        self.normal_value = self.get_normal_value(BASE_MANA, MANA_LEVEL_INCREASING, race_multiplier, level)
+        self.race_multiplier = race_multiplier
+        self.normal_value = self.get_normal_value(self.base_value, self.level_increasing, race_multiplier, level)
         self._value = self.normal_value
+        self._observers = None
+        self._regen = None
 
     @property
     def stat_value(self):
-        if self._value == 0:
-            system_print('Your mana is )')
-        elif self._value < int(self.normal_value * MANA_LOW_LEVEL / 100):
-            system_print('Mana level is less then 10%')
-        return self._value
+        return self._value if self._regen is None else self.settle()
 
     def check_value(self, needed_mana):
-        if needed_mana <= self._value:
+        if needed_mana <= self.settle():
             return True
         else:
-            system_print('You dont have enougth mana')
+            events.emit(events.INSUFFICIENT_MANA, 'You dont have enougth mana')
             return False
 
     def __str__(self):
-        mana_percent = self._value / self.normal_value * 100
+        self.settle()
+        mana_percent = self._value / self.normal_value * 100 if self.normal_value else 0
         if mana_percent > 0 and mana_percent < 0.01:
             mana_percent = 0.01
         else:
@@ -105,6 +281,8 @@ class Mana(BaseStats):
         return f'Current Mana: {self._value} ({mana_percent}%)'
 
 
-def system_print(msg):
-    # temporary implementation
-    print(msg)
+def set_rounding(rounding):
+    if rounding not in ROUNDINGS:
+        raise ValueError(f'Unknown rounding {rounding!r}, expected one of {", ".join(ROUNDINGS)}')
+    previous, BaseStats.rounding = BaseStats.rounding, rounding
+    return previous
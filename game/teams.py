@@ -0,0 +1,160 @@
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
+
+from game.pool import StatPool, bind_person, unbind_person
+from game.stats import HP_LOW_LEVEL, MANA_LOW_LEVEL
+
+# slack for float ratios, candidates are checked exactly afterwards
+RATIO_SLACK = 1e-9
+
+
+def _remove(entries, entry):
+    del entries[bisect_left(entries, entry)]
+
+
+class TargetIndex:
+    def __init__(self, pool, size):
+        self.pool = pool
+        self.size = size
+        self.values = pool.values[:size].copy()
+        self.normal_values = pool.normal_values[:size].copy()
+        self.by_value = sorted(zip(self.values.tolist(), range(size)))
+        self.by_ratio = sorted((self._ratio(position), position) for position in range(size))
+
+    def _ratio(self, position):
+        return int(self.values[position]) / int(self.normal_values[position])
+
+    def sync(self):
+        values = self.pool.values[:self.size]
+        normal_values = self.pool.normal_values[:self.size]
+        changed = np.flatnonzero((values != self.values) | (normal_values != self.normal_values))
+        for position in changed.tolist():
+            self.update(position, int(values[position]), int(normal_values[position]))
+
+    def update(self, position, value, normal_value=None):
+        old_value = int(self.values[position])
+        _remove(self.by_value, (old_value, position))
+        _remove(self.by_ratio, (self._ratio(position), position))
+        self.values[position] = value
+        if normal_value is not None:
+            self.normal_values[position] = normal_value
+        insort(self.by_value, (value, position))
+        insort(self.by_ratio, (self._ratio(position), position))
+
+    def lowest(self):
+        start = bisect_right(self.by_value, (0, self.size))
+        return self.by_value[start][1] if start < len(self.by_value) else None
+
+    def alive(self):
+        start = bisect_right(self.by_value, (0, self.size))
+        return [position for _, position in self.by_value[start:]]
+
+    def below(self, percent, alive=False):
+        end = bisect_left(self.by_ratio, (percent / 100 * (1 + RATIO_SLACK) + RATIO_SLACK, -1))
+        return [position for _, position in self.by_ratio[:end]
+                if self.values[position] * 100 < self.normal_values[position] * percent
+                and (self.values[position] or not alive)]
+
+
+class Team:
+    def __init__(self, persons):
+        self.persons = list(persons)
+        for person in self.persons:
+            person.leave_team()
+        self._bind([], [])
+
+    def _bind(self, hp_observers, mana_observers):
+        size = len(self.persons)
+        self.hp = StatPool(size, HP_LOW_LEVEL)
+        self.mana = StatPool(size, MANA_LOW_LEVEL)
+        self.hp.observers, self.mana.observers = hp_observers, mana_observers
+        for person in self.persons:
+            bind_person(person, self.hp, self.mana)
+            person.team = self
+        self.positions = {id(person): position for position, person in enumerate(self.persons)}
+        self.index = TargetIndex(self.hp, size)
+
+    # the person gets plain stats with its current values, the members after it move up one position
+    def remove(self, person):
+        if id(person) not in self.positions:
+            raise ValueError(f'{person!r} is not in the team')
+        del self.persons[self.positions[id(person)]]
+        unbind_person(person)
+        person.team = None
+        self._bind(self.hp.observers, self.mana.observers)
+
+    def __len__(self):
+        return len(self.persons)
+
+    def position(self, person):
+        return self.positions[id(person)]
+
+    def lowest(self):
+        self.index.sync()
+        return self.index.lowest()
+
+    def alive(self):
+        self.index.sync()
+        return self.index.alive()
+
+    def below(self, percent, alive=False):
+        self.index.sync()
+        return self.index.below(percent, alive)
+
+    def _settle(self, positions):
+        for position in positions:
+            if self.persons[position].hp._regen is not None:
+                self.persons[position].hp.settle()
+
+    # same as healer.heal() once per target, each heal landing on that target instead of the healer
+    def group_heal(self, healer, targets):
+        targets = list(targets)
+        if not targets:
+            return np.zeros(0, dtype=np.int64)
+        healer.mana.change_repeated(-healer.base_heal_cost, len(targets))
+        return self.hp.change(targets, np.full(len(targets), healer.base_heal))
+
+    def heal_below(self, healer, percent, alive=True):
+        targets = self.below(percent, alive)
+        return targets, self.group_heal(healer, targets)
+
+    # one hit from the attacker, every target takes damage * factor
+    def splash(self, attacker, targets, factor=1, roller=None):
+        targets = list(targets)
+        damage = attacker.hit() if roller is None else attacker.hit(roller)
+        return damage, self.hp.change(targets, np.full(len(targets), -(damage * factor)))
+
+    # every living member in order hits the living enemy with the lowest HP, ties go to the first position.
+    # Damage is resolved on the index and written back once, zone notifications follow in hit order.
+    def attack(self, enemies, rollers=None):
+        if enemies is self:
+            raise ValueError('A team cannot attack itself')
+        enemies._settle(range(len(enemies)))
+        index = enemies.index
+        index.sync()
+
+        values = {}
+        steps = []
+        hits = []
+        for position, person in enumerate(self.persons):
+            if not person.hp.stat_value:
+                continue
+            target = index.lowest()
+            if target is None:
+                break
+            damage = person.hit() if rollers is None else person.hit(rollers[position])
+            stat = enemies.persons[target].hp
+            old_value = int(index.values[target])
+            value = stat.next_value(old_value, -damage)
+            if value != old_value:
+                index.update(target, value)
+                values[target] = value
+                steps.append((stat, old_value, value))
+            hits.append((position, target, damage))
+
+        if values:
+            enemies.hp.values[list(values)] = list(values.values())
+        for stat, old_value, value in steps:
+            stat._notify(old_value, value)
+        return hits
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from game import balance
+from game.factory import BASE_CHARACTERISTICS, Elf
+from game.fixed import ROUND
+from game.stats import set_rounding
+
+SPACE = {'elf.base_hit': (150, 250), 'level_factor': (0.03, 0.07)}
+
+
+class BalanceTest(unittest.TestCase):
+    def setUp(self):
+        self.settings = balance.default_settings(level_bands=((1, 3), (4, 6)), fights_per_level=3, max_turns=300)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_dir = directory.name
+
+    def test_candidate(self):
+        characteristics, level_factor = balance.candidate_characteristics({'elf.base_hit': 180, 'level_factor': 0.04})
+        self.assertEqual(characteristics['elf']['base_hit'], 180)
+        self.assertEqual(level_factor, 0.04)
+        self.assertEqual(BASE_CHARACTERISTICS['elf']['base_hit'], 200)
+
+        params = {'elf.base_hit': 180}
+        key = balance.parameter_hash(params, self.settings)
+        self.assertEqual(key, balance.parameter_hash({'elf.base_hit': 180}, self.settings))
+        self.assertNotEqual(key, balance.parameter_hash({'elf.base_hit': 181}, self.settings))
+        self.assertNotEqual(key, balance.parameter_hash(params, self.settings._replace(seed=1)))
+        with patch.dict(BASE_CHARACTERISTICS['elf'], base_heal=151):
+            self.assertNotEqual(key, balance.parameter_hash(params, self.settings))
+        with patch.object(Elf, 'weak_hit_factor', 0.4):
+            self.assertNotEqual(key, balance.parameter_hash(params, self.settings))
+        with patch.object(balance, 'LEVEL_INCREASING_FACTOR', 0.06):
+            self.assertNotEqual(key, balance.parameter_hash(params, self.settings))
+        self.assertEqual(key, balance.parameter_hash(params, self.settings))
+
+        self.addCleanup(set_rounding, set_rounding(ROUND))
+        self.assertNotEqual(key, balance.parameter_hash(params, balance.default_settings(((1, 3), (4, 6)), 3,
+                                                                                       max_turns=300)))
+
+    def test_evaluate(self):
+        win_rates = balance.evaluate({}, self.settings)
+        self.assertEqual(len(win_rates), 2)
+        self.assertTrue(all(0 <= rate <= 1 for rate in win_rates))
+        self.assertEqual(balance.evaluate({}, self.settings), win_rates)
+        self.assertEqual(balance.evaluate({'human.base_hit': 1000}, self.settings), [1.0, 1.0])
+        self.assertEqual(balance.evaluate({'human.base_hit': 5}, self.settings), [0.0, 0.0])
+        self.assertEqual(balance.score([0.4, 0.55]), 0.09999999999999998)
+
+    def test_search(self):
+        self.assertEqual(len(balance.grid(SPACE, 3)), 9)
+        self.assertIn({'elf.base_hit': 200.0, 'level_factor': 0.05}, balance.grid(SPACE, 3))
+        self.assertEqual(balance.neighbours({'elf.base_hit': 150, 'level_factor': 0.05}, SPACE,
+                                            {'elf.base_hit': 25, 'level_factor': 0.01}),
+                         [{'elf.base_hit': 175, 'level_factor': 0.05}, {'elf.base_hit': 150, 'level_factor': 0.04},
+                          {'elf.base_hit': 150, 'level_factor': 0.06}])
+
+    def test_optimize(self):
+        results, cache = balance.optimize(SPACE, grid_steps=3, rounds=2, top=3, settings=self.settings, workers=1,
+                                          cache_dir=self.cache_dir)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results, sorted(results, key=lambda result: result.score))
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(len(os.listdir(self.cache_dir)), cache.misses)
+        for result in results:
+            self.assertEqual(result.win_rates, balance.evaluate(result.params, self.settings))
+
+        with patch('game.balance.evaluate', side_effect=AssertionError('memoized')):
+            cached, cache = balance.optimize(SPACE, grid_steps=3, rounds=2, top=3, settings=self.settings,
+                                             workers=1, cache_dir=self.cache_dir)
+        self.assertEqual(cached, results)
+        self.assertEqual(cache.misses, 0)
+
+        parallel, _ = balance.optimize(SPACE, grid_steps=3, rounds=2, top=3, settings=self.settings, workers=2,
+                                       cache_dir=None)
+        self.assertEqual(parallel, results)
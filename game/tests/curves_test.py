@@ -0,0 +1,54 @@
+import unittest
+
+from game.curves import LevelCurve, LevelCurves
+from game.fixed import ONE, ROUND
+
+
+class LevelCurveTest(unittest.TestCase):
+    def test_matches_pow(self):
+        curve = LevelCurve(1 + 5 / 100, 1000 * 0.8, max_level=10)
+        for level in range(1, 200):
+            self.assertEqual(curve[level], int(1000 * 0.8 * (1 + 5 / 100) ** (level - 1)))
+
+        curve = LevelCurve(1 + 0.05, truncate=False, max_level=10)
+        for level in range(1, 200):
+            self.assertEqual(curve[level], (1 + 0.05) ** (level - 1))
+
+    def test_extend(self):
+        curve = LevelCurve(1.1, 1000, max_level=5)
+        self.assertEqual(curve.max_level, 5)
+        self.assertEqual(curve[8], 1948)
+        self.assertEqual(curve.max_level, 8)
+        self.assertEqual(curve[0], 909)
+
+
+class LevelCurvesTest(unittest.TestCase):
+    def test_cached(self):
+        level_curves = LevelCurves(max_level=20)
+        curve = level_curves.stat(1000, 5, 1)
+        self.assertIs(level_curves.stat(1000, 5, 1), curve)
+        self.assertEqual(curve.max_level, 20)
+        self.assertEqual(curve[3], 1102)
+        self.assertEqual(level_curves.factor(0.05)[2], 1.05)
+
+        level_curves.clear()
+        self.assertIsNot(level_curves.stat(1000, 5, 1), curve)
+
+    def test_invalid(self):
+        level_curves = LevelCurves()
+        with self.assertRaises(TypeError):
+            level_curves.stat('1000', 5, 1)
+        with self.assertRaises(TypeError):
+            level_curves.stat(1000, 5, 1)['2']
+
+    def test_fixed(self):
+        level_curves = LevelCurves(max_level=20)
+        curve = level_curves.stat(1000, 5, 0.8, ROUND)
+        self.assertIsNot(curve, level_curves.stat(1000, 5, 0.8))
+        self.assertEqual([curve[level] for level in range(0, 4)], [762, 800, 840, 882])
+        self.assertEqual(curve[60], 14232)
+
+        factor = level_curves.factor(0.05, ROUND)
+        self.assertEqual(factor[1], ONE)
+        self.assertEqual(factor[2], ONE + round(0.05 * ONE))
+        self.assertAlmostEqual(factor[30] / ONE, 1.05 ** 29, places=6)
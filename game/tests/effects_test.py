@@ -0,0 +1,154 @@
+import random
+import unittest
+
+from game import events
+from game.effects import IGNORE, STACK, EffectEngine, TimingWheel
+from game.factory import Human, Elf
+from game.fixed import ROUND, multiply
+from game.races import compile_spec, validate
+from game.stats import set_rounding
+
+
+class Entry:
+    def __init__(self, entry_id, due):
+        self.id = entry_id
+        self.due = due
+        self.location = None
+
+
+class TimingWheelTest(unittest.TestCase):
+    def test_due_order(self):
+        wheel = TimingWheel(levels=3)
+        rng = random.Random(3)
+        entries = [Entry(i, rng.randint(1, 64 ** 3 - 1)) for i in range(2000)]
+        for entry in entries:
+            wheel.insert(entry)
+        cancelled = entries[::7]
+        for entry in cancelled:
+            self.assertTrue(wheel.cancel(entry))
+        self.assertFalse(wheel.cancel(cancelled[0]))
+        self.assertEqual(len(wheel), len(entries) - len(cancelled))
+
+        fired = {}
+        while len(wheel):
+            for entry in wheel.advance():
+                fired[entry.id] = wheel.now
+        expected = {entry.id: entry.due for entry in entries if entry not in cancelled}
+        self.assertEqual(fired, expected)
+
+    def test_invalid(self):
+        wheel = TimingWheel(levels=2)
+        with self.assertRaises(ValueError):
+            wheel.insert(Entry(1, 0))
+        with self.assertRaises(ValueError):
+            wheel.insert(Entry(1, 64 ** 2))
+
+
+class EffectEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = EffectEngine()
+        self.human = Human()
+
+    def test_dot_and_hot(self):
+        hp = self.human.hp
+        self.engine.add_dot(hp, 50, period=2, ticks=3, key='poison')
+        self.engine.add_hot(hp, 10, period=1, ticks=4)
+
+        self.engine.tick()
+        self.assertEqual(hp.stat_value, 1000)
+        self.engine.tick()
+        self.assertEqual(hp.stat_value, 960)
+        self.engine.run(4)
+        self.assertEqual(hp.stat_value, 880)
+        self.assertEqual(len(self.engine), 0)
+
+    def test_stacking(self):
+        mana = self.human.mana
+        first = self.engine.add_dot(mana, 10, ticks=5, key='drain')
+        second = self.engine.add_dot(mana, 20, ticks=5, key='drain')
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.engine.add_dot(mana, 30, key='drain', stacking=IGNORE), second)
+        self.engine.add_dot(mana, 1, ticks=5, key='drain', stacking=STACK)
+        self.assertEqual(len(self.engine), 2)
+
+        self.engine.tick()
+        self.assertEqual(mana.stat_value, 979)
+        self.assertTrue(self.engine.cancel(second))
+        self.assertFalse(self.engine.cancel(second))
+        self.engine.tick()
+        self.assertEqual(mana.stat_value, 978)
+
+    def test_applied_one_by_one(self):
+        hp = self.human.hp
+        self.engine.add_dot(hp, 2.5, ticks=1)
+        self.engine.add_dot(hp, 2.5, ticks=1)
+        self.engine.tick()
+        self.assertEqual(hp.stat_value, 994)
+
+        full = Human().hp
+        self.engine.add_hot(full, 50)
+        self.engine.add_dot(full, 30)
+        self.engine.tick()
+        self.assertEqual(full.stat_value, 970)
+
+    def test_lethal_tick_reports_death(self):
+        sink = events.RingBufferSink()
+        self.addCleanup(events.set_sink, events.set_sink(sink))
+        hp = self.human.hp
+        self.engine.add_dot(hp, 2000)
+        self.engine.add_hot(hp, 500)
+        self.engine.tick()
+        self.assertEqual(hp.stat_value, 500)
+        self.assertIn(events.DEATH, [event.type for event in sink.drain()])
+
+    def test_percent(self):
+        self.engine.add_dot(self.human.hp, 10, ticks=2, percent=True)
+        self.engine.add_dot(self.human.hp, 5, ticks=2)
+        self.engine.run(2)
+        self.assertEqual(self.human.hp.stat_value, 790)
+
+    def test_hit_buff(self):
+        elf = Elf(3)
+        base_hit = elf.base_hit
+        self.engine.add_buff(elf, 1.5, duration=3, key='rage')
+        self.engine.add_buff(elf, 2, duration=1, key='frenzy')
+        self.assertEqual(elf.base_hit, base_hit * 1.5 * 2)
+        self.assertEqual(elf.hit(), base_hit * 1.5 * 2)
+
+        self.engine.tick()
+        self.assertEqual(elf.base_hit, base_hit * 1.5)
+        self.engine.run(2)
+        self.assertEqual(elf.base_hit, base_hit)
+        self.assertEqual(len(self.engine), 0)
+
+    def test_buff_survives_level_up(self):
+        elf = Elf(3)
+        self.engine.add_buff(elf, 2, duration=2)
+        self.assertEqual(self.engine.level_up(elf), 4)
+        self.assertEqual(elf.base_hit, Elf(4).base_hit * 2)
+        self.engine.run(2)
+        self.assertEqual(elf.base_hit, Elf(4).base_hit)
+
+    def test_buff_constant(self):
+        spec = validate('orc', {'base_hit': 300, 'base_heal': 150, 'base_heal_cost': 0, 'hp_multiplier': 1.4,
+                                'stamina_multiplier': 1.2, 'mana_multiplier': 0, 'scaled': ['base_hit']})
+        orc = compile_spec(spec)(2)
+        with self.assertRaises(ValueError):
+            self.engine.add_buff(orc, 2, duration=2, attribute='base_heal')
+        self.assertEqual(len(self.engine), 0)
+
+    def test_buff_fixed_point(self):
+        self.addCleanup(set_rounding, set_rounding(ROUND))
+        elf = Elf(3)
+        base_hit = elf.base_hit
+        self.engine.add_buff(elf, 1.5, duration=3, key='rage')
+        self.assertIsInstance(elf.base_hit, int)
+        self.assertEqual(elf.base_hit, multiply(base_hit, 1.5))
+
+    def test_refresh_zero_duration(self):
+        elf = Elf(3)
+        buff = self.engine.add_buff(elf, 2, duration=2, key='rage')
+        with self.assertRaises(ValueError):
+            self.engine.add_buff(elf, 3, duration=0, key='rage')
+        self.assertIn(buff, self.engine.effects)
+        self.assertEqual(elf.base_hit, Elf(3).base_hit * 2)
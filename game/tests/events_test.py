@@ -0,0 +1,77 @@
+import io
+import unittest
+from unittest.mock import patch
+
+from game import events
+from game.stats import HP, Mana
+
+
+class SinkTest(unittest.TestCase):
+    def test_ring_buffer(self):
+        sink = events.RingBufferSink(capacity=2)
+        sink.emit(events.LOW_HP, 'a')
+        sink.emit(events.LOW_HP, 'b')
+        sink.emit(events.DEATH, 'c')
+        self.assertEqual(sink.dropped, 1)
+        self.assertEqual([(event.type, event.message) for event in sink.drain()],
+                         [(events.LOW_HP, 'b'), (events.DEATH, 'c')])
+        self.assertEqual(sink.drain(), [])
+
+    def test_buffered(self):
+        stream = io.StringIO()
+        sink = events.BufferedSink(stream, flush_interval=60)
+        sink.emit(events.DEATH, 'Person is dead')
+        sink.emit(events.LOW_MANA, 'Mana level is less then 10%')
+        self.assertEqual(stream.getvalue(), '')
+
+        sink.close()
+        lines = [line.split('\t')[1:] for line in stream.getvalue().splitlines()]
+        self.assertEqual(lines, [['death', 'Person is dead'], ['low_mana', 'Mana level is less then 10%']])
+
+    def test_rate_limited(self):
+        now = [0.0]
+        inner = events.RingBufferSink()
+        sink = events.RateLimitedSink(inner, interval=1.0, clock=lambda: now[0])
+
+        sink.emit(events.LOW_HP, 'low')
+        sink.emit(events.LOW_HP, 'low')
+        sink.emit(events.DEATH, 'dead')
+        now[0] = 1.5
+        sink.emit(events.LOW_HP, 'low')
+
+        self.assertEqual([event.type for event in inner.drain()], [events.LOW_HP, events.DEATH, events.LOW_HP])
+        self.assertEqual(sink.suppressed[events.LOW_HP], 1)
+
+
+class StatEventsTest(unittest.TestCase):
+    def setUp(self):
+        self.sink = events.RingBufferSink()
+        previous = events.set_sink(self.sink)
+        self.addCleanup(events.set_sink, previous)
+
+    @patch('game.stats.HP.get_normal_value')
+    def test_hp(self, mocked_normal_value):
+        mocked_normal_value.return_value = 1000
+        hp = HP(1, 1)
+        hp.change(-950)
+        hp.stat_value
+        hp.change(-50)
+        hp.stat_value
+        self.assertEqual([event.type for event in self.sink.drain()], [events.LOW_HP, events.DEATH])
+
+    @patch('game.stats.Mana.get_normal_value')
+    def test_mana(self, mocked_normal_value):
+        mocked_normal_value.return_value = 1000
+        mana = Mana(1, 1)
+        mana.change(-950)
+        mana.stat_value
+        mana.check_value(100)
+        mana.change(-50)
+        mana.stat_value
+        self.assertEqual([event.type for event in self.sink.drain()],
+                         [events.LOW_MANA, events.INSUFFICIENT_MANA, events.NO_MANA])
+
+    def test_null_sink(self):
+        events.set_sink(events.NullSink())
+        events.emit(events.DEATH, 'Person is dead')
+        self.assertEqual(self.sink.drain(), [])
@@ -1,19 +1,34 @@
 import unittest
 from unittest.mock import patch
 
-from game.factory import BASE_CHARACTERISTICS, LEVEL_INCREASING_FACTOR, AbstractPerson, Human, Elf, Orc
+from game.factory import (BASE_CHARACTERISTICS, LEVEL_INCREASING_FACTOR, AbstractPerson, RaceTemplate, Human, Elf,
+                          Orc, PersonFactory, PersonPool, PrototypeCache)
 from .mocked_tests import MockedHP, MockedStamina, MockedMana
 
 
+class RaceTemplateTest(unittest.TestCase):
+    def test_row(self):
+        template = RaceTemplate('elf', ('base_hit', 'hit_mana_cost'))
+        self.assertEqual(template.constants['mana_multiplier'], 1.5)
+        self.assertNotIn('base_hit', template.constants)
+        self.assertEqual(template.row(1), (200, 150))
+        self.assertEqual(template.row(3), (200 * (1 + LEVEL_INCREASING_FACTOR) ** 2,
+                                           150 * (1 + LEVEL_INCREASING_FACTOR) ** 2))
+        self.assertIs(template.row(3), template.row(3))
+
+    def test_slots(self):
+        self.assertFalse(hasattr(Human(), '__dict__'))
+        self.assertFalse(hasattr(Elf().hp, '__dict__'))
+
+
 class AbstractPersonTest(unittest.TestCase):
-    @patch('game.factory.Mana')
-    @patch('game.factory.Stamina')
-    @patch('game.factory.HP')
     @patch.multiple(AbstractPerson, __abstractmethods__=set())
-    def setUp(self, mocked_hp, mocked_stamina, mocked_mana):
-        mocked_hp.return_value = 'hp'
-        mocked_stamina.return_value = 'stamina'
-        mocked_mana.return_value = 'mana'
+    def setUp(self):
+        # stats are built lazily, so the mocks have to stay active during the tests
+        for name, value in (('HP', 'hp'), ('Stamina', 'stamina'), ('Mana', 'mana')):
+            patcher = patch(f'game.factory.{name}', return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
         self.abstract_person = AbstractPerson(2)
 
     def test_init(self):
@@ -22,6 +37,13 @@ class AbstractPersonTest(unittest.TestCase):
         self.assertEqual(self.abstract_person.mana, 'mana')
         self.assertEqual(self.abstract_person.level_increasing_factor, 1.05)
 
+    def test_lazy_stats(self):
+        self.assertEqual(list(self.abstract_person.built_stats()), [])
+        self.assertEqual(self.abstract_person.mana, 'mana')
+        self.assertEqual(list(self.abstract_person.built_stats()), ['mana'])
+        with self.assertRaises(AttributeError):
+            self.abstract_person.armor
+
     def test_hit(self):
         with self.assertRaises(NotImplementedError):
             self.abstract_person.hit()
@@ -93,6 +115,21 @@ class HumanTest(unittest.TestCase):
         self.assertEqual(self.human_3_level.hp.stat_value, 610)
         self.assertEqual(self.human_3_level.mana.stat_value, 1099)
 
+    def test_level_up(self):
+        hp = self.human_1_level.hp
+        hp.change(-100)
+
+        self.assertEqual(self.human_1_level.level_up(), 2)
+        self.assertEqual(self.human_1_level.level_up(), 3)
+        self.assertIs(self.human_1_level.hp, hp)
+        self.assertEqual(self.human_1_level.level_increasing_factor, self.human_3_level.level_increasing_factor)
+        self.assertEqual(self.human_1_level.base_hit, self.human_3_level.base_hit)
+        self.assertEqual(self.human_1_level.base_heal_cost, self.human_3_level.base_heal_cost)
+        self.assertEqual(self.human_1_level.hp.normal_value, 1102)
+        self.assertEqual(self.human_1_level.hp.stat_value, 1002)
+        self.assertEqual(self.human_1_level.stamina.stat_value, 1166)
+        self.assertEqual(self.human_1_level.mana.stat_value, 1210)
+
 
 class ElfTest(unittest.TestCase):
     @patch.multiple(AbstractPerson, __abstractmethods__=set())
@@ -159,3 +196,133 @@ class ElfTest(unittest.TestCase):
         self.elf_3_level.heal()
         self.assertEqual(self.elf_3_level.hp.stat_value, 565)
         self.assertEqual(self.elf_3_level.mana.stat_value, 1704)
+
+    def test_level_up(self):
+        self.elf_1_level.level_up()
+        self.elf_1_level.level_up()
+        self.assertEqual(self.elf_1_level.hit_mana_cost, self.elf_3_level.hit_mana_cost)
+        self.assertEqual(self.elf_1_level.hp.stat_value, 882)
+        self.assertEqual(self.elf_1_level.mana.stat_value, 1815)
+
+
+class PersonFactoryTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = PersonPool(max_size=2)
+        patcher = patch.object(PersonFactory, 'pool', self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_get_person(self):
+        self.assertIsInstance(PersonFactory.get_person('Human'), Human)
+        self.assertEqual(PersonFactory.get_person('elf', 3).hp.stat_value, 882)
+        self.assertEqual(PersonFactory.get_person('elf', level=3).level, 3)
+        with self.assertRaises(NotImplementedError):
+            PersonFactory.get_person('dwarf')
+
+    def test_spawn_many(self):
+        elves = PersonFactory.spawn_many('elf', [1, 3, 3])
+        self.assertEqual([elf.level for elf in elves], [1, 3, 3])
+        self.assertEqual([elf.hp.stat_value for elf in elves], [800, 882, 882])
+        self.assertEqual(self.pool.stats()['misses'], 3)
+
+    def test_recycle(self):
+        elf = PersonFactory.get_person('elf', 3)
+        hp, mana = elf.hp, elf.mana
+        elf.hp.change(-1000)
+        elf.hit()
+        self.assertTrue(PersonFactory.recycle(elf))
+
+        reused = PersonFactory.get_person('elf', 1)
+        self.assertIs(reused, elf)
+        self.assertIs(reused.hp, hp)
+        self.assertIs(reused.mana, mana)
+        self.assertEqual(reused.level, 1)
+        self.assertEqual(reused.hp.stat_value, 800)
+        self.assertEqual(reused.mana.stat_value, 1500)
+        self.assertEqual(reused.stamina.stat_value, 800)
+        self.assertEqual(reused.base_hit, 200)
+        self.assertEqual(reused.hit_mana_cost, 150)
+
+        humans = [Human(), Human(), Human()]
+        self.assertEqual([PersonFactory.recycle(human) for human in humans], [True, True, False])
+        spawned = PersonFactory.spawn_many('human', [2, 2, 2])
+        self.assertEqual(sum(any(person is human for human in humans) for person in spawned), 2)
+        self.assertEqual([person.hp.stat_value for person in spawned], [1050, 1050, 1050])
+        self.assertEqual(self.pool.stats(), {'size': 0, 'max_size': 2, 'hits': 3, 'misses': 2, 'dropped': 1})
+
+    def test_recycle_twice(self):
+        human = PersonFactory.get_person('human')
+        self.assertTrue(PersonFactory.recycle(human))
+        with self.assertRaises(ValueError):
+            PersonFactory.recycle(human)
+        self.assertIs(PersonFactory.get_person('human'), human)
+        self.assertIsNot(PersonFactory.get_person('human'), human)
+        self.assertTrue(PersonFactory.recycle(human))
+
+    def test_recycle_clears_regen_and_observers(self):
+        now = [0.0]
+        crossings = []
+        human = PersonFactory.get_person('human')
+        human.hp.regenerate(-50, clock=lambda: now[0])
+        human.hp.subscribe(lambda stat, old, new: crossings.append(new))
+        PersonFactory.recycle(human)
+
+        reused = PersonFactory.get_person('human')
+        self.assertIs(reused, human)
+        now[0] = 5.0
+        self.assertEqual(reused.hp.stat_value, 1000)
+        reused.hp.change(-1000)
+        self.assertEqual(crossings, [])
+
+
+class PrototypeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = PrototypeCache(max_size=2)
+        patcher = patch.object(PersonFactory, 'prototypes', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_clone(self):
+        wave = PersonFactory.spawn_wave('elf', 30, 3)
+        expected = Elf(30)
+        for elf in wave:
+            self.assertIs(type(elf), Elf)
+            for name in Elf.clone_slots:
+                self.assertEqual(getattr(elf, name), getattr(expected, name))
+            for name in ('hp', 'stamina', 'mana'):
+                self.assertEqual(str(getattr(elf, name)), str(getattr(expected, name)))
+
+        wave[0].hp.change(-100)
+        wave[0].hit()
+        self.assertIsNot(wave[0].hp, wave[1].hp)
+        self.assertEqual(wave[1].hp.stat_value, expected.hp.stat_value)
+        self.assertEqual(wave[1].mana.stat_value, expected.mana.stat_value)
+        self.assertEqual(PersonFactory.spawn_wave('elf', 30, 1)[0].hp.stat_value, expected.hp.stat_value)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_lru(self):
+        self.cache.clone(Human, 1)
+        self.cache.clone(Human, 2)
+        self.cache.clone(Human, 1)
+        self.cache.clone(Elf, 1)
+        self.assertEqual(len(self.cache), 2)
+        self.cache.clone(Human, 1)
+        self.cache.clone(Human, 2)
+        self.assertEqual(self.cache.stats(), {'size': 2, 'max_size': 2, 'hits': 2, 'misses': 4,
+                                              'evictions': 2, 'invalidations': 0})
+
+    def test_invalidation(self):
+        self.addCleanup(Elf.refresh_template)
+        self.assertEqual(self.cache.clone(Elf, 2).base_hit, 210)
+        self.cache.clone(Human, 2)
+
+        with patch.dict(BASE_CHARACTERISTICS['elf'], {'base_hit': 300, 'hp_multiplier': 1}):
+            elf = self.cache.clone(Elf, 2)
+            self.assertEqual(elf.base_hit, 315)
+            self.assertEqual(elf.hp.stat_value, 1050)
+            self.assertEqual(self.cache.stats()['invalidations'], 1)
+            self.assertEqual(len(self.cache), 2)
+
+        self.assertEqual(self.cache.clone(Elf, 2).base_hit, 210)
+        self.assertEqual(self.cache.stats()['invalidations'], 2)
+        self.assertEqual(Elf(2).base_hit, 210)
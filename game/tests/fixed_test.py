@@ -0,0 +1,97 @@
+import os
+import random
+import subprocess
+import sys
+import unittest
+
+import numpy as np
+
+from game import fixed, fixed_arrays
+from game.factory import Elf, Human
+from game.fixed import ONE, ROUND, TRUNCATE
+from game.stats import HP, Mana, set_rounding
+
+
+class FixedTest(unittest.TestCase):
+    def test_rounding(self):
+        self.assertEqual(fixed.to_fixed(3), 3 * ONE)
+        self.assertEqual(fixed.to_fixed(0.5), ONE // 2)
+        self.assertEqual(fixed.to_fixed(-1.25), -5 * ONE // 4)
+        self.assertEqual([fixed.div_round(n, 4) for n in (5, 6, 7, -5, -6, -7)], [1, 2, 2, -1, -2, -2])
+        self.assertEqual([fixed.delta(amount, 1000) for amount in (2.5, -2.5, 2.49, 3)], [3, -3, 2, 3])
+        self.assertEqual(fixed.delta(0.05, 1000, True), 1)
+        self.assertEqual(fixed.delta(-0.25, 1000, True), -3)
+
+    def test_scalar_matches_array(self):
+        rng = random.Random(2)
+        amounts = [rng.uniform(-500, 500) for _ in range(2000)] + [0.5, -0.5, 1.5, -2.5, 0.0]
+        normal_values = [rng.randint(1, 100000) for _ in amounts]
+
+        self.assertEqual(list(fixed_arrays.to_fixed_array(amounts)), [fixed.to_fixed(amount) for amount in amounts])
+        for percent in (None, True):
+            self.assertEqual(list(fixed_arrays.delta_array(amounts, np.array(normal_values), percent)),
+                             [fixed.delta(amount, normal, percent) for amount, normal in zip(amounts, normal_values)])
+        self.assertEqual(list(fixed_arrays.delta_array([3, -4], np.array([10, 10]))), [3, -4])
+
+    def test_array_limits(self):
+        values = [2 ** 31 - 1, 2 ** 31, -2 ** 40, 3e9, -1e12, 0.5]
+        self.assertEqual(list(fixed_arrays.to_fixed_array(values)), [fixed.to_fixed(value) for value in values])
+
+        normal_value = Mana(1.5, 105).normal_value
+        for amounts, normal_values, percent in (([-100, -99.5, 100], [normal_value] * 3, True),
+                                                ([3e9, -2.5e12, 2.5], [0, 0, 0], None),
+                                                ([-100, 50, 2 ** 30], [2 ** 31, 2 ** 30, 10], True)):
+            self.assertEqual(list(fixed_arrays.delta_array(amounts, np.array(normal_values), percent)),
+                             [fixed.delta(amount, normal, percent) for amount, normal in zip(amounts, normal_values)])
+        self.assertEqual(fixed_arrays.delta_array([-100], np.array([normal_value]), True)[0], -normal_value)
+        with self.assertRaises(OverflowError):
+            fixed_arrays.delta_array([1e30], np.array([0]))
+
+
+    def test_scalar_path_without_numpy(self):
+        code = 'import sys, game.factory, game.races; sys.exit("numpy" in sys.modules)'
+        root = os.path.dirname(os.path.dirname(fixed.__file__))
+        self.assertEqual(subprocess.run([sys.executable, '-c', code], cwd=root).returncode, 0)
+
+
+class RoundingModeTest(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(set_rounding, set_rounding(ROUND))
+
+    def test_set_rounding(self):
+        self.assertEqual(set_rounding(TRUNCATE), ROUND)
+        self.assertEqual(set_rounding(ROUND), TRUNCATE)
+        with self.assertRaises(ValueError):
+            set_rounding('floor')
+
+    def test_stats(self):
+        hp = HP(0.8, 1)
+        self.assertEqual(hp.change(-10.5), 789)
+        self.assertEqual(hp.change(0.5), 790)
+        self.assertEqual(hp.change(-1.25, True), 780)
+        self.assertEqual(HP(1, 3).stat_value, 1103)
+
+        now = [0]
+        mana = Mana(1.5, 1)
+        mana.change(-1000)
+        mana.regenerate(2.5, clock=lambda: now[0])
+        now[0] = 4
+        self.assertEqual(mana.stat_value, 512)
+
+    def test_integer_race_values(self):
+        elf, human = Elf(7), Human(7)
+        self.assertEqual(elf.base_hit, 268)
+        self.assertEqual(elf.hit_mana_cost, 201)
+        self.assertEqual(human.base_heal_cost, 134)
+        for value in (elf.base_hit, elf.base_heal, elf.base_heal_cost, elf.hit_mana_cost, human.base_hit):
+            self.assertIs(type(value), int)
+
+        human.hp.change(-500)
+        human.hit()
+        self.assertEqual(human.hp.stat_value, Human(7).hp.stat_value - 500 + fixed.multiply(human.base_heal, 0.2))
+        elf.mana.change(-elf.mana.stat_value)
+        self.assertIs(type(elf.hit()), int)
+        self.assertEqual(elf.hit(), fixed.multiply(268, 0.3))
+
+        set_rounding(TRUNCATE)
+        self.assertEqual(Elf(7).base_hit, 200 * 1.05 ** 6)
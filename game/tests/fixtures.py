@@ -0,0 +1,16 @@
+from unittest.mock import patch
+
+from game.factory import BASE_CHARACTERISTICS, RACES, RACE_CODES, Elf, Human, PersonFactory, PersonPool
+
+
+# races registered by the test are dropped again on cleanup, only the built-in ones stay
+def isolate_races(test_case):
+    for name, value in (('_PersonFactory__person_classes', {'human': Human, 'elf': Elf}), ('pool', PersonPool())):
+        patcher = patch.object(PersonFactory, name, value)
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
+    for target in (BASE_CHARACTERISTICS, RACE_CODES):
+        patcher = patch.dict(target, dict(target), clear=True)
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
+    test_case.addCleanup(RACES.__setitem__, slice(None), list(RACES))
@@ -0,0 +1,82 @@
+import json
+import unittest
+
+from game import metrics
+from game.factory import BASE_CHARACTERISTICS, PersonFactory, Elf
+from game.races import compile_spec, validate
+from game.stats import BaseStats, HP
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.original_change = BaseStats.__dict__['change']
+        self.metrics = metrics.enable(metrics.Metrics())
+        self.addCleanup(metrics.disable)
+
+    def test_disabled(self):
+        metrics.disable()
+        self.assertFalse(metrics.enabled())
+        self.assertIs(BaseStats.__dict__['change'], self.original_change)
+        self.assertIs(type(PersonFactory.__dict__['get_person']), staticmethod)
+
+        HP(1, 1).change(-10)
+        self.assertEqual(self.metrics.counters, {})
+
+    def test_counters(self):
+        self.assertTrue(metrics.enabled())
+        self.assertIs(metrics.enable(), self.metrics)
+
+        elf = PersonFactory.get_person('elf')
+        for _ in range(12):
+            elf.hit()
+        elf.hp.change(100)
+        elf.hp.change(-2000)
+        elf.hp.stat_value
+
+        counters = self.metrics.snapshot()['counters']
+        self.assertEqual(counters['factory_get_person{Elf}'], 1)
+        self.assertEqual(counters['person_hit{Elf}'], 12)
+        self.assertEqual(counters['person_hit_weak{Elf}'], 2)
+        self.assertEqual(counters['mana_check_value'], 12)
+        self.assertEqual(counters['mana_check_value_insufficient'], 2)
+        self.assertEqual(counters['stats_change{HP}'], 2)
+        self.assertEqual(counters['stats_change_clamped{HP}'], 2)
+        self.assertEqual(counters['stats_change_clamped{Mana}'], 2)
+        self.assertEqual(counters['stats_stat_value{HP}'], 1)
+        self.assertEqual(self.metrics.snapshot()['timings']['person_hit{Elf}']['count'], 12)
+
+    def test_weak_hits_under_regen(self):
+        now = [0.0]
+        elf = Elf()
+        elf.mana.change(-1450)
+        elf.mana.regenerate(100, clock=lambda: now[0])
+        now[0] = 2.0
+        elf.hit()
+        counters = self.metrics.snapshot()['counters']
+        self.assertNotIn('person_hit_weak{Elf}', counters)
+        self.assertEqual(counters['mana_check_value'], 1)
+
+    def test_data_races(self):
+        paladin = compile_spec(validate('paladin', dict(BASE_CHARACTERISTICS['elf'], hit_heal_factor=0.2)))
+        person = paladin(2)
+        person.mana.change(-2000)
+        person.hit()
+        person.heal()
+        counters = self.metrics.snapshot()['counters']
+        self.assertEqual(counters['person_hit{Paladin}'], 1)
+        self.assertEqual(counters['person_hit_weak{Paladin}'], 1)
+        self.assertEqual(counters['person_heal{Paladin}'], 1)
+
+    def test_export(self):
+        elf = Elf()
+        elf.hit()
+        elf.heal()
+
+        self.assertEqual(json.loads(self.metrics.to_json())['counters']['person_heal{Elf}'], 1)
+
+        text = self.metrics.to_prometheus()
+        self.assertIn('# TYPE simple_rpg_person_hit_total counter', text)
+        self.assertIn('simple_rpg_person_hit_total{class="Elf"} 1', text)
+        self.assertIn('# TYPE simple_rpg_person_heal_seconds histogram', text)
+        self.assertIn('simple_rpg_person_heal_seconds_bucket{class="Elf",le="+Inf"} 1', text)
+        self.assertIn('simple_rpg_person_heal_seconds_count{class="Elf"} 1', text)
@@ -0,0 +1,126 @@
+import unittest
+
+from game import events
+from game.factory import Human, Elf
+from game.pool import StatPool, bind_person
+from game.stats import BaseStats, HP, Mana, ZONE_EMPTY, ZONE_LOW, ZONE_NORMAL
+
+
+class StatPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = StatPool(capacity=2)
+
+    def test_allocate(self):
+        indexes = self.pool.allocate_many([100, 200, 300])
+        self.assertEqual(list(indexes), [0, 1, 2])
+        self.assertEqual(len(self.pool), 3)
+        self.assertEqual(list(self.pool.values[:3]), [100, 200, 300])
+
+        index = self.pool.allocate(400, 15)
+        self.assertEqual(index, 3)
+        self.assertEqual(self.pool.values[index], 15)
+
+    def test_change_matches_base_stats(self):
+        cases = [(100, 100, -10, None), (100, 90, -10, True), (100, 80, 30, True),
+                 (200, 15, 7, True), (200, 29, -15, True), (1102, 500, 22.05, None),
+                 (800, 400, -220.5, None), (882, 10, -882.7, None)]
+        indexes = self.pool.allocate_many([c[0] for c in cases], [c[1] for c in cases])
+
+        for percent in (None, True):
+            selected = [i for i, c in zip(indexes, cases) if c[3] == percent]
+            amounts = [c[2] for c in cases if c[3] == percent]
+            result = self.pool.change(selected, amounts, percent)
+
+            expected = []
+            for normal_value, value, amount, _ in (c for c in cases if c[3] == percent):
+                base_stats = BaseStats()
+                base_stats.normal_value = normal_value
+                base_stats._value = value
+                expected.append(base_stats.change(amount, percent))
+            self.assertEqual(list(result), expected)
+
+    def test_crossings(self):
+        pool = StatPool(low_level=10)
+        pool.allocate_many([1000, 1000, 1000])
+        crossings = []
+        pool.subscribe(lambda indexes, old, new: crossings.append((list(indexes), list(old), list(new))))
+
+        pool.change([0, 1, 2], [-50, -950, -1000])
+        self.assertEqual(crossings, [([1, 2], [ZONE_NORMAL, ZONE_NORMAL], [ZONE_LOW, ZONE_LOW]),
+                                     ([2], [ZONE_LOW], [ZONE_EMPTY])])
+
+        crossings.clear()
+        pool.change([1], [-10])
+        self.assertEqual(crossings, [])
+
+    def test_grow_empty_pool(self):
+        pool = StatPool(capacity=0)
+        self.assertEqual(pool.allocate(5), 0)
+        self.assertEqual(pool.allocate_many([6, 7]).tolist(), [1, 2])
+        self.assertEqual(pool.values[:3].tolist(), [5, 6, 7])
+
+    def test_change_unique_indexes(self):
+        self.pool.allocate_many([100, 100])
+        with self.assertRaises(ValueError):
+            self.pool.change([0, 0], [-10, -10])
+
+
+class StatViewTest(unittest.TestCase):
+    def test_attach(self):
+        pool = StatPool()
+        hp = HP(1, 3)
+        hp.change(-100)
+        view = pool.attach(hp)
+
+        self.assertIsInstance(view, HP)
+        self.assertEqual(view.normal_value, 1102)
+        self.assertEqual(view.stat_value, 1002)
+        self.assertEqual(str(view), str(hp))
+
+        view.change(-2)
+        self.assertEqual(pool.values[view.index], 1000)
+        pool.change([view.index], [50])
+        self.assertEqual(view.stat_value, 1050)
+
+    def test_bind_person(self):
+        hp_pool, mana_pool = StatPool(), StatPool()
+        human = bind_person(Human(), hp_pool, mana_pool)
+        elf = bind_person(Elf(3), hp_pool, mana_pool)
+
+        self.assertIsInstance(elf.mana, Mana)
+        self.assertEqual(list(hp_pool.values[:2]), [1000, 882])
+
+        human.hp.change(-150)
+        human.heal()
+        self.assertEqual(hp_pool.values[human.hp.index], 950)
+        self.assertEqual(mana_pool.values[human.mana.index], 900)
+
+        elf.hit()
+        self.assertEqual(elf.mana.stat_value, 1649)
+
+    def test_pool_change_matches_stat_change(self):
+        sink = events.RingBufferSink(100)
+        self.addCleanup(events.set_sink, events.set_sink(sink))
+        now = [0.0]
+        pool, mana_pool = StatPool(capacity=1), StatPool()
+        pooled, plain = bind_person(Human(), pool, mana_pool), Human()
+        crossings, expected = [], []
+        pooled.hp.subscribe(lambda stat, old, new: crossings.append((old, new)))
+        plain.hp.subscribe(lambda stat, old, new: expected.append((old, new)))
+        pool_crossings = []
+        pool.subscribe(lambda indexes, old, new: pool_crossings.append((list(indexes), list(old), list(new))))
+
+        for person in (pooled, plain):
+            person.hp.change(-500)
+            person.hp.regenerate(100, clock=lambda: now[0])
+        now[0] = 10.0
+        result = pool.change([pooled.hp.index], [-600])
+        self.assertEqual(result.tolist(), [plain.hp.change(-600)])
+        self.assertEqual(pooled.hp.stat_value, 400)
+
+        pool.change([pooled.hp.index], [-1000])
+        plain.hp.change(-1000)
+        self.assertEqual(pooled.hp.stat_value, plain.hp.stat_value)
+        self.assertEqual(crossings, expected)
+        self.assertEqual(pool_crossings, [([0], [ZONE_NORMAL], [ZONE_LOW]), ([0], [ZONE_LOW], [ZONE_EMPTY])])
+        self.assertEqual([event.type for event in sink.drain()], [events.LOW_HP, events.DEATH] * 2)
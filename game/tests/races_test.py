@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from game.factory import BASE_CHARACTERISTICS, RACES, PersonFactory, Elf
+from game.races import RaceSpecError, load_races, load_specs, validate
+from game.simulation import duel, race_parameters, simulate
+
+from .fixtures import isolate_races
+
+RACES_JSON = {
+    'orc': {
+        'base_hit': 300,
+        'base_heal': 150,
+        'base_heal_cost': 0,
+        'hp_multiplier': 1.4,
+        'stamina_multiplier': 1.2,
+        'mana_multiplier': 0,
+        'scaled': ['base_hit', 'base_heal'],
+    },
+    'high_elf': dict(BASE_CHARACTERISTICS['elf'], weak_hit_factor=0.3),
+    'troll': dict(BASE_CHARACTERISTICS['elf'], hit_heal_factor=0.2, scaled=['base_hit']),
+}
+
+RACES_TOML = b'''
+[paladin]
+base_hit = 100
+base_heal = 100
+base_heal_cost = 100
+hp_multiplier = 1
+stamina_multiplier = 1
+mana_multiplier = 1
+hit_heal_factor = 0.2
+'''
+
+
+class RaceRegistryTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.cache_dir = os.path.join(self.directory, 'cache')
+
+        isolate_races(self)
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as stream:
+            stream.write(data if isinstance(data, bytes) else json.dumps(data).encode())
+        return path
+
+    def test_load_json(self):
+        classes = load_races(self.write('races.json', RACES_JSON), self.cache_dir)
+        self.assertEqual(sorted(classes), ['high_elf', 'orc', 'troll'])
+        self.assertIn('orc', RACES)
+
+        orc = PersonFactory.get_person('Orc', 3)
+        self.assertIs(type(orc), classes['orc'])
+        self.assertFalse(hasattr(orc, '__dict__'))
+        self.assertEqual(orc.base_hit, 300 * 1.05 ** 2)
+        self.assertEqual(orc.base_heal_cost, 0)
+        self.assertEqual(orc.hp.stat_value, int(1000 * 1.4 * (1 + 5 / 100) ** 2))
+        self.assertEqual(orc.mana.stat_value, 0)
+        self.assertEqual(orc.hit(), 300 * 1.05 ** 2)
+        self.assertEqual(str(orc.mana), 'Current Mana: 0 (0%)')
+
+        self.assertNotIn('orc', BASE_CHARACTERISTICS)
+        self.assertEqual(race_parameters('orc', 3).hp, orc.hp.normal_value)
+
+    def test_matches_builtin_races(self):
+        load_races(self.write('races.toml', RACES_TOML), self.cache_dir)
+        load_races(self.write('races.json', RACES_JSON), self.cache_dir)
+
+        for builtin, data_race in (('human', 'paladin'), ('elf', 'high_elf')):
+            for level in (1, 4, 9):
+                first = (PersonFactory.get_person(builtin, level), PersonFactory.get_person('human', 5))
+                second = (PersonFactory.get_person(data_race, level), PersonFactory.get_person('human', 5))
+                self.assertEqual(duel(*first), duel(*second))
+                self.assertEqual(first[0].hp._value, second[0].hp._value)
+                self.assertEqual(first[0].mana._value, second[0].mana._value)
+
+    def test_partially_scaled_matches_duels(self):
+        load_races(self.write('races.json', RACES_JSON), self.cache_dir)
+        pairs = [(race, level, other, other_level) for race in ('troll', 'orc') for level in (1, 5, 17, 40)
+                 for other, other_level in (('human', level), ('elf', 5))]
+        races_a, levels_a, races_b, levels_b = zip(*pairs)
+        results = simulate(races_a, levels_a, races_b, levels_b)
+
+        for i, (race, level, other, other_level) in enumerate(pairs):
+            first = PersonFactory.get_person(race, level)
+            parameters = race_parameters(race, level)
+            self.assertEqual((parameters.base_heal, parameters.base_heal_cost, parameters.hit_mana_cost),
+                             (first.base_heal, first.base_heal_cost, first.hit_mana_cost))
+            self.assertEqual(parameters.base_hit, first.base_hit)
+            winner, turns = duel(first, PersonFactory.get_person(other, other_level))
+            self.assertEqual((results.winners[i], results.turns[i]), (winner, turns), pairs[i])
+
+    def test_cache(self):
+        path = self.write('races.json', RACES_JSON)
+        specs = load_specs(path, self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        with patch('game.races.validate', side_effect=AssertionError('validated again')):
+            self.assertEqual(load_specs(path, self.cache_dir), specs)
+
+        self.write('races.json', dict(RACES_JSON, orc=dict(RACES_JSON['orc'], base_hit=301)))
+        self.assertEqual(load_specs(path, self.cache_dir)[0].characteristics['base_hit'], 301)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+    def test_damaged_cache(self):
+        path = self.write('races.json', RACES_JSON)
+        specs = load_specs(path, self.cache_dir)
+        cache_path = os.path.join(self.cache_dir, os.listdir(self.cache_dir)[0])
+        for damaged in ('{"orc": 1}', '[1]', '[["orc"]]', '[["orc", {}, [], 0, 1]]', '[["orc", 5, [], 0, 1]]'):
+            with open(cache_path, 'w') as stream:
+                stream.write(damaged)
+            self.assertEqual(load_specs(path, self.cache_dir), specs)
+
+    def test_validation(self):
+        valid = RACES_JSON['orc']
+        for name, definition in (('Orc', valid), ('orc', dict(valid, armor=1)), ('orc', dict(valid, base_hit='a')),
+                                 ('orc', dict(valid, base_hit=-1)), ('orc', {'base_hit': 1}),
+                                 ('orc', dict(valid, hp_multiplier=0)),
+                                 ('orc', dict(valid, scaled=['hp_multiplier'])),
+                                 ('orc', dict(valid, scaled=['hit_mana_cost']))):
+            with self.assertRaises(RaceSpecError):
+                validate(name, definition)
+
+        with self.assertRaises(RaceSpecError):
+            load_races(self.write('races.json', {'elf': BASE_CHARACTERISTICS['elf']}), self.cache_dir)
+        self.assertIs(PersonFactory.get_person_class('elf'), Elf)
@@ -0,0 +1,99 @@
+import io
+import unittest
+
+from game.factory import RACES, RACE_CODES, Human, Elf
+from game.recorder import CombatRecorder, HEADER, RECORD, HIT, ReplayError, read_records, replay
+from game.rng import CombatRoller
+from game.simulation import wants_heal
+
+from .fixtures import isolate_races
+
+
+class CombatRecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.recorder = CombatRecorder(chunk_records=4)
+        self.human = Human(3)
+        self.elf = Elf(2)
+        self.recorder.register(self.human)
+        self.recorder.register(self.elf)
+
+        fighters = (self.human, self.elf)
+        for tick in range(60):
+            actor, target = fighters[tick % 2], fighters[1 - tick % 2]
+            if wants_heal(actor):
+                self.recorder.heal(actor, tick)
+            else:
+                self.recorder.hit(actor, target, tick)
+            if not target.hp.stat_value:
+                break
+
+    def test_records(self):
+        records = list(read_records(io.BytesIO(self.recorder.getvalue())))
+        self.assertEqual(len(records), len(self.recorder))
+        self.assertGreater(len(self.recorder), 8)
+        tick, actor_id, target, action, amount, hp, mana = records[2]
+        self.assertEqual((tick, actor_id, target, action, amount), (0, 0, 1, HIT, self.human.base_hit))
+
+    def test_replay(self):
+        stream = io.BytesIO()
+        self.recorder.write(stream)
+        stream.seek(0)
+        persons = replay(stream)
+
+        self.assertIsInstance(persons[0], Human)
+        self.assertIsInstance(persons[1], Elf)
+        for person, original in ((persons[0], self.human), (persons[1], self.elf)):
+            self.assertEqual(person.level, original.level)
+            self.assertEqual(person.hp.stat_value, original.hp.stat_value)
+            self.assertEqual(person.mana.stat_value, original.mana.stat_value)
+
+    def test_rolled_replay(self):
+        recorder = CombatRecorder()
+        fighters = (Human(3), Elf(2))
+        for person in fighters:
+            recorder.register(person)
+        rollers = [CombatRoller(5, 0, side) for side in range(2)]
+        for tick in range(10):
+            recorder.hit(fighters[tick % 2], fighters[1 - tick % 2], tick, rollers[tick % 2])
+        log = recorder.getvalue()
+
+        persons = replay(io.BytesIO(log), {side: CombatRoller(5, 0, side) for side in range(2)})
+        self.assertEqual([person.hp.stat_value for person in persons.values()],
+                         [person.hp.stat_value for person in fighters])
+        with self.assertRaises(ReplayError):
+            replay(io.BytesIO(log))
+
+    def test_replay_mismatch(self):
+        log = bytearray(self.recorder.getvalue())
+        offset = len(log) - RECORD.size
+        record = list(RECORD.unpack_from(log, offset))
+        record[-2] += 1
+        RECORD.pack_into(log, offset, *record)
+        with self.assertRaises(ReplayError):
+            replay(io.BytesIO(bytes(log)))
+
+    def test_race_names(self):
+        recorder = CombatRecorder()
+        recorder.register(Elf(2))
+        recorder.register(Human(3))
+        log = recorder.getvalue()
+        # a process that registered its races in another order
+        isolate_races(self)
+        RACES.reverse()
+        RACE_CODES.update((race, code) for code, race in enumerate(RACES))
+        persons = replay(io.BytesIO(log))
+        self.assertEqual((type(persons[0]), type(persons[1])), (Elf, Human))
+
+        log = bytearray(log)
+        record = list(RECORD.unpack_from(log, len(log) - RECORD.size))
+        record[2] = 2
+        RECORD.pack_into(log, len(log) - RECORD.size, *record)
+        with self.assertRaises(ReplayError):
+            replay(io.BytesIO(bytes(log)))
+        self.assertEqual(HEADER.size + len('elf\nhuman') + 2 * RECORD.size, len(log))
+
+    def test_truncated(self):
+        with self.assertRaises(ReplayError):
+            replay(io.BytesIO(self.recorder.getvalue()[:-1]))
+        with self.assertRaises(ReplayError):
+            replay(io.BytesIO(b'NOTALOG'))
@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from game.factory import Human, Elf
+from game.rng import (CombatOdds, CombatRoller, RandomStream, mix64, mix64_array, roll_damage, roll_damages,
+                      stream_key, stream_keys, uniform, uniforms)
+
+
+class StreamTest(unittest.TestCase):
+    def test_scalar_matches_vectorized(self):
+        values = [0, 1, 12345, 2 ** 63, 2 ** 64 - 1]
+        self.assertEqual([mix64(value) for value in values], list(mix64_array(values)))
+
+        duel_ids = np.arange(50)
+        keys = stream_keys(9, duel_ids, 1)
+        self.assertEqual(list(keys), [stream_key(9, duel_id, 1) for duel_id in range(50)])
+
+        counters = np.arange(50) * 3
+        self.assertEqual(list(uniforms(keys, counters)),
+                         [uniform(int(key), int(counter)) for key, counter in zip(keys, counters)])
+
+    def test_streams(self):
+        stream = RandomStream(5, 1, 2)
+        values = [stream.random() for _ in range(1000)]
+        self.assertEqual(stream.counter, 1000)
+        self.assertTrue(all(0 <= value < 1 for value in values))
+        self.assertAlmostEqual(sum(values) / len(values), 0.5, delta=0.05)
+
+        replay = RandomStream(5, 1, 2)
+        self.assertEqual([replay.random() for _ in range(1000)], values)
+        self.assertNotEqual(RandomStream(5, 2, 1).random(), values[0])
+        self.assertNotEqual(RandomStream(6, 1, 2).random(), values[0])
+
+        self.assertEqual(stream.split(3).random(), RandomStream(stream.key, 3).random())
+        self.assertNotEqual(stream.split(3).random(), stream.split(4).random())
+
+    def test_large_batch(self):
+        draws = uniforms(stream_keys(1, np.arange(1000)).repeat(1000), np.tile(np.arange(1000), 1000))
+        self.assertEqual(len(draws), 1000000)
+        self.assertAlmostEqual(draws.mean(), 0.5, delta=0.001)
+        self.assertAlmostEqual((draws < 0.1).mean(), 0.1, delta=0.002)
+
+
+class RollTest(unittest.TestCase):
+    def test_roll_damage(self):
+        odds = CombatOdds(miss=0.1, crit=0.2, crit_multiplier=3, variance=0.5)
+        self.assertEqual(roll_damage(odds, 100, 0.05, 0.9), 0)
+        self.assertEqual(roll_damage(odds, 100, 0.2, 1.0), 450)
+        self.assertEqual(roll_damage(odds, 100, 0.5, 0.5), 100)
+        self.assertEqual(roll_damage(odds, 100, 0.5, 0.0), 50)
+
+        outcomes, spreads = np.array([0.05, 0.2, 0.5, 0.5]), np.array([0.9, 1.0, 0.5, 0.0])
+        self.assertEqual(list(roll_damages(odds, [100] * 4, outcomes, spreads)), [0, 450, 100, 50])
+
+    def test_hit(self):
+        odds = CombatOdds(miss=0.2, crit=0.2, crit_multiplier=2, variance=0)
+        human, elf = Human(5), Elf(5)
+        roller = CombatRoller(3, odds=odds)
+        damages = [human.hit(roller) for _ in range(500)]
+        self.assertEqual(roller.counter, 1000)
+        self.assertEqual(set(damages), {0, human.base_hit, human.base_hit * 2})
+        self.assertAlmostEqual(damages.count(0) / 500, 0.2, delta=0.05)
+
+        stream = RandomStream(3)
+        expected = roll_damage(odds, elf.base_hit, stream.random(), stream.random())
+        self.assertEqual(elf.hit(CombatRoller(3, odds=odds)), expected)
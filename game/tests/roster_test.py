@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from game.factory import Elf, Human, PersonFactory
+from game.roster import Roster, RosterError
+
+
+class RosterTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'roster.db')
+        self.roster = Roster(self.path, page_size=4)
+        self.addCleanup(self.roster.close, False)
+
+    def test_add_and_query(self):
+        self.assertEqual(self.roster.journal_mode, 'wal')
+        persons = [PersonFactory.get_person('human' if i % 2 else 'elf', i % 5 + 1) for i in range(10)]
+        persons[3].hp.change(-123)
+        ids = self.roster.add_many(persons)
+        self.assertEqual(ids, list(range(1, 11)))
+        self.assertEqual(self.roster.add(Human(7)), 11)
+        self.assertEqual(len(self.roster), 11)
+
+        handles = list(self.roster.query())
+        self.assertEqual([handle.id for handle in handles], list(range(1, 12)))
+        self.assertEqual(handles[3].hp_value, persons[3].hp.stat_value)
+        self.assertEqual(handles[3].race, 'human')
+
+        elves = list(self.roster.query('race = ? AND level > ?', ('elf', 2)))
+        self.assertEqual([handle.id for handle in elves], [3, 5, 9])
+        with self.assertRaises(RosterError):
+            self.roster.get(99)
+
+    def test_lazy_hydration(self):
+        self.roster.add_many([Elf(3), Human(2)])
+        other = Roster(self.path)
+        self.addCleanup(other.close, False)
+
+        handle = other.get(1)
+        self.assertFalse(handle.hydrated)
+        self.assertEqual(handle.base_hit, Elf(3).base_hit)
+        self.assertTrue(handle.hydrated)
+        self.assertIsInstance(handle.person, Elf)
+        self.assertIs(other.get(1).person, handle.person)
+        self.assertEqual(len(other.tracked), 1)
+
+    def test_dirty_flush(self):
+        persons = [Human(3) for _ in range(6)]
+        self.roster.add_many(persons)
+        self.assertEqual(self.roster.flush(), 0)
+
+        persons[1].hp.change(-200)
+        persons[4].heal()
+        persons[5].hp.change(-1)
+        persons[5].hp.change(1)
+        self.assertEqual(sorted(person_id for person_id, _ in self.roster.dirty()), [2, 5])
+        self.assertEqual(self.roster.flush(), 2)
+        self.assertEqual(self.roster.flush(), 0)
+
+        persons[2].level_up()
+        self.roster.close()
+        with Roster(self.path) as roster:
+            rows = {handle.id: (handle.level, handle.hp_value, handle.mana_value) for handle in roster.query()}
+            handle = roster.get(2)
+            handle.hp.change(50)
+        self.assertEqual(rows[2], (3, persons[1].hp.stat_value, persons[1].mana.stat_value))
+        self.assertEqual(rows[3], (4, persons[2].hp.stat_value, persons[2].mana.stat_value))
+        self.assertEqual(rows[5][2], persons[4].mana.stat_value)
+
+        with Roster(self.path) as roster:
+            self.assertEqual(roster.get(2).hp_value, persons[1].hp.stat_value + 50)
+            self.assertFalse(roster.release(2))
+
+    def test_release_flushes(self):
+        persons = [Human(3), Human(3)]
+        ids = self.roster.add_many(persons)
+        persons[0].hp.change(-200)
+        persons[1].hp.change(-100)
+        self.assertTrue(self.roster.release(ids[0]))
+        self.assertEqual(self.roster.get(ids[0]).hp_value, persons[0].hp.stat_value)
+        self.assertEqual([person_id for person_id, _ in self.roster.dirty()], [ids[1]])
+        self.assertFalse(self.roster.release(ids[0]))
+
+        written = self.roster.written
+        persons[1].hp.change(100)
+        self.assertTrue(self.roster.release(ids[1]))
+        self.assertEqual(self.roster.written, written)
+
+    def test_concurrent_writer(self):
+        self.roster.add(Human())
+        writer = sqlite3.connect(self.path, isolation_level=None)
+        self.addCleanup(writer.close)
+        writer.execute('BEGIN IMMEDIATE')
+        writer.execute("INSERT INTO persons (race, level, hp, mana) VALUES ('human', 9, 1, 1)")
+
+        ids = []
+
+        def add():
+            roster = Roster(self.path)
+            ids.extend(roster.add_many([Elf(4), Elf(4)]))
+            roster.close()
+
+        thread = threading.Thread(target=add)
+        thread.start()
+        time.sleep(0.2)
+        writer.execute('COMMIT')
+        thread.join()
+
+        self.assertEqual(ids, [3, 4])
+        self.assertEqual([handle.race for handle in self.roster.query()], ['human', 'human', 'elf', 'elf'])
+
+    def test_hydrate_clamps(self):
+        person_id = self.roster.add(Human())
+        self.roster.connection.execute('UPDATE persons SET hp = 5000, mana = -5 WHERE id = ?', (person_id,))
+        self.roster.connection.commit()
+        self.roster.release(person_id)
+
+        person = self.roster.get(person_id).person
+        self.assertEqual((person.hp.stat_value, person.mana.stat_value), (1000, 0))
+        self.assertEqual(self.roster.flush(), 1)
@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+
+from game.factory import Human, Elf
+from game.histogram import LatencyHistogram
+from game.scheduler import TickScheduler
+
+
+class TickSchedulerTest(unittest.TestCase):
+    def test_cooldowns(self):
+        scheduler = TickScheduler()
+        calls = []
+        scheduler.schedule('fast', calls.append, cooldown=1)
+        scheduler.schedule('slow', calls.append, cooldown=3, delay=1)
+        scheduler.schedule('once', calls.append, cooldown=None, delay=2)
+
+        for _ in range(5):
+            scheduler.run_tick()
+        self.assertEqual(calls, ['fast', 'slow', 'fast', 'once', 'fast', 'fast', 'slow', 'fast'])
+        self.assertEqual(len(scheduler), 2)
+        self.assertEqual(set(scheduler.actors), {'fast', 'slow'})
+
+        scheduler.remove('fast')
+        self.assertEqual(len(scheduler), 1)
+        self.assertEqual(set(scheduler.actors), {'slow'})
+        for _ in range(3):
+            scheduler.run_tick()
+        self.assertEqual(calls[8:], ['slow'])
+
+    def test_cancel(self):
+        scheduler = TickScheduler()
+        actions = [scheduler.schedule(actor, lambda actor: None) for actor in ('a', 'a', 'b')]
+        actions[0].cancel()
+        actions[0].cancel()
+        self.assertEqual(len(scheduler), 2)
+        self.assertEqual(scheduler.actors, {'a': 1, 'b': 1})
+        actions[2].cancel()
+        self.assertEqual(scheduler.actors, {'a': 1})
+        scheduler.run_tick()
+        self.assertEqual(len(scheduler), 1)
+
+    def test_raising_action(self):
+        scheduler = TickScheduler()
+        calls = []
+
+        def fail(actor):
+            raise RuntimeError(actor)
+        scheduler.schedule('a', fail)
+        scheduler.schedule('b', calls.append)
+        with self.assertRaises(RuntimeError):
+            scheduler.run_tick()
+        self.assertEqual((len(scheduler), scheduler.actors), (1, {'b': 1}))
+        self.assertEqual((scheduler.tick, scheduler.histogram.count), (1, 1))
+
+        self.assertEqual(scheduler.run_tick(), 1)
+        self.assertEqual(calls, ['b'])
+        scheduler.remove('b')
+        self.assertEqual((len(scheduler), scheduler.actors), (0, {}))
+
+    def test_combat(self):
+        scheduler = TickScheduler()
+        human, elf = Human(), Elf()
+        scheduler.schedule(human, lambda actor: elf.hp.change(-actor.hit()) and None, cooldown=2)
+        scheduler.schedule(elf, lambda actor: human.hp.change(-actor.hit()) and None, cooldown=2, delay=1)
+        scheduler.schedule(human, lambda actor: actor.mana.stat_value >= actor.base_heal_cost and actor.heal(),
+                           cooldown=5)
+
+        asyncio.run(scheduler.run(ticks=4))
+        self.assertEqual(scheduler.tick, 4)
+        self.assertEqual(elf.hp.stat_value, 600)
+        self.assertEqual(human.hp.stat_value, 620)
+        self.assertEqual(scheduler.histogram.count, 4)
+
+    def test_backpressure(self):
+        now = [0.0]
+        scheduler = TickScheduler(tick_interval=1.0, clock=lambda: now[0])
+
+        def slow(actor):
+            now[0] += 0.08
+
+        for actor in range(20):
+            scheduler.schedule(actor, slow)
+
+        self.assertEqual(scheduler.run_tick(), 20)
+        self.assertEqual(scheduler.overruns, 1)
+        self.assertEqual(scheduler.action_budget, 10)
+        self.assertEqual(scheduler.run_tick(), 10)
+        self.assertEqual(scheduler.throttled, 1)
+        self.assertEqual(scheduler.action_budget, 12)
+        self.assertEqual(scheduler.run_tick(), 12)
+        self.assertEqual(scheduler.action_budget, 15)
+        self.assertEqual(scheduler.overruns, 1)
+
+
+class LatencyHistogramTest(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for i in range(1, 101):
+            histogram.record(i / 1000)
+        self.assertEqual(histogram.count, 100)
+        self.assertAlmostEqual(histogram.mean, 0.0505)
+        self.assertLess(abs(histogram.percentile(50) - 0.05) / 0.05, 0.2)
+        self.assertLess(abs(histogram.percentile(99) - 0.099) / 0.099, 0.2)
+        self.assertEqual(histogram.percentile(100), 0.1)
+
+        other = LatencyHistogram()
+        other.record(1.0)
+        histogram.merge(other)
+        self.assertEqual(histogram.summary()['max'], 1.0)
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import unittest
+
+from game import events
+from game.factory import Elf, Human
+from game.service import CombatClient, CombatServer, ServiceError
+
+
+class CombatServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.addCleanup(events.set_sink, events.set_sink(events.NullSink()))
+        self.server = CombatServer(batch_window=0.005)
+        port = await self.server.start(port=0)
+        self.client = await CombatClient(port=port, pool_size=2).connect()
+        self.port = port
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def test_combat(self):
+        elf = await self.client.spawn('elf', 3)
+        human = await self.client.spawn('human', 2)
+        expected_elf, expected_human = Elf(3), Human(2)
+
+        for _ in range(12):
+            response = await self.client.hit(elf, human)
+            expected_hp = expected_human.hp.change(-expected_elf.hit())
+            self.assertEqual(response['hp'], expected_hp)
+        self.assertEqual(response['hp'], 0)
+        self.assertTrue(response['dead'])
+
+        response = await self.client.heal(elf)
+        expected_elf.heal()
+        self.assertEqual((response['hp'], response['mana']),
+                         (expected_elf.hp.stat_value, expected_elf.mana.stat_value))
+        state = await self.client.get(human)
+        self.assertEqual((state['race'], state['level'], state['hp']), ('human', 2, 0))
+
+        await self.client.remove(human)
+        with self.assertRaises(ServiceError):
+            await self.client.get(human)
+        with self.assertRaises(ServiceError):
+            await self.client.spawn('dwarf')
+        with self.assertRaises(ServiceError):
+            await self.client.request('fly')
+
+    async def test_pipelined_batches(self):
+        humans = await asyncio.gather(*(self.client.spawn('human', 5) for _ in range(40)))
+        self.assertEqual(sorted(humans), list(range(1, 41)))
+        batches = self.server.batches
+
+        responses = await asyncio.gather(*(self.client.hit(humans[0], humans[1]) for _ in range(30)))
+        actor, target = Human(5), Human(5)
+        expected = [target.hp.change(-actor.hit()) for _ in range(30)]
+        self.assertEqual(sorted(response['hp'] for response in responses), sorted(expected))
+        self.assertLess(self.server.batches - batches, 10)
+        self.assertEqual(self.server.requests, 70)
+
+    async def test_bad_request(self):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.port)
+        writer.write(b'not json\n[1]\n{"id": 7, "op": "get", "person": 99}\n')
+        responses = [json.loads(await reader.readline()) for _ in range(3)]
+        writer.close()
+        await writer.wait_closed()
+        self.assertEqual([response['ok'] for response in responses], [False, False, False])
+        self.assertTrue(responses[1]['error'].startswith('Bad request'))
+        self.assertEqual(responses[2]['id'], 7)
+
+    async def test_bad_requests_keep_batcher(self):
+        bad = [{'op': 'spawn', 'race': 123}, {'op': 'spawn', 'race': 'orc'},
+               {'op': 'spawn', 'race': 'elf', 'level': 100000}, {'op': 'spawn', 'race': 'elf', 'level': True},
+               {'op': 'spawn'}, {'op': 'hit', 'actor': [1], 'target': 1}]
+        for request in bad:
+            with self.assertRaises(ServiceError):
+                await self.client.request(**request)
+        self.assertFalse(self.server._batcher.done())
+        elf = await self.client.spawn('elf', 2)
+        state = await self.client.get(elf)
+        self.assertEqual((state['race'], state['level'], state['hp']), ('elf', 2, Elf(2).hp.stat_value))
@@ -0,0 +1,95 @@
+import random
+import unittest
+
+import numpy as np
+
+from game.factory import PersonFactory
+from game.rng import DEFAULT_ODDS, CombatRoller
+from game.fixed import ROUND
+from game.simulation import DRAW, duel, race_parameters, simulate
+from game.stats import set_rounding
+
+
+class RaceParametersTest(unittest.TestCase):
+    def test_matches_persons(self):
+        for race in ('human', 'elf'):
+            for level in (1, 3, 17):
+                person = PersonFactory.get_person(race, level)
+                parameters = race_parameters(race, level)
+                self.assertEqual(parameters.hp, person.hp.normal_value)
+                self.assertEqual(parameters.mana, person.mana.normal_value)
+                self.assertEqual(parameters.base_hit, person.base_hit)
+                self.assertEqual(parameters.base_heal, person.base_heal)
+                self.assertEqual(parameters.base_heal_cost, person.base_heal_cost)
+                self.assertEqual(parameters.hit_mana_cost, getattr(person, 'hit_mana_cost', 0))
+
+
+class SimulateTest(unittest.TestCase):
+    def test_matches_scalar_duels(self):
+        rng = random.Random(7)
+        races = ('human', 'elf')
+        pairs = [(rng.choice(races), rng.randint(1, 40), rng.choice(races), rng.randint(1, 40))
+                 for _ in range(200)]
+        races_a, levels_a, races_b, levels_b = zip(*pairs)
+
+        results = simulate(races_a, levels_a, races_b, levels_b)
+
+        for i, (race_a, level_a, race_b, level_b) in enumerate(pairs):
+            first = PersonFactory.get_person(race_a, level_a)
+            second = PersonFactory.get_person(race_b, level_b)
+            winner, turns = duel(first, second)
+            self.assertEqual(results.winners[i], winner, pairs[i])
+            self.assertEqual(results.turns[i], turns, pairs[i])
+            self.assertEqual(list(results.hp[i]), [first.hp._value, second.hp._value], pairs[i])
+            self.assertEqual(list(results.mana[i]), [first.mana._value, second.mana._value], pairs[i])
+
+    def test_rolled_matches_scalar_duels(self):
+        rng = random.Random(8)
+        races = ('human', 'elf')
+        pairs = [(rng.choice(races), rng.randint(1, 40), rng.choice(races), rng.randint(1, 40))
+                 for _ in range(100)]
+        races_a, levels_a, races_b, levels_b = zip(*pairs)
+        duel_ids = list(range(500, 600))
+
+        results = simulate(races_a, levels_a, races_b, levels_b, seed=42, odds=DEFAULT_ODDS, duel_ids=duel_ids)
+
+        for i, (race_a, level_a, race_b, level_b) in enumerate(pairs):
+            first = PersonFactory.get_person(race_a, level_a)
+            second = PersonFactory.get_person(race_b, level_b)
+            rollers = (CombatRoller(42, duel_ids[i], 0), CombatRoller(42, duel_ids[i], 1))
+            winner, turns = duel(first, second, rollers=rollers)
+            self.assertEqual(results.winners[i], winner, pairs[i])
+            self.assertEqual(results.turns[i], turns, pairs[i])
+            self.assertEqual(list(results.hp[i]), [first.hp._value, second.hp._value], pairs[i])
+            self.assertEqual(list(results.mana[i]), [first.mana._value, second.mana._value], pairs[i])
+
+        unrolled = simulate(races_a, levels_a, races_b, levels_b)
+        self.assertFalse(np.array_equal(results.turns, unrolled.turns))
+
+    def test_fixed_point_matches_scalar_duels(self):
+        self.addCleanup(set_rounding, set_rounding(ROUND))
+        rng = random.Random(9)
+        races = ('human', 'elf')
+        pairs = [(rng.choice(races), rng.randint(1, 60), rng.choice(races), rng.randint(1, 60))
+                 for _ in range(100)]
+        races_a, levels_a, races_b, levels_b = zip(*pairs)
+
+        results = simulate(races_a, levels_a, races_b, levels_b, seed=3, odds=DEFAULT_ODDS)
+
+        for i, (race_a, level_a, race_b, level_b) in enumerate(pairs):
+            first = PersonFactory.get_person(race_a, level_a)
+            second = PersonFactory.get_person(race_b, level_b)
+            winner, turns = duel(first, second, rollers=(CombatRoller(3, i, 0), CombatRoller(3, i, 1)))
+            self.assertEqual((results.winners[i], results.turns[i]), (winner, turns), pairs[i])
+            self.assertEqual(list(results.hp[i]), [first.hp._value, second.hp._value], pairs[i])
+            self.assertEqual(list(results.mana[i]), [first.mana._value, second.mana._value], pairs[i])
+
+    def test_draw(self):
+        results = simulate(['human'], [1], ['human'], [1], max_turns=4)
+        self.assertEqual(results.winners[0], DRAW)
+        self.assertEqual(results.turns[0], 4)
+        self.assertEqual(list(results.hp[0]), [820, 840])
+
+    def test_level_advantage(self):
+        results = simulate(['human'], [30], ['human'], [1])
+        self.assertEqual(results.winners[0], 0)
@@ -0,0 +1,77 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from game.factory import RACES, RACE_CODES, Human, Elf
+from game.snapshot import Snapshot, SnapshotError, save
+
+from .fixtures import isolate_races
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'world.snap')
+
+        self.persons = [Human(), Elf(3), Human(7), Elf(12)]
+        self.persons[1].hp.change(-300)
+        self.persons[1].hit()
+        self.persons[2].heal()
+        self.persons[3].hp.change(-100, True)
+
+    def test_round_trip(self):
+        self.assertEqual(save(self.persons, self.path), 4)
+
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 4)
+            self.assertEqual(snapshot.loaded, 0)
+            elf = snapshot[1]
+            self.assertIs(snapshot[1], elf)
+            self.assertIs(snapshot[-3], elf)
+            self.assertEqual(snapshot.loaded, 1)
+
+            for person, loaded in zip(self.persons, snapshot):
+                self.assertIs(type(loaded), type(person))
+                self.assertEqual(loaded.level, person.level)
+                for key in person.scaled_characteristics:
+                    self.assertEqual(getattr(loaded, key), getattr(person, key))
+                for name in ('hp', 'stamina', 'mana'):
+                    self.assertEqual(getattr(loaded, name).normal_value, getattr(person, name).normal_value)
+                    self.assertEqual(getattr(loaded, name)._value, getattr(person, name)._value)
+                self.assertEqual(str(loaded.hp), str(person.hp))
+                self.assertEqual(str(loaded.mana), str(person.mana))
+
+            with self.assertRaises(IndexError):
+                snapshot[4]
+
+    def test_invalid(self):
+        with open(self.path, 'wb') as stream:
+            stream.write(b'not a snapshot at all')
+        with self.assertRaises(SnapshotError):
+            Snapshot(self.path)
+
+        save(self.persons, self.path)
+        with open(self.path, 'r+b') as stream:
+            stream.truncate(os.path.getsize(self.path) - 1)
+        with self.assertRaises(SnapshotError):
+            Snapshot(self.path)
+
+    def test_race_names(self):
+        save(self.persons[::-1], self.path)
+        # a process that registered its races in another order
+        isolate_races(self)
+        RACES.reverse()
+        RACE_CODES.update((race, code) for code, race in enumerate(RACES))
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.races, ['elf', 'human'])
+            self.assertEqual([type(person) for person in snapshot], [Elf, Human, Elf, Human])
+
+        with open(self.path, 'r+b') as stream:
+            # the race column is the last one
+            stream.seek(-2 * len(self.persons), os.SEEK_END)
+            stream.write(struct.pack('<H', 2))
+        with Snapshot(self.path) as snapshot:
+            with self.assertRaises(SnapshotError):
+                snapshot[0]
@@ -1,7 +1,8 @@
 import unittest
 from unittest.mock import patch
 
-from game.stats import BaseStats, HP, Stamina, Mana
+from game import events
+from game.stats import BaseStats, HP, Stamina, Mana, ZONE_EMPTY, ZONE_LOW, ZONE_NORMAL
 
 
 class BaseStatsTest(unittest.TestCase):
@@ -60,6 +61,120 @@ class BaseStatsTest(unittest.TestCase):
         self.assertEqual(r, 0)
 
 
+class ThresholdTest(unittest.TestCase):
+    @patch('game.stats.HP.get_normal_value')
+    def test_crossings(self, mocked_normal_value):
+        mocked_normal_value.return_value = 1000
+        hp = HP(1, 1)
+        other_hp = HP(1, 1)
+        crossings, population_crossings = [], []
+        hp.subscribe(lambda stat, old_zone, new_zone: crossings.append((old_zone, new_zone)))
+        callback = lambda stat, old_zone, new_zone: population_crossings.append(stat)
+        HP.subscribe_all(callback)
+        self.addCleanup(HP.unsubscribe_all, callback)
+
+        hp.change(-500)
+        hp.stat_value
+        hp.stat_value
+        self.assertEqual(crossings, [])
+
+        hp.change(-420)
+        hp.change(-10)
+        self.assertEqual(crossings, [(ZONE_NORMAL, ZONE_LOW)])
+
+        hp.change(200)
+        hp.change(-1000)
+        hp.change(-10)
+        self.assertEqual(crossings, [(ZONE_NORMAL, ZONE_LOW), (ZONE_LOW, ZONE_NORMAL),
+                                     (ZONE_NORMAL, ZONE_LOW), (ZONE_LOW, ZONE_EMPTY)])
+
+        hp.change(100, True)
+        self.assertEqual(crossings[-2:], [(ZONE_EMPTY, ZONE_LOW), (ZONE_LOW, ZONE_NORMAL)])
+
+        other_hp.change(-1000)
+        self.assertEqual(len(population_crossings), 8)
+        self.assertIs(population_crossings[-1], other_hp)
+
+    def test_level_crossings(self):
+        hp = HP(1, 10)
+        crossings = []
+        hp.subscribe(lambda stat, old_zone, new_zone: crossings.append((old_zone, new_zone)))
+        hp.change(-(hp.normal_value - HP(1, 1).normal_value // 5))
+        self.assertEqual(crossings, [])
+
+        hp.set_level(1)
+        self.assertEqual(hp.stat_value, 0)
+        self.assertEqual(crossings, [(ZONE_NORMAL, ZONE_LOW), (ZONE_LOW, ZONE_EMPTY)])
+        hp.set_level(10)
+        self.assertEqual(crossings[2:], [(ZONE_EMPTY, ZONE_LOW), (ZONE_LOW, ZONE_NORMAL)])
+
+    @patch('game.stats.Stamina.get_normal_value')
+    def test_no_thresholds(self, mocked_normal_value):
+        mocked_normal_value.return_value = 1000
+        stamina = Stamina(1, 1)
+        stamina.subscribe(lambda *args: self.fail('Stamina has no thresholds'))
+        stamina.change(-1000)
+
+
+class RegenTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.sink = events.RingBufferSink(100)
+        self.addCleanup(events.set_sink, events.set_sink(self.sink))
+
+    def clock(self):
+        return self.now
+
+    def pair(self, stat_class, start, *args):
+        lazy, eager = stat_class(1, 1), stat_class(1, 1)
+        lazy.change(start - 1000)
+        eager.change(start - 1000)
+        self.sink.drain()
+        lazy.regenerate(*args, clock=self.clock)
+        crossings = {id(lazy): [], id(eager): []}
+        for stat in (lazy, eager):
+            stat.subscribe(lambda stat, old, new: crossings[id(stat)].append((old, new)))
+        return lazy, eager, crossings[id(lazy)], crossings[id(eager)]
+
+    def test_matches_per_tick_change(self):
+        for stat_class, start, amount, percent in ((HP, 0, 7.9, None), (Mana, 120, -3.5, None),
+                                                   (HP, 50, 1.25, True), (Mana, 990, 2, None)):
+            lazy, eager, lazy_crossings, eager_crossings = self.pair(stat_class, start, amount, percent, 0.5)
+            for steps in (0, 1, 3, 40, 7, 250):
+                self.now += steps * 0.5 + 0.25
+                for _ in range(steps):
+                    eager.change(amount, percent)
+                eager_events = [event[1:] for event in self.sink.drain()]
+                self.assertEqual(str(lazy), str(eager))
+                self.assertEqual([event[1:] for event in self.sink.drain()], eager_events)
+                self.now -= 0.25
+            self.assertEqual(lazy_crossings, eager_crossings)
+            self.assertEqual(lazy._value, eager._value)
+
+    def test_change_and_stop(self):
+        hp = HP(1, 1)
+        hp.change(-500)
+        hp.regenerate(10, clock=self.clock)
+        self.now = 3
+        self.assertEqual(hp.change(-100), 430)
+        self.now = 5
+        hp.regenerate(None)
+        self.assertEqual(hp.stat_value, 450)
+        self.now = 100
+        self.assertEqual(hp.stat_value, 450)
+
+        mana = Mana(1, 1)
+        mana.change(-1000)
+        mana.regenerate(5, clock=self.clock)
+        self.now = 104
+        self.assertFalse(mana.check_value(21))
+        self.assertTrue(mana.check_value(20))
+
+        mana.reset(2)
+        self.now = 110
+        self.assertEqual(mana.stat_value, mana.normal_value)
+
+
 class HPTest(unittest.TestCase):
     @patch('game.stats.HP.get_normal_value')
     def test_init(self, mocked_normal_value):
@@ -0,0 +1,190 @@
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+from game import events
+from game.factory import Human, Elf, PersonFactory, PersonPool
+from game.pool import StatView
+from game.rng import CombatRoller
+from game.stats import HP
+from game.teams import Team
+
+
+def make_persons(count, seed=0):
+    return [(Human if (index + seed) % 3 else Elf)(1 + (index * 7 + seed) % 20) for index in range(count)]
+
+
+def record(persons, crossings):
+    for position, person in enumerate(persons):
+        person.hp.subscribe(lambda stat, old, new, position=position: crossings.append((position, old, new)))
+
+
+def sequential_attack(attackers, enemies, rollers=None):
+    hits = []
+    for position, person in enumerate(attackers):
+        if not person.hp.stat_value:
+            continue
+        alive = [index for index, enemy in enumerate(enemies) if enemy.hp.stat_value]
+        if not alive:
+            break
+        target = min(alive, key=lambda index: (enemies[index].hp.stat_value, index))
+        damage = person.hit() if rollers is None else person.hit(rollers[position])
+        enemies[target].hp.change(-damage)
+        hits.append((position, target, damage))
+    return hits
+
+
+class TeamTest(unittest.TestCase):
+    def setUp(self):
+        self.sink = events.RingBufferSink(10000)
+        self.addCleanup(events.set_sink, events.set_sink(self.sink))
+
+    def event_types(self):
+        return Counter(event.type for event in self.sink.drain())
+
+    def test_index_queries(self):
+        team = Team([Human(1), Human(1), Elf(1), Human(1)])
+        team.persons[0].hp.change(-950)
+        team.persons[1].hp.change(-1000)
+        team.persons[2].hp.change(-700)
+        team.persons[3].hp.change(-50)
+
+        self.assertEqual(team.lowest(), 0)
+        self.assertEqual(team.alive(), [0, 2, 3])
+        self.assertEqual(team.below(10), [1, 0])
+        self.assertEqual(team.below(10, alive=True), [0])
+        self.assertEqual(team.below(50, alive=True), [0, 2])
+        # exactly at the threshold is not below it
+        self.assertEqual(team.below(95), [1, 0, 2])
+
+        team.hp.change([0, 1], [1000, 1000])
+        self.assertEqual(team.lowest(), 2)
+        self.assertEqual(team.below(50), [2])
+
+    def test_next_value_matches_change(self):
+        hp = HP(0.8, 7)
+        for value, amount, percent in [(500, -60.3, None), (10, -30, None), (900, 20, True), (400, 3000, None)]:
+            hp._value = value
+            expected = hp.next_value(value, amount, percent)
+            self.assertEqual(hp.change(amount, percent), expected)
+
+    def test_change_repeated(self):
+        hp, reference = HP(1, 1), HP(1, 1)
+        hp.change_repeated(-120.5, 9)
+        for _ in range(9):
+            reference.change(-120.5)
+        self.assertEqual(hp.stat_value, reference.stat_value)
+        self.assertEqual(hp.change_repeated(-120.5, 9), 0)
+
+    def test_group_heal(self):
+        persons, reference = make_persons(12), make_persons(12)
+        for index, (person, other) in enumerate(zip(persons, reference)):
+            person.hp.change(-90 * index)
+            other.hp.change(-90 * index)
+        healer, reference_healer = Human(30), Human(30)
+        team = Team(persons)
+        crossings, expected_crossings = [], []
+        record(persons, crossings)
+        record(reference, expected_crossings)
+
+        expected_targets = [position for position, person in enumerate(reference)
+                            if 0 < person.hp.stat_value * 100 < person.hp.normal_value * 60]
+        targets, values = team.heal_below(healer, 60)
+        self.assertEqual(sorted(targets), expected_targets)
+        for position in targets:
+            reference_healer.mana.change(-reference_healer.base_heal_cost)
+            reference[position].hp.change(reference_healer.base_heal)
+
+        self.assertEqual(list(values), [reference[position].hp.stat_value for position in targets])
+        self.assertEqual([p.hp.stat_value for p in persons], [p.hp.stat_value for p in reference])
+        self.assertEqual(healer.mana.stat_value, reference_healer.mana.stat_value)
+        self.assertEqual(sorted(crossings, key=lambda c: c[0]), sorted(expected_crossings, key=lambda c: c[0]))
+
+    def test_splash(self):
+        persons, reference = make_persons(20, 1), make_persons(20, 1)
+        team = Team(persons)
+        crossings, expected_crossings = [], []
+        record(persons, crossings)
+        record(reference, expected_crossings)
+
+        attacker, reference_attacker = Elf(40), Elf(40)
+        for round_number in range(6):
+            targets = range(round_number, 20, 2)
+            damage, _ = team.splash(attacker, targets, 0.75, CombatRoller(3, round_number))
+            expected_damage = reference_attacker.hit(CombatRoller(3, round_number))
+            for position in targets:
+                reference[position].hp.change(-(expected_damage * 0.75))
+            self.assertEqual(damage, expected_damage)
+
+        self.assertEqual([p.hp.stat_value for p in persons], [p.hp.stat_value for p in reference])
+        self.assertEqual(attacker.mana.stat_value, reference_attacker.mana.stat_value)
+        self.assertEqual(sorted(crossings, key=lambda c: c[0]), sorted(expected_crossings, key=lambda c: c[0]))
+
+    def test_attack_rounds(self):
+        for rolled in (False, True):
+            red, blue = make_persons(40, 2), make_persons(40, 5)
+            reference_red, reference_blue = make_persons(40, 2), make_persons(40, 5)
+            red_team, blue_team = Team(red), Team(blue)
+            crossings, expected_crossings = [], []
+            record(blue, crossings)
+            record(reference_blue, expected_crossings)
+
+            for round_number in range(30):
+                rollers = [CombatRoller(round_number, position) for position in range(40)] if rolled else None
+                reference_rollers = [CombatRoller(round_number, position) for position in range(40)] if rolled else None
+                hits = red_team.attack(blue_team, rollers)
+                self.assertEqual(hits, sequential_attack(reference_red, reference_blue, reference_rollers))
+                hits = blue_team.attack(red_team, rollers)
+                self.assertEqual(hits, sequential_attack(reference_blue, reference_red, reference_rollers))
+
+            for team, reference in ((red, reference_red), (blue, reference_blue)):
+                self.assertEqual([p.hp.stat_value for p in team], [p.hp.stat_value for p in reference])
+                self.assertEqual([p.mana.stat_value for p in team], [p.mana.stat_value for p in reference])
+            self.assertEqual(sorted(crossings, key=lambda c: c[0]), sorted(expected_crossings, key=lambda c: c[0]))
+            self.assertTrue(any(new == 0 for _, _, new in crossings))
+
+    def test_attack_events(self):
+        red, blue = Team(make_persons(10)), Team(make_persons(10, 4))
+        reference_red, reference_blue = make_persons(10), make_persons(10, 4)
+        for _ in range(20):
+            red.attack(blue)
+            blue.attack(red)
+        batched = self.event_types()
+        for _ in range(20):
+            sequential_attack(reference_red, reference_blue)
+            sequential_attack(reference_blue, reference_red)
+        self.assertEqual(batched, self.event_types())
+        self.assertGreater(batched[events.DEATH], 0)
+
+    def test_attack_self(self):
+        team = Team(make_persons(2))
+        with self.assertRaises(ValueError):
+            team.attack(team)
+
+    def test_recycled_person_leaves_team(self):
+        persons = [Human(3), Human(3), Elf(2)]
+        team = Team(persons)
+        crossings = []
+        team.hp.subscribe(lambda indexes, old, new: crossings.append(indexes.tolist()))
+        team.hp.change([1], [-10000])
+
+        with patch.object(PersonFactory, 'pool', PersonPool()):
+            PersonFactory.recycle(persons[1])
+            reused = PersonFactory.get_person('human', 5)
+        self.assertIs(reused, persons[1])
+        self.assertIsNone(reused.team)
+        self.assertNotIsInstance(reused.hp, StatView)
+        self.assertEqual(reused.hp.stat_value, Human(5).hp.stat_value)
+
+        self.assertEqual(team.persons, [persons[0], persons[2]])
+        self.assertEqual(sorted(team.alive()), [0, 1])
+        self.assertEqual(list(team.hp.values[:2]), [persons[0].hp._value, persons[2].hp._value])
+        team.hp.change([1], [-10000])
+        self.assertEqual(persons[2].hp.stat_value, 0)
+        self.assertEqual(crossings, [[1], [1], [1], [1]])
+
+        persons[0].reset(2)
+        self.assertEqual(team.persons, [persons[2]])
+        self.assertNotIsInstance(persons[0].hp, StatView)
+        with self.assertRaises(ValueError):
+            team.remove(persons[0])
@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from game.factory import BASE_CHARACTERISTICS
+from game.races import load_races
+from game.rng import CombatOdds
+from game.stats import ROUND, set_rounding
+from game.simulation import DRAW, simulate
+from game.tournament import (Matchup, MatchupStats, matchup_games, matchups, race_summary, run_shard,
+                             run_tournament)
+
+from .fixtures import isolate_races
+
+
+class TournamentTest(unittest.TestCase):
+    def setUp(self):
+        self.matchups = matchups(levels=range(1, 4))
+
+    def test_matchups(self):
+        self.assertEqual(len(self.matchups), 36)
+        self.assertIn(Matchup('elf', 3, 'human', 1), self.matchups)
+
+    def test_deterministic(self):
+        single = run_tournament(self.matchups, games=3, seed=11, workers=1, shards_per_worker=1)
+        sharded = run_tournament(self.matchups, games=3, seed=11, workers=2, shards_per_worker=3)
+        self.assertEqual(single, sharded)
+        self.assertEqual(single, run_shard(11, list(enumerate(self.matchups)), games=3))
+
+        self.assertEqual(len(single), 36)
+        for stats in single.values():
+            self.assertEqual(stats.wins + stats.losses + stats.draws, 3)
+
+        summary = race_summary(single)
+        self.assertEqual(summary[('human', 'elf')].wins, summary[('elf', 'human')].losses)
+        self.assertEqual(sum(stats.wins + stats.losses + stats.draws for stats in summary.values()), 108)
+
+    def test_rolled_deterministic(self):
+        odds = CombatOdds(miss=0.3, crit=0.3, crit_multiplier=3, variance=0.5)
+        single = run_tournament(self.matchups, games=2, seed=4, workers=1, shards_per_worker=1, odds=odds)
+        sharded = run_tournament(self.matchups, games=2, seed=4, workers=2, shards_per_worker=5, odds=odds)
+        self.assertEqual(single, sharded)
+        self.assertNotEqual(single, run_tournament(self.matchups, games=2, seed=4, workers=1))
+
+    def test_rolled_matches_batched_simulation(self):
+        odds = CombatOdds(miss=0.2, crit=0.2, crit_multiplier=2, variance=0.3)
+        sharded = run_tournament(self.matchups, games=3, seed=5, workers=2, shards_per_worker=2, odds=odds)
+
+        games = [(matchup, duel_id, swapped) for index, matchup in enumerate(self.matchups)
+                 for duel_id, swapped in matchup_games(5, index, 3)]
+        sides = [((m.race_a, m.level_a), (m.race_b, m.level_b)) for m, _, _ in games]
+        sides = [(b, a) if swapped else (a, b) for (a, b), (_, _, swapped) in zip(sides, games)]
+        results = simulate([a[0] for a, _ in sides], [a[1] for a, _ in sides], [b[0] for _, b in sides],
+                           [b[1] for _, b in sides], seed=5, odds=odds, duel_ids=[duel_id for _, duel_id, _ in games])
+
+        batched = {}
+        for (matchup, _, swapped), winner, turns in zip(games, results.winners.tolist(), results.turns.tolist()):
+            outcome = (0, 0, 1) if winner == DRAW else (1, 0, 0) if (winner == 0) != swapped else (0, 1, 0)
+            stats = batched.get(matchup, MatchupStats(0, 0, 0, 0))
+            batched[matchup] = MatchupStats(stats.wins + outcome[0], stats.losses + outcome[1],
+                                            stats.draws + outcome[2], stats.turns + turns)
+        self.assertEqual(sharded, batched)
+
+    def test_level_advantage(self):
+        results = run_shard(0, [(0, Matchup('human', 10, 'human', 1))], games=4)
+        self.assertEqual(results[Matchup('human', 10, 'human', 1)].wins, 4)
+        self.assertIsInstance(results[Matchup('human', 10, 'human', 1)], MatchupStats)
+
+
+class SpawnedWorkersTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'races.json')
+        with open(self.path, 'w') as stream:
+            stream.write('{"paladin": {"base_hit": 90, "base_heal": 120, "base_heal_cost": 80, "hp_multiplier": 1.1, '
+                         '"stamina_multiplier": 1, "mana_multiplier": 1.2, "hit_heal_factor": 0.2}}')
+        isolate_races(self)
+        self.addCleanup(set_rounding, set_rounding(ROUND))
+
+    def test_spawned_workers_match_parent(self):
+        load_races(self.path, cache_dir=None)
+        matchup_list = matchups(races=('human', 'paladin'), levels=(1, 7))
+        spawned = run_tournament(matchup_list, games=2, seed=3, workers=2, shards_per_worker=1,
+                                 mp_context=multiprocessing.get_context('spawn'))
+        self.assertEqual(spawned, run_shard(3, list(enumerate(matchup_list)), games=2))
+        self.assertNotIn('paladin', BASE_CHARACTERISTICS)
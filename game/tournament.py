@@ -0,0 +1,117 @@
+import itertools
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from game import events
+from game.factory import PersonFactory
+from game.races import register_specs, registered_specs
+from game.rng import CombatRoller
+from game.simulation import DRAW, HEAL_BELOW, MAX_TURNS, duel
+from game.stats import BaseStats, set_rounding
+
+Matchup = namedtuple('Matchup', ['race_a', 'level_a', 'race_b', 'level_b'])
+MatchupStats = namedtuple('MatchupStats', ['wins', 'losses', 'draws', 'turns'])
+
+EMPTY_STATS = MatchupStats(0, 0, 0, 0)
+
+
+def matchups(races=('human', 'elf'), levels=range(1, 11)):
+    return [Matchup(*pair[0], *pair[1])
+            for pair in itertools.product(itertools.product(races, levels), repeat=2)]
+
+
+def merge_stats(first, second):
+    return MatchupStats(*(a + b for a, b in zip(first, second)))
+
+
+# the duel id gives a game the same random streams in duel(rollers=...), simulate(duel_ids=...) and here
+def duel_id(index, game, games):
+    return index * games + game
+
+
+def matchup_games(seed, index, games=1):
+    rng = random.Random(f'{seed}:{index}')
+    return [(duel_id(index, game, games), rng.random() < 0.5) for game in range(games)]
+
+
+def play_matchup(seed, index, matchup, games=1, max_turns=MAX_TURNS, heal_below=HEAL_BELOW, odds=None):
+    wins = losses = draws = turns = 0
+    for game_id, swapped in matchup_games(seed, index, games):
+        first = PersonFactory.get_person(matchup.race_a, matchup.level_a)
+        second = PersonFactory.get_person(matchup.race_b, matchup.level_b)
+        fighters = (second, first) if swapped else (first, second)
+        rollers = None
+        if odds is not None:
+            rollers = tuple(CombatRoller(seed, game_id, side, odds=odds) for side in range(2))
+        winner, duel_turns = duel(*fighters, max_turns=max_turns, heal_below=heal_below, rollers=rollers)
+        turns += duel_turns
+        if winner == DRAW:
+            draws += 1
+        elif (winner == 0) != swapped:
+            wins += 1
+        else:
+            losses += 1
+        PersonFactory.recycle(first)
+        PersonFactory.recycle(second)
+    return MatchupStats(wins, losses, draws, turns)
+
+
+# workers get the parent's rounding mode and data races explicitly, they may not be forked from it
+def run_shard(seed, shard, games=1, max_turns=MAX_TURNS, heal_below=HEAL_BELOW, odds=None, rounding=None,
+              race_specs=()):
+    register_specs(race_specs)
+    previous = set_rounding(rounding or BaseStats.rounding)
+    try:
+        return {matchup: play_matchup(seed, index, matchup, games, max_turns, heal_below, odds)
+                for index, matchup in shard}
+    finally:
+        set_rounding(previous)
+
+
+def _init_worker():
+    events.set_sink(events.NullSink())
+
+
+def split_shards(indexed_matchups, shard_count):
+    return [indexed_matchups[i::shard_count] for i in range(shard_count) if indexed_matchups[i::shard_count]]
+
+
+def run_tournament(matchup_list=None, games=1, seed=0, workers=None, shards_per_worker=4,
+                   max_turns=MAX_TURNS, heal_below=HEAL_BELOW, odds=None, mp_context=None):
+    if matchup_list is None:
+        matchup_list = matchups()
+    workers = workers or os.cpu_count() or 1
+    shards = split_shards(list(enumerate(matchup_list)), workers * shards_per_worker)
+
+    rounding, race_specs = BaseStats.rounding, registered_specs()
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=_init_worker) as executor:
+        futures = [executor.submit(run_shard, seed, shard, games, max_turns, heal_below, odds, rounding, race_specs)
+                   for shard in shards]
+        for future in futures:
+            for matchup, stats in future.result().items():
+                results[matchup] = merge_stats(results.get(matchup, EMPTY_STATS), stats)
+    return results
+
+
+def race_summary(results):
+    summary = {}
+    for matchup, stats in results.items():
+        key = (matchup.race_a, matchup.race_b)
+        summary[key] = merge_stats(summary.get(key, EMPTY_STATS), stats)
+    return summary
+
+
+def scaling_curve(max_workers=None, **kwargs):
+    max_workers = max_workers or os.cpu_count() or 1
+    curve = []
+    for workers in range(1, max_workers + 1):
+        start = time.perf_counter()
+        run_tournament(workers=workers, **kwargs)
+        elapsed = time.perf_counter() - start
+        curve.append((workers, elapsed, curve[0][1] / elapsed if curve else 1.0))
+    return curve